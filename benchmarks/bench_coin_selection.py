@@ -0,0 +1,124 @@
+"""
+Coin selection benchmark over synthetic UTXO pools.
+
+For every pool size, address format and strategy in chains/coin_selection.py,
+a series of withdrawal amounts is selected at a fixed fee rate. Each case
+reports selection latency (p50/p95/p99) together with what the resulting
+transactions would cost: mean inputs, vbytes, fee and waste, and how often
+no change output was needed. Results are printed as JSON and can be written
+to a file with --output so runs can be compared over time.
+
+Usage (from the repository root):
+    python benchmarks/bench_coin_selection.py [--utxos 10000] [--payments 50] [--fee-rate 12] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chains.coin_selection import select_coins, STRATEGIES  # noqa: E402
+from bench_core import summarize  # noqa: E402
+
+ADDRESS_FORMATS = ("legacy", "segwit", "bech32")
+
+
+def synthetic_pool(size: int, rng: random.Random) -> list:
+    """
+    UTXOs shaped like a busy deposit address: mostly small payments,
+    some medium ones and a few large consolidations (log-uniform values).
+    """
+    pool = []
+    for n in range(size):
+        value = int(10 ** rng.uniform(3.5, 8.5))  # ~3k sats to ~3 BTC
+        pool.append({"txid": f"{n:064x}", "output_n": n % 4, "value": value, "confirmations": 6})
+    return pool
+
+
+def payment_amounts(count: int, rng: random.Random) -> list:
+    """Withdrawal amounts between 0.0005 and 0.5 BTC, in satoshis."""
+    return [int(10 ** rng.uniform(4.7, 7.7)) for _ in range(count)]
+
+
+def run_case(pool: list, amounts: list, fee_rate: float, address_format: str, strategy: str) -> dict:
+    """Select every amount from pool and summarize latency and cost."""
+    samples = []
+    selections = []
+    failures = 0
+    for amount in amounts:
+        start = time.perf_counter()
+        try:
+            selection = select_coins(pool, amount, fee_rate, address_format, strategy=strategy)
+        except ValueError:
+            selection = None
+        samples.append(time.perf_counter() - start)
+        if selection is None:
+            failures += 1
+        else:
+            selections.append(selection)
+
+    result = summarize(f"{address_format}/{strategy}", samples)
+    if selections:
+        result.update({
+            "mean_inputs": round(statistics.fmean(len(s.inputs) for s in selections), 2),
+            "mean_vbytes": round(statistics.fmean(s.vsize for s in selections), 1),
+            "mean_fee_sat": round(statistics.fmean(s.fee for s in selections), 1),
+            "mean_waste_sat": round(statistics.fmean(s.waste for s in selections), 1),
+            "changeless_pct": round(100 * sum(1 for s in selections if not s.change) / len(selections), 1),
+        })
+    result["failures"] = failures
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utxos", type=int, nargs="+", default=[1000, 10000], help="Pool sizes to test")
+    parser.add_argument("--payments", type=int, default=50, help="Withdrawals selected per case")
+    parser.add_argument("--fee-rate", type=float, default=12, help="Fee rate in sat/vB")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the synthetic pools")
+    parser.add_argument("--only", default="", help="Run only cases whose name contains this text")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    strategies = list(STRATEGIES) + ["auto"]
+    results = []
+    for size in args.utxos:
+        rng = random.Random(args.seed)
+        pool = synthetic_pool(size, rng)
+        amounts = payment_amounts(args.payments, rng)
+        for address_format in ADDRESS_FORMATS:
+            for strategy in strategies:
+                if args.only not in f"{address_format}/{strategy}":
+                    continue
+                result = run_case(pool, amounts, args.fee_rate, address_format, strategy)
+                result["utxos"] = size
+                results.append(result)
+                print(
+                    f"{size:>6} {result['name']:<22} p50 {result['p50_ms']:>9.3f} ms  "
+                    f"inputs {result.get('mean_inputs', 0):>6}  vB {result.get('mean_vbytes', 0):>8}  "
+                    f"fee {result.get('mean_fee_sat', 0):>9}  changeless {result.get('changeless_pct', 0):>5}%",
+                    file=sys.stderr
+                )
+
+    report = {
+        "benchmark": "coin_selection",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fee_rate": args.fee_rate,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
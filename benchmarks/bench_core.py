@@ -0,0 +1,124 @@
+"""
+End-to-end latency benchmark for the Python wrappers in chains/util.py.
+
+Every case is timed call by call and summarised as p50/p95/p99 latency and
+throughput. The spawn_* cases run the same operations through one-shot
+subprocesses (spawn) so the process-spawn overhead is visible next
+to the persistent worker. Results are printed as JSON and can be written
+to a file with --output so runs can be compared over time.
+
+Usage (from the repository root, with go-core/core.exe built):
+    python benchmarks/bench_core.py [--iterations 50] [--only derive] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chains import util  # noqa: E402
+
+MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+PASSWORD = "benchmark-password"
+PRIVATE_KEY = "1" * 64
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(name: str, samples: list) -> dict:
+    """Latency percentiles in milliseconds and throughput for one case"""
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "iterations": len(samples),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "ops_per_sec": round(len(samples) / sum(samples), 2),
+    }
+
+
+def run_case(name: str, fn, iterations: int, warmup: int = 2) -> dict:
+    """Time fn iterations times after a short warmup"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(name, samples)
+
+
+def spawn(args: list) -> str:
+    """Run one core.exe command in its own process, as before the persistent worker existed"""
+    result = subprocess.run([str(util.GO_CORE_PATH)] + args, check=True, capture_output=True, text=True, timeout=5)
+    return result.stdout.strip()
+
+
+def build_cases() -> dict:
+    encrypted = util.encrypt_key(PRIVATE_KEY, PASSWORD)
+    return {
+        # Bridge overhead: round trip through the worker with no crypto
+        "worker_ping": lambda: util.call_core("ping"),
+        "generate_mnemonic": util.generate_mnemonic,
+        "derive_key_eth": lambda: util.derive_key(MNEMONIC),
+        "derive_btc_legacy": lambda: util.derive_btc(MNEMONIC, "legacy"),
+        "derive_btc_segwit": lambda: util.derive_btc(MNEMONIC, "segwit"),
+        "derive_btc_bech32": lambda: util.derive_btc(MNEMONIC, "bech32"),
+        "derive_sol": lambda: util.derive_sol(MNEMONIC),
+        # Every chain and Bitcoin format in one call
+        "derive_all": lambda: util.derive_all(MNEMONIC),
+        "derive_all_cold": lambda: (util.clear_key_cache(), util.derive_all(MNEMONIC)),
+        # Cold derivation pays the PBKDF2 seed stretch again
+        "derive_key_eth_cold": lambda: (util.clear_key_cache(), util.derive_key(MNEMONIC)),
+        "derive_range_eth_1000": lambda: list(util.derive_range("eth", MNEMONIC, count=1000)),
+        "encrypt_key": lambda: util.encrypt_key(PRIVATE_KEY, PASSWORD),
+        "decrypt_key": lambda: util.decrypt_key(encrypted, PASSWORD),
+        # One process per call, as before the persistent worker existed
+        "spawn_generate_mnemonic": lambda: spawn(["generate-mnemonic"]),
+        "spawn_derive_key_eth": lambda: spawn(["derive-key", MNEMONIC]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per case")
+    parser.add_argument("--only", default="", help="Run only cases whose name contains this text")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    cases = {name: fn for name, fn in build_cases().items() if args.only in name}
+    results = []
+    for name, fn in cases.items():
+        result = run_case(name, fn, args.iterations)
+        results.append(result)
+        print(f"{name:<26} p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms  {result['ops_per_sec']:>10.2f} ops/s", file=sys.stderr)
+    util.get_worker().close()
+
+    report = {
+        "benchmark": "go_core_bridge",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
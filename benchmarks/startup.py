@@ -0,0 +1,77 @@
+"""
+Cold-start budget check for cli.py.
+
+Spawns a fresh interpreter that imports the CLI several times and fails
+if the median import time exceeds the budget, or if importing the CLI
+pulls in a chain backend that should only load on first use.
+
+Usage (from the repository root):
+    python benchmarks/startup.py [--budget-ms 250] [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must not be imported until a chain mode is entered
+LAZY_MODULES = ["web3", "eth_account", "bitcoinlib", "utils.ethereum_mode", "utils.bitcoin_mode"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import cli
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once() -> dict:
+    """Import cli in a new interpreter and report its import time and eager modules"""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=REPO_ROOT,
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=250, help="Maximum median import time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(run["import_ms"] for run in runs)
+    loaded = sorted({module for run in runs for module in run["loaded"]})
+
+    print(json.dumps({
+        "benchmark": "cli_startup",
+        "runs": args.runs,
+        "median_ms": round(median_ms, 2),
+        "max_ms": round(max(run["import_ms"] for run in runs), 2),
+        "budget_ms": args.budget_ms,
+        "eager_modules": loaded,
+    }, indent=2))
+
+    failures = []
+    if loaded:
+        failures.append(f"cli.py eagerly imports {', '.join(loaded)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.1f} ms exceeds budget of {args.budget_ms:g} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
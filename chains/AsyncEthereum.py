@@ -0,0 +1,419 @@
+import asyncio
+import secrets
+from aiohttp import ClientTimeout
+from web3 import AsyncWeb3, Web3
+from web3.providers import AsyncHTTPProvider
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from .util import call_core_async
+from .session import KeySession, DEFAULT_IDLE_TIMEOUT
+from .nonce import NonceManager
+from .fee_oracle import FeeOracle, NoBaseFeeError, TIERS
+
+# In-flight RPC requests per client
+DEFAULT_MAX_CONCURRENCY = 64
+# Seconds before an RPC request is abandoned
+DEFAULT_TIMEOUT = 15
+
+
+class AsyncEthereumchain:
+    """
+    asyncio counterpart of Ethereumchain.
+
+    Methods have the same names, arguments and results as the synchronous
+    client but are coroutines, so thousands of reads can be in flight from
+    one event loop. At most max_concurrency RPC requests run at once; the
+    rest wait on a semaphore. Go core calls (derivation, encryption) are
+    awaited on the shared worker without tying up a thread.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str = "",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        """Initialize Ethereum chain connection with optional RPC URL."""
+        self.rpc_url = rpc_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._w3 = None
+        self._semaphore = None
+        self._chain_id = None
+        self._nonce_lock = None
+        # The shared helpers fetch through this client, so they are never asked to fetch themselves
+        self.nonces = NonceManager(None)
+        self.fee_oracle = FeeOracle(None)
+        # Unlocked signer reused across sends, see unlock_wallet()
+        self.session = KeySession(Account.from_key)
+
+    @property
+    def w3(self) -> AsyncWeb3:
+        """AsyncWeb3 connection, created on first use."""
+        if self._w3 is None:
+            try:
+                self._w3 = AsyncWeb3(AsyncHTTPProvider(
+                    self.rpc_url,
+                    request_kwargs={"timeout": ClientTimeout(total=self.timeout)}
+                ))
+            except Exception as e:
+                raise ConnectionError(f"Failed to connect to Ethereum node: {str(e)}")
+        return self._w3
+
+    async def _rpc(self, awaitable):
+        """Await an RPC call once a concurrency slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await awaitable
+
+    async def close(self):
+        """Close the HTTP session."""
+        if self._w3 is not None:
+            await self._w3.provider.disconnect()
+            self._w3 = None
+
+    async def chain_id(self) -> int:
+        """Chain ID of the connected network, fetched once per connection."""
+        if self._chain_id is None:
+            self._chain_id = await self._rpc(self.w3.eth.chain_id)
+        return self._chain_id
+
+    async def create_wallet(self, mnemonic: str) -> dict:
+        """
+        Generate Ethereum Wallet using Go core.
+
+        Args:
+            mnemonic (str): The mnemonic phrase to derive keys from
+
+        Returns:
+            dict: Contains the address and private key
+        """
+        try:
+            result = await call_core_async("derive-key", mnemonic=mnemonic)
+            return {"address": result["address"], "private_key": result["private_key"]}
+        except Exception as e:
+            raise ValueError(f"Failed to create wallet: {str(e)}")
+
+    async def get_balance(self, address: str) -> float:
+        """
+        Get ETH balance for address.
+
+        Args:
+            address (str): The Ethereum address to check balance for
+
+        Returns:
+            float: Balance in ether
+        """
+        try:
+            balance_wei = await self._rpc(self.w3.eth.get_balance(address))
+            return Web3.from_wei(balance_wei, "ether")
+        except Exception as e:
+            raise ValueError(f"Failed to get balance: {str(e)}")
+
+    async def get_balances(self, addresses: list, block="latest") -> dict:
+        """
+        Get ETH balances for many addresses concurrently.
+
+        Args:
+            addresses (list): Ethereum addresses to check
+            block (str | int): Block tag or number to read balances at
+
+        Returns:
+            dict: Maps each address, in input order, to (balance in ether, None)
+                  or (None, error message)
+        """
+        async def lookup(address: str) -> tuple:
+            if not Web3.is_address(address):
+                return None, "invalid address"
+            try:
+                balance_wei = await self._rpc(
+                    self.w3.eth.get_balance(Web3.to_checksum_address(address), block)
+                )
+                return Web3.from_wei(balance_wei, "ether"), None
+            except Exception as e:
+                return None, str(e)
+
+        unique = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(*(lookup(address) for address in unique))
+        return dict(zip(unique, results))
+
+    async def get_transaction_count(self, address: str) -> int:
+        """
+        Get the number of transactions sent from address.
+
+        Args:
+            address (str): The Ethereum address to check
+
+        Returns:
+            int: Transaction count (the account nonce)
+        """
+        try:
+            return await self._rpc(self.w3.eth.get_transaction_count(address))
+        except Exception as e:
+            raise ValueError(f"Failed to get transaction count: {str(e)}")
+
+    async def get_fee_estimates(self) -> dict:
+        """
+        Get EIP-1559 fee estimates for every tier.
+
+        Returns:
+            dict: tier -> maxFeePerGas, maxPriorityFeePerGas and baseFeePerGas in Gwei
+        """
+        try:
+            await self._rpc(self.fee_oracle.refresh_async(self.w3))
+            return {
+                tier: {key: Web3.from_wei(value, "gwei") for key, value in fees.items()}
+                for tier, fees in self.fee_oracle.estimates(refresh=False).items()
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to get fee estimates: {str(e)}")
+
+    async def encrypt_wallet(self, private_key: str, password: str = None) -> dict:
+        """
+        Encrypt the wallet's private key with a password.
+
+        Args:
+            private_key (str): The private key to encrypt
+            password (str, optional): The password to use for encryption. If None, a password will be generated.
+
+        Returns:
+            dict: Contains the encrypted key and password reference
+        """
+        try:
+            password = password or secrets.token_hex(16)
+            encrypted_key = await call_core_async("encrypt", private_key=private_key, password=password)
+            return {
+                "encrypted_key": encrypted_key,
+                "password_reference": password
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to encrypt wallet: {str(e)}")
+
+    async def decrypt_wallet(self, encrypted_key: str, password: str) -> str:
+        """
+        Decrypt the wallet's private key with a password.
+
+        Args:
+            encrypted_key (str): The encrypted private key
+            password (str): The password to decrypt the key
+
+        Returns:
+            str: The decrypted private key
+        """
+        try:
+            return await call_core_async("decrypt", encrypted_key=encrypted_key, password=password)
+        except Exception as e:
+            raise ValueError(f"Failed to decrypt wallet: {str(e)}")
+
+    async def unlock_wallet(
+        self,
+        encrypted_key: str,
+        password: str,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ) -> str:
+        """
+        Decrypt the wallet once and keep its signer in memory.
+
+        Args:
+            encrypted_key (str): The encrypted private key
+            password (str): The password to decrypt the key
+            idle_timeout (float): Seconds of inactivity before the key is wiped
+
+        Returns:
+            str: Address of the unlocked account
+        """
+        private_key = await self.decrypt_wallet(encrypted_key, password)
+        try:
+            self.session.idle_timeout = idle_timeout
+            self.session.load(encrypted_key, private_key)
+            return self.session.signer().address
+        except Exception as e:
+            raise ValueError(f"Failed to unlock wallet: {str(e)}")
+
+    def lock_wallet(self):
+        """Wipe the unlocked signer, if any."""
+        self.session.lock()
+
+    async def _get_account(self, encrypted_privkey: str, password: str):
+        """Return the signer for encrypted_privkey, decrypting only if it is not unlocked."""
+        account = self.session.signer(encrypted_privkey)
+        if account is None:
+            account = Account.from_key(await self.decrypt_wallet(encrypted_privkey, password))
+        return account
+
+    async def sign_message(self, encrypted_privkey: str, password: str, message: str) -> str:
+        """
+        Sign a text message (EIP-191 personal_sign).
+
+        Args:
+            encrypted_privkey (str): Encrypted private key
+            password (str): Password to decrypt the key, unused if the wallet is unlocked
+            message (str): Message to sign
+
+        Returns:
+            str: Signature in hex format
+        """
+        try:
+            account = await self._get_account(encrypted_privkey, password)
+            return account.sign_message(encode_defunct(text=message)).signature.hex()
+        except Exception as e:
+            raise ValueError(f"Failed to sign message: {str(e)}")
+
+    async def _allocate_nonce(self, address: str) -> int:
+        """Next nonce for address, syncing from the node on first use."""
+        if self._nonce_lock is None:
+            self._nonce_lock = asyncio.Lock()
+        async with self._nonce_lock:
+            if not self.nonces.is_synced(address):
+                pending = await self._rpc(self.w3.eth.get_transaction_count(address, "pending"))
+                self.nonces.resync(address, pending)
+            return self.nonces.allocate(address)
+
+    async def build_transaction(
+        self,
+        from_address: str,
+        to_address: str,
+        amount,
+        nonce: int,
+        gas_limit: int = 21000,
+        gas_price: int = None,
+        fee_tier: str = "normal"
+    ) -> dict:
+        """
+        Build an unsigned ETH transfer, see Ethereumchain.build_transaction().
+
+        Returns:
+            dict: Transaction fields ready for sign_transaction()
+        """
+        if fee_tier not in TIERS:
+            raise ValueError(f"Unknown fee tier: {fee_tier} (use {', '.join(TIERS)})")
+        tx = {
+            "from": from_address,
+            "to": Web3.to_checksum_address(to_address),
+            "value": Web3.to_wei(amount, "ether"),
+            "gas": gas_limit,
+            "nonce": nonce,
+            "chainId": await self.chain_id()
+        }
+        if gas_price is None:
+            try:
+                await self._rpc(self.fee_oracle.refresh_async(self.w3))
+                fees = self.fee_oracle.estimate(fee_tier, refresh=False)
+                tx.update({
+                    "type": 2,
+                    "maxFeePerGas": fees["maxFeePerGas"],
+                    "maxPriorityFeePerGas": fees["maxPriorityFeePerGas"]
+                })
+                return tx
+            except NoBaseFeeError:
+                # Pre-London network, fall back to a legacy transaction
+                gas_price = await self._rpc(self.w3.eth.gas_price)
+        tx["gasPrice"] = gas_price
+        return tx
+
+    def sign_transaction(self, account, tx: dict) -> str:
+        """
+        Sign a transaction offline.
+
+        Returns:
+            str: Raw signed transaction in hex format
+        """
+        return "0x" + account.sign_transaction(tx).raw_transaction.hex().removeprefix("0x")
+
+    async def broadcast_transaction(self, raw_tx: str) -> str:
+        """
+        Submit a signed transaction to the network.
+
+        Returns:
+            str: Transaction hash
+        """
+        tx_hash = await self._rpc(self.w3.eth.send_raw_transaction(raw_tx))
+        return "0x" + tx_hash.hex().removeprefix("0x")
+
+    async def send_transaction(
+        self,
+        encrypted_privkey: str,
+        password: str,
+        to_address: str,
+        amount: float,
+        gas_limit: int = 21000,
+        gas_price_gwei: float = None,
+        fee_tier: str = "normal"
+    ) -> str:
+        """
+        Decrypt key and send ETH.
+
+        Args:
+            encrypted_privkey (str): Encrypted private key
+            password (str): Password to decrypt the key, unused if the wallet is unlocked
+            to_address (str): Recipient address
+            amount (float): Amount of ETH to send
+            gas_limit (int): Gas limit for transaction
+            gas_price_gwei (float): Legacy gas price in Gwei, overrides fee_tier
+            fee_tier (str): EIP-1559 fee tier, "slow", "normal" or "fast"
+
+        Returns:
+            str: Transaction hash
+        """
+        try:
+            account = await self._get_account(encrypted_privkey, password)
+            gas_price = None if gas_price_gwei is None else Web3.to_wei(gas_price_gwei, "gwei")
+
+            # A stale nonce is retried once after resyncing from the node
+            for attempt in range(2):
+                nonce = await self._allocate_nonce(account.address)
+                try:
+                    tx = await self.build_transaction(
+                        account.address, to_address, amount, nonce, gas_limit, gas_price, fee_tier
+                    )
+                    raw_tx = self.sign_transaction(account, tx)
+                except Exception:
+                    # Nothing was sent, the nonce is still free
+                    self.nonces.release(account.address, nonce)
+                    raise
+                try:
+                    return await self.broadcast_transaction(raw_tx)
+                except Exception as e:
+                    if not self.nonces.handle_error(account.address, nonce, e) or attempt:
+                        raise
+        except Exception as e:
+            raise ValueError(f"Failed to send transaction: {str(e)}")
+
+    async def get_transaction_status(self, tx_hash: str) -> dict:
+        """
+        Get transaction status and details.
+
+        The transaction, its receipt and the head block are fetched concurrently.
+
+        Args:
+            tx_hash (str): Transaction hash to check
+
+        Returns:
+            dict: Transaction details including status
+        """
+        async def receipt_or_none():
+            try:
+                return await self._rpc(self.w3.eth.get_transaction_receipt(tx_hash))
+            except Exception:
+                # Transaction not yet mined
+                return None
+
+        try:
+            tx, receipt, head = await asyncio.gather(
+                self._rpc(self.w3.eth.get_transaction(tx_hash)),
+                receipt_or_none(),
+                self._rpc(self.w3.eth.block_number)
+            )
+            return {
+                "hash": tx_hash,
+                "from": tx["from"],
+                "to": tx["to"],
+                "value": Web3.from_wei(tx["value"], "ether"),
+                "block_number": receipt["blockNumber"] if receipt else None,
+                "status": "confirmed" if receipt and receipt["status"] == 1 else
+                          "failed" if receipt and receipt["status"] == 0 else "pending",
+                "confirmations": head - receipt["blockNumber"] if receipt else 0
+            }
+        except Exception as e:
+            return {"hash": tx_hash, "status": "error", "error": str(e)}
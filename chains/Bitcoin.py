@@ -1,17 +1,98 @@
-from bitcoinlib.wallets import Wallet as BtcWallet
-from bitcoinlib.wallets import wallet_create_or_open
+from bitcoinlib.keys import Key
 from bitcoinlib.transactions import Transaction
 from bitcoinlib.services.services import Service
-from .util import  encrypt_key, decrypt_key,derive_btc
+from .util import  encrypt_key, decrypt_key,derive_all
+from .session import KeySession, DEFAULT_IDLE_TIMEOUT
+from .rpc_cache import RpcCache, IMMUTABLE, LATEST
+from .utxo import UtxoSet
+from .coin_selection import select_coins, output_format
+from .btc_fees import FeeEstimator, FEE_TARGETS
+
+# Seconds balance and history reads are reused; blocks come every ~10 minutes
+BTC_LATEST_TTL = 30
+# Confirmations after which a transaction is cached for good
+BTC_SAFE_DEPTH = 6
+
+# Address format -> (bitcoinlib script type, input witness type, encoding)
+ADDRESS_FORMATS = {
+    "legacy": ("p2pkh", "legacy", "base58"),
+    "segwit": ("p2sh_p2wpkh", "p2sh-segwit", "base58"),
+    "bech32": ("p2wpkh", "segwit", "bech32"),
+}
+
 class BitcoinClient:
     def __init__(self,network="bitcoin"):
         self.network=network
-        self.service = Service(network=self.network)
+        self._service = None
+        # Repeated Service reads are answered locally, see cache_stats()
+        self.cache = RpcCache(latest_ttl=BTC_LATEST_TTL)
+        # Unspent outputs of the addresses we send from
+        self.utxos = UtxoSet(lambda: self.service)
+        # sat/vB estimates per confirmation target, reused for FEE_CACHE_TTL
+        self.fees = FeeEstimator(lambda: self.service)
+        # Multi-address balance lookups, created on first get_balances()
+        self._balance_scanner = None
+        # Unlocked key reused across sends, see unlock_wallet()
+        self.session = KeySession(lambda private_key: private_key)
+    
+    @property
+    def service(self) -> Service:
+        """bitcoinlib Service for the network, created on first use."""
+        if self._service is None:
+            self._service = Service(network=self.network)
+        return self._service
+    
+    def _cached(self, method: str, *args):
+        """
+        Call a Service method through the response cache.
+        
+        Transactions with BTC_SAFE_DEPTH confirmations are kept until evicted;
+        everything else is reused until the next block or BTC_LATEST_TTL.
+        """
+        key = RpcCache.key(method, args)
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        value = getattr(self.service, method)(*args)
+        if value is None or value is False:
+            return value  # Service failure, not worth remembering
+        if method == "blockcount":
+            self.cache.set_head(value)
+        confirmed = method == "gettransaction" and (value.confirmations or 0) >= BTC_SAFE_DEPTH
+        self.cache.put(key, value, IMMUTABLE if confirmed else LATEST)
+        return value
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters and sizes of the Service response cache."""
+        return self.cache.stats()
     
     def create_wallet(mnemonic:str,witness_type="legacy")->dict:
-        """Generate Bitcoin wallet using Go core."""
-        address, privkey_wif = derive_btc(mnemonic,  witness_type=witness_type)
-        return {"address": address, "private_key": privkey_wif}
+        """
+        Generate Bitcoin wallet using Go core.
+        
+        The addresses of every format are derived together, so switching
+        the wallet's format later is a lookup in "addresses".
+        
+        Returns:
+            dict: address in witness_type format, private_key, public_key and addresses
+        """
+        keys = derive_all(mnemonic)["btc"]
+        addresses = keys["addresses"]
+        return {
+            "address": addresses.get(witness_type, addresses["legacy"]),
+            "private_key": keys["private_key"],
+            "public_key": keys["public_key"],
+            "addresses": addresses
+        }
+    
+    @staticmethod
+    def address_formats(private_key: str, network: str = "bitcoin") -> dict:
+        """Addresses of private_key in every format, for keys loaded without a mnemonic."""
+        key = Key(private_key, network=network)
+        return {
+            address_format: key.address(script_type=script_type, encoding=encoding)
+            for address_format, (script_type, _, encoding) in ADDRESS_FORMATS.items()
+        }
     
     def encrypt_wallet(self, private_key: str, password: str = None) -> dict:
         """
@@ -58,54 +139,222 @@ class BitcoinClient:
         except Exception as e:
             raise ValueError(f"Failed to decrypt wallet: {str(e)}")
         
+    def unlock_wallet(
+        self,
+        encrypted_key: str,
+        password: str,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ):
+        """
+        Decrypt the wallet once and keep the key in memory for later sends.
+        
+        Args:
+            encrypted_key (str): The encrypted private key
+            password (str): The password to decrypt the key
+            idle_timeout (float): Seconds of inactivity before the key is wiped
+        """
+        try:
+            self.session.idle_timeout = idle_timeout
+            self.session.unlock(encrypted_key, password)
+        except Exception as e:
+            raise ValueError(f"Failed to unlock wallet: {str(e)}")
+    
+    def lock_wallet(self):
+        """Wipe the unlocked key, if any."""
+        self.session.lock()
+        
     def get_balance(self, address: str) -> float:
         """Get BTC balance for address."""
-        balance_satoshi = self.service.getbalance(address)
+        balance_satoshi = self._cached("getbalance", address)
         return balance_satoshi / 100000000  # Convert satoshis to BTC
     
+    def get_balances(self, addresses: list, max_workers: int = None) -> dict:
+        """
+        Get BTC balances for many addresses.
+        
+        Providers that accept a list of addresses answer in batches; the
+        rest are looked up concurrently on a bounded thread pool with
+        per-provider rate limits. Cached balances are reused and a failing
+        address does not stop the lookup.
+        
+        Args:
+            addresses (list): Bitcoin addresses to check
+            max_workers (int): Concurrent per-address lookups, DEFAULT_BALANCE_WORKERS if None
+            
+        Returns:
+            dict: Maps each address, in input order, to (balance in BTC, None)
+                  or (None, error message)
+        """
+        from .btc_balances import BalanceScanner
+        try:
+            if self._balance_scanner is None:
+                # Kept so rate limits hold across calls
+                self._balance_scanner = BalanceScanner(self)
+            if max_workers:
+                self._balance_scanner.max_workers = max_workers
+            return self._balance_scanner.get_balances(addresses)
+        except Exception as e:
+            raise ValueError(f"Failed to get balances: {str(e)}")
+    
+    def has_history(self, address: str) -> bool:
+        """Check whether address appears in any transaction."""
+        return len(self._cached("gettransactions", address, "", 1) or []) > 0
+    
     def send_transaction(
         self, 
         encrypted_privkey: str, 
         password: str, 
         to_address: str, 
         amount: float,
-        fee: int = 500 
+        fee: int = None,
+        from_address: str = None,
+        fee_rate: float = None,
+        strategy: str = "auto"
     )->str:
-        """Decrypt key and send BTC."""
-        # Decrypt using Go core
-        privkey= self.decrypt_wallet(encrypted_privkey, password)
-        
-        # Import key to temporary wallet
-        wallet_name = f"temp_{to_address[:8]}"
-        wallet = wallet_create_or_open(
-            wallet_name,
-            keys=privkey,
-            network=self.network,
-            witness_type='segwit'  # Use segwit for lower fees
-        )
+        """
+        Decrypt key (unless unlocked) and send BTC.
         
-        # Update wallet UTXOs
-        wallet.scan()
+        Inputs are picked by the coin selection engine from the incrementally
+        synced UTXO pool; the transaction is built and signed in memory and
+        sent with one broadcast, no bitcoinlib wallet is created.
         
-        # Build and send transaction
-        amount_satoshi = int(amount * 100000000)  # Convert BTC to satoshis
-        tx = wallet.send_to(to_address, amount_satoshi, fee=fee)
+        Args:
+            encrypted_privkey (str): Encrypted WIF private key
+            password (str): Password to decrypt the key, unused if the wallet is unlocked
+            to_address (str): Recipient address
+            amount (float): Amount of BTC to send
+            fee (int): Flat fee in satoshis, overriding fee_rate
+            from_address (str): Address of the key to spend from, which also
+                                selects its format; native SegWit if None
+            fee_rate (float): Fee in sat/vB, priced on the exact size of the
+                              transaction; the "normal" estimate if None
+            strategy (str): Coin selection strategy, see coin_selection.STRATEGIES
+            
+        Returns:
+            str: Transaction ID
+        """
+        try:
+            privkey = self.session.signer(encrypted_privkey)
+            if privkey is None:
+                # Decrypt using Go core
+                privkey = self.decrypt_wallet(encrypted_privkey, password)
+            key = Key(privkey, network=self.network)
+            address_format, from_address = self._key_format(key, from_address)
+            _, witness_type, _ = ADDRESS_FORMATS[address_format]
+            
+            amount_satoshi = int(round(amount * 100000000))  # Convert BTC to satoshis
+            utxos = self.utxos.sync(from_address)
+            if fee is not None:
+                # A flat fee does not depend on the size, select for amount plus fee at no rate
+                selection = select_coins(
+                    utxos, amount_satoshi + fee, 0, address_format, to_address, strategy, long_term_fee_rate=0
+                )
+            else:
+                if fee_rate is None:
+                    fee_rate = self.fees.fee_rate(FEE_TARGETS["normal"])
+                selection = select_coins(utxos, amount_satoshi, fee_rate, address_format, to_address, strategy)
+            
+            tx = Transaction(network=self.network, witness_type="legacy" if witness_type == "legacy" else "segwit")
+            for utxo in selection.inputs:
+                tx.add_input(utxo["txid"], utxo["output_n"], keys=key, value=utxo["value"], witness_type=witness_type)
+            tx.add_output(amount_satoshi, to_address)
+            if selection.change:
+                tx.add_output(selection.change, from_address)
+            tx.sign(key)
+            raw_tx = tx.raw_hex()
+            
+            if not self.service.sendrawtransaction(raw_tx):
+                # Inputs may have been spent elsewhere, reload them before the next send
+                self.utxos.invalidate(from_address)
+                raise ConnectionError(f"Broadcast rejected: {self.service.errors}")
+            # bitcoinlib does not refresh the txid after signing, read it back from the raw bytes
+            txid = Transaction.parse_hex(raw_tx, network=self.network).txid
+            
+            self.utxos.spend(selection.inputs)
+            if selection.change:
+                self.utxos.add(from_address, txid, 1, selection.change)
+            # Cached balances of the sender are outdated now
+            self.cache.invalidate_latest()
+            return txid
+        except Exception as e:
+            raise ValueError(f"Failed to send transaction: {str(e)}")
+    
+    def estimate_fees(self, priorities: list = None) -> dict:
+        """
+        Get fee rate estimates for each priority.
         
-        # Clean up - delete temporary wallet
-        wallet.delete_wallet()
+        Args:
+            priorities (list): Priorities to estimate, all of FEE_TARGETS if None
+            
+        Returns:
+            dict: Priority (fast, normal, slow) -> sat/vB
+        """
+        try:
+            if priorities:
+                return self.fees.estimates({priority: FEE_TARGETS[priority] for priority in priorities})
+            return self.fees.estimates()
+        except Exception as e:
+            raise ValueError(f"Failed to estimate fees: {str(e)}")
+    
+    def select_inputs(
+        self,
+        address: str,
+        amount: float,
+        fee_rate: float = None,
+        to_address: str = None,
+        strategy: str = "auto"
+    ):
+        """
+        Preview the inputs, fee and change a send from address would use.
         
-        return tx.txid
+        Args:
+            address (str): Address to spend from; its format sets the input size
+            amount (float): Amount of BTC to send
+            fee_rate (float): Fee in sat/vB, the "normal" estimate if None
+            to_address (str): Recipient, an output like address is assumed if None
+            strategy (str): Coin selection strategy or "auto"
+            
+        Returns:
+            Selection: Chosen inputs with fee, change, vsize and waste
+        """
+        try:
+            address_format = output_format(address)
+            if address_format not in ADDRESS_FORMATS:
+                raise ValueError(f"Cannot spend from {address}")
+            utxos = self.utxos.sync(address)
+            if fee_rate is None:
+                fee_rate = self.fees.fee_rate(FEE_TARGETS["normal"])
+            return select_coins(utxos, int(round(amount * 100000000)), fee_rate, address_format, to_address, strategy)
+        except Exception as e:
+            raise ValueError(f"Failed to select inputs: {str(e)}")
+    
+    def _key_format(self, key: Key, address: str = None) -> tuple:
+        """Return (format, address) of key matching address, or bech32 if address is None."""
+        for address_format, (script_type, _, encoding) in ADDRESS_FORMATS.items():
+            key_address = key.address(script_type=script_type, encoding=encoding)
+            if address is None and address_format == "bech32" or key_address == address:
+                return address_format, key_address
+        raise ValueError(f"Private key does not control {address}")
+    
     def get_transaction_info(self, tx_hash):
         """Get transaction details from hash."""
         try:
-          tx = self.service.gettransaction(tx_hash)
+          tx = self._cached("gettransaction", tx_hash)
+          if not tx:
+            raise ValueError("Transaction not found")
+          confirmations = tx.confirmations or 0
+          if tx.block_height and confirmations >= BTC_SAFE_DEPTH:
+            # Cached transactions keep their old count, derive it from the head
+            head = self._cached("blockcount")
+            if head:
+              confirmations = max(confirmations, head - tx.block_height + 1)
           return {
             "hash": tx_hash,
-            "confirmations": tx.get("confirmations", 0),
-            "time": tx.get("time"),
-            "amount": tx.get("amount"),
-            "fee": tx.get("fee"),
-            "status": "confirmed" if tx.get("confirmations", 0) > 0 else "pending"
+            "confirmations": confirmations,
+            "time": tx.date,
+            "amount": tx.output_total,
+            "fee": tx.fee,
+            "status": "confirmed" if confirmations > 0 else "pending"
           }
         except Exception as e:
           return {"hash": tx_hash, "status": "error", "error": str(e)}
@@ -2,19 +2,103 @@ from web3 import Web3
 from .util import derive_key, encrypt_key, decrypt_key
 from py_types.wallet import Wallet
 from eth_account import Account
+from eth_account.messages import encode_defunct
+from .session import KeySession, DEFAULT_IDLE_TIMEOUT
+from .provider import FailoverHTTPProvider, WRITE_METHODS
+from .rpc_cache import RpcCache
+from .nonce import NonceManager
+from .fee_oracle import FeeOracle, NoBaseFeeError, TIERS
 #from web3.middleware import geth_poa_middleware
 import json
 
+# Addresses per JSON-RPC batch; most providers cap batches at 100-1000 calls
+DEFAULT_BATCH_SIZE = 100
+
 class Ethereumchain:
-    def __init__(self, rpc_url=""):
-        """Initialize Ethereum chain connection with optional RPC URL."""
+    def __init__(self, rpc_url="", ws_url=None):
+        """
+        Initialize Ethereum chain connection with optional RPC URL.
+        
+        rpc_url may also be a list of URLs in order of preference; requests
+        fail over to the next one when an endpoint is down. With ws_url, new
+        heads are pushed over WebSocket instead of polled, see subscribe_heads().
+        """
         "https://mainnet.infura.io/v3/37f0d54ba4384c3ab9c33d69ae94c604"
-        try:
-            self.w3 = Web3(Web3.HTTPProvider(rpc_url))
-            # Add middleware for POA chains like BSC, Polygon
-            #self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        except Exception as e:
-            raise ConnectionError(f"Failed to connect to Ethereum node: {str(e)}")
+        urls = [rpc_url] if isinstance(rpc_url, str) else list(rpc_url)
+        # Repeated reads within a block are answered locally, see cache_stats()
+        self.cache = RpcCache()
+        self.provider = FailoverHTTPProvider([url for url in urls if url], cache=self.cache)
+        self._w3 = None
+        self._chain_id = None
+        # Nonces are handed out locally after one sync per account
+        self.nonces = NonceManager(lambda address: self.w3.eth.get_transaction_count(address, "pending"))
+        # EIP-1559 fee estimates shared by every send on this connection
+        self.fee_oracle = FeeOracle(lambda: self.w3)
+        # Unlocked signer reused across sends, see unlock_wallet()
+        self.session = KeySession(Account.from_key)
+        # Optional newHeads feed driving cache invalidation and waiters
+        self.heads = None
+        if ws_url:
+            self.subscribe_heads(ws_url)
+    
+    @property
+    def rpc_url(self) -> str:
+        """URL of the endpoint requests currently go to."""
+        return self.provider.primary_url
+    
+    @property
+    def w3(self) -> Web3:
+        """Web3 connection, created on first use."""
+        if self._w3 is None:
+            try:
+                self._w3 = Web3(self.provider)
+                # Add middleware for POA chains like BSC, Polygon
+                #self._w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+            except Exception as e:
+                raise ConnectionError(f"Failed to connect to Ethereum node: {str(e)}")
+        return self._w3
+
+    @property
+    def chain_id(self) -> int:
+        """Chain ID of the connected network, fetched once per connection."""
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def subscribe_heads(self, ws_url: str, pending: bool = False):
+        """
+        Receive new heads over a WebSocket eth_subscribe feed.
+        
+        Each head invalidates cached latest reads such as balances and wakes
+        threads waiting on self.heads.wait_for_head(); TxWatcher and the CLI
+        use it instead of polling eth_blockNumber.
+        
+        Args:
+            ws_url (str): ws:// or wss:// endpoint of the same network
+            pending (bool): Also report pending transactions of tracked addresses
+            
+        Returns:
+            HeadSubscriber: The running feed, also kept as self.heads
+            
+        Raises:
+            ConnectionError: If the subscription cannot be set up
+        """
+        from .ws import HeadSubscriber
+        self.unsubscribe_heads()
+        heads = HeadSubscriber(ws_url, cache=self.cache, pending=pending)
+        heads.start()
+        self.heads = heads
+        return heads
+    
+    def unsubscribe_heads(self):
+        """Stop the WebSocket head feed, if any, and go back to polling."""
+        if self.heads is not None:
+            self.heads.stop()
+            self.heads = None
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters and sizes of the RPC response cache."""
+        return self.cache.stats()
 
     def create_wallet(self, mnemonic: str) -> dict:
         """
@@ -48,6 +132,142 @@ class Ethereumchain:
         except Exception as e:
             raise ValueError(f"Failed to get balance: {str(e)}")
     
+    def get_balances(
+        self,
+        addresses: list,
+        block="latest",
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        """
+        Get ETH balances for many addresses with JSON-RPC batch requests.
+        
+        Addresses are sent batch_size per HTTP request through the
+        failover provider. A failing address or batch does not stop the lookup.
+        
+        Args:
+            addresses (list): Ethereum addresses to check
+            block (str | int): Block tag or number to read balances at
+            batch_size (int): Number of eth_getBalance calls per request
+            
+        Returns:
+            dict: Maps each address, in input order, to (balance in ether, None)
+                  or (None, error message)
+        """
+        block_id = hex(block) if isinstance(block, int) else block
+        results = {address: None for address in addresses}
+        
+        pending = []
+        for address in results:
+            if Web3.is_address(address):
+                pending.append(address)
+            else:
+                results[address] = (None, "invalid address")
+        
+        for offset in range(0, len(pending), batch_size):
+            chunk = pending[offset:offset + batch_size]
+            calls = [("eth_getBalance", [Web3.to_checksum_address(address), block_id]) for address in chunk]
+            try:
+                replies = self.rpc_batch(calls)
+            except Exception as e:
+                for address in chunk:
+                    results[address] = (None, str(e))
+                continue
+            
+            for address, (result, error) in zip(chunk, replies):
+                if error:
+                    results[address] = (None, error)
+                else:
+                    results[address] = (Web3.from_wei(int(result, 16), "ether"), None)
+        return results
+    
+    def get_token_balances(self, holders: list, tokens: list, block="latest") -> dict:
+        """
+        Get ERC-20 and native balances of many holders via Multicall3.
+        
+        Args:
+            holders (list): Addresses to check
+            tokens (list): py_types.token.Token objects
+            block (str | int): Block tag or number to read balances at
+            
+        Returns:
+            dict: holder -> {contract address (lowercase, "native" for ETH) ->
+                  balance, or None if the call failed}
+        """
+        from .tokens import TokenScanner
+        try:
+            return TokenScanner(self).get_balances(holders, tokens, block)
+        except Exception as e:
+            raise ValueError(f"Failed to get token balances: {str(e)}")
+    
+    def rpc_batch(self, calls: list) -> list:
+        """
+        Send JSON-RPC calls to the node as one batch request.
+        
+        Args:
+            calls (list): (method, params) pairs
+            
+        Returns:
+            list: (result, None) or (None, error message) per call, in call order
+            
+        Raises:
+            ConnectionError: If the batch as a whole fails
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        try:
+            replies = self.provider.request(payload, idempotent=not any(m in WRITE_METHODS for m, _ in calls))
+        except Exception as e:
+            raise ConnectionError(f"Batch request failed: {str(e)}")
+        if not isinstance(replies, list):
+            # Providers answer a rejected batch with a single error object
+            error = replies.get("error", replies) if isinstance(replies, dict) else replies
+            raise ConnectionError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+        
+        by_id = {reply.get("id"): reply for reply in replies}
+        results = []
+        for i in range(len(calls)):
+            reply = by_id.get(i)
+            if reply is None:
+                results.append((None, "missing from batch response"))
+            elif "error" in reply:
+                error = reply["error"]
+                results.append((None, error.get("message", str(error)) if isinstance(error, dict) else str(error)))
+            else:
+                results.append((reply.get("result"), None))
+        return results
+    
+    def get_fee_estimates(self) -> dict:
+        """
+        Get EIP-1559 fee estimates for every tier.
+        
+        Returns:
+            dict: tier -> maxFeePerGas, maxPriorityFeePerGas and baseFeePerGas in Gwei
+        """
+        try:
+            return {
+                tier: {key: self.w3.from_wei(value, "gwei") for key, value in fees.items()}
+                for tier, fees in self.fee_oracle.estimates().items()
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to get fee estimates: {str(e)}")
+    
+    def get_transaction_count(self, address: str) -> int:
+        """
+        Get the number of transactions sent from address.
+        
+        Args:
+            address (str): The Ethereum address to check
+            
+        Returns:
+            int: Transaction count (the account nonce)
+        """
+        try:
+            return self.w3.eth.get_transaction_count(address)
+        except Exception as e:
+            raise ValueError(f"Failed to get transaction count: {str(e)}")
+    
     def encrypt_wallet(self, private_key: str, password: str = None) -> dict:
         """
         Encrypt the wallet's private key with a password.
@@ -93,6 +313,144 @@ class Ethereumchain:
         except Exception as e:
             raise ValueError(f"Failed to decrypt wallet: {str(e)}")
     
+    def unlock_wallet(
+        self,
+        encrypted_key: str,
+        password: str,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ) -> str:
+        """
+        Decrypt the wallet once and keep its signer in memory.
+        
+        Subsequent send_transaction and sign_message calls with the same
+        encrypted key skip decryption until the wallet is locked or has been
+        idle for idle_timeout seconds.
+        
+        Args:
+            encrypted_key (str): The encrypted private key
+            password (str): The password to decrypt the key
+            idle_timeout (float): Seconds of inactivity before the key is wiped
+            
+        Returns:
+            str: Address of the unlocked account
+        """
+        try:
+            self.session.idle_timeout = idle_timeout
+            self.session.unlock(encrypted_key, password)
+            return self.session.signer().address
+        except Exception as e:
+            raise ValueError(f"Failed to unlock wallet: {str(e)}")
+    
+    def lock_wallet(self):
+        """Wipe the unlocked signer, if any."""
+        self.session.lock()
+    
+    def _get_account(self, encrypted_privkey: str, password: str):
+        """Return the signer for encrypted_privkey, decrypting only if it is not unlocked."""
+        account = self.session.signer(encrypted_privkey)
+        if account is None:
+            privkey = self.decrypt_wallet(encrypted_privkey, password)
+            account = self.w3.eth.account.from_key(privkey)
+        return account
+    
+    def sign_message(self, encrypted_privkey: str, password: str, message: str) -> str:
+        """
+        Sign a text message (EIP-191 personal_sign).
+        
+        Args:
+            encrypted_privkey (str): Encrypted private key
+            password (str): Password to decrypt the key, unused if the wallet is unlocked
+            message (str): Message to sign
+            
+        Returns:
+            str: Signature in hex format
+        """
+        try:
+            account = self._get_account(encrypted_privkey, password)
+            signed = account.sign_message(encode_defunct(text=message))
+            return signed.signature.hex()
+        except Exception as e:
+            raise ValueError(f"Failed to sign message: {str(e)}")
+    
+    def build_transaction(
+        self,
+        from_address: str,
+        to_address: str,
+        amount,
+        nonce: int,
+        gas_limit: int = 21000,
+        gas_price: int = None,
+        fee_tier: str = "normal"
+    ) -> dict:
+        """
+        Build an unsigned ETH transfer.
+        
+        Without a gas price this is an EIP-1559 (type 2) transaction priced
+        by the fee oracle, or a legacy one on networks without a base fee.
+        
+        Args:
+            from_address (str): Sender address
+            to_address (str): Recipient address
+            amount (float | Decimal): Amount of ETH to send
+            nonce (int): Sender nonce
+            gas_limit (int): Gas limit for transaction
+            gas_price (int): Legacy gas price in wei, overrides the fee oracle
+            fee_tier (str): Fee oracle tier, "slow", "normal" or "fast"
+            
+        Returns:
+            dict: Transaction fields ready for sign_transaction()
+        """
+        if fee_tier not in TIERS:
+            raise ValueError(f"Unknown fee tier: {fee_tier} (use {', '.join(TIERS)})")
+        tx = {
+            "from": from_address,
+            "to": Web3.to_checksum_address(to_address),
+            "value": self.w3.to_wei(amount, "ether"),
+            "gas": gas_limit,
+            "nonce": nonce,
+            "chainId": self.chain_id
+        }
+        if gas_price is None:
+            try:
+                fees = self.fee_oracle.estimate(fee_tier)
+                tx.update({
+                    "type": 2,
+                    "maxFeePerGas": fees["maxFeePerGas"],
+                    "maxPriorityFeePerGas": fees["maxPriorityFeePerGas"]
+                })
+                return tx
+            except NoBaseFeeError:
+                # Pre-London network, fall back to a legacy transaction
+                gas_price = self.w3.eth.gas_price
+        tx["gasPrice"] = gas_price
+        return tx
+    
+    def sign_transaction(self, account, tx: dict) -> str:
+        """
+        Sign a transaction offline.
+        
+        Args:
+            account: eth_account signer, e.g. from unlock_wallet()
+            tx (dict): Transaction from build_transaction()
+            
+        Returns:
+            str: Raw signed transaction in hex format
+        """
+        return "0x" + account.sign_transaction(tx).raw_transaction.hex().removeprefix("0x")
+    
+    def broadcast_transaction(self, raw_tx: str) -> str:
+        """
+        Submit a signed transaction to the network.
+        
+        Args:
+            raw_tx (str): Raw signed transaction in hex format
+            
+        Returns:
+            str: Transaction hash
+        """
+        tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+        return "0x" + tx_hash.hex().removeprefix("0x")
+    
     def send_transaction(
         self, 
         encrypted_privkey: str, 
@@ -100,50 +458,48 @@ class Ethereumchain:
         to_address: str, 
         amount: float,
         gas_limit: int = 21000,
-        gas_price_gwei: float = None
+        gas_price_gwei: float = None,
+        fee_tier: str = "normal"
     ) -> str:
         """
         Decrypt key and send ETH.
         
         Args:
             encrypted_privkey (str): Encrypted private key
-            password (str): Password to decrypt the key
+            password (str): Password to decrypt the key, unused if the wallet is unlocked
             to_address (str): Recipient address
             amount (float): Amount of ETH to send
             gas_limit (int): Gas limit for transaction
-            gas_price_gwei (float): Gas price in Gwei
+            gas_price_gwei (float): Legacy gas price in Gwei, overrides fee_tier
+            fee_tier (str): EIP-1559 fee tier, "slow", "normal" or "fast"
             
         Returns:
             str: Transaction hash
         """
         try:
-            # Decrypt using the correctly parameterized method
-            privkey = self.decrypt_wallet(encrypted_privkey, password)
-            
-            # Build and send transaction
-            account = self.w3.eth.account.from_key(privkey)
+            # Reuse the unlocked signer or decrypt for this send only
+            account = self._get_account(encrypted_privkey, password)
             
-            # Get gas price if not specified
-            if gas_price_gwei is None:
-                gas_price = self.w3.eth.gas_price
-            else:
-                gas_price = self.w3.to_wei(gas_price_gwei, "gwei")
-            
-            # Build transaction
-            tx = {
-                "from": account.address,
-                "to": to_address,
-                "value": self.w3.to_wei(amount, "ether"),
-                "gas": gas_limit,
-                "gasPrice": gas_price,
-                "nonce": self.w3.eth.get_transaction_count(account.address),
-                "chainId": self.w3.eth.chain_id
-            }
+            # Fees come from the shared oracle unless a gas price is given
+            gas_price = None if gas_price_gwei is None else self.w3.to_wei(gas_price_gwei, "gwei")
             
-            # Sign and send transaction
-            signed_tx = account.sign_transaction(tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            return tx_hash.hex()
+            # A stale nonce is retried once after resyncing from the node
+            for attempt in range(2):
+                nonce = self.nonces.allocate(account.address)
+                try:
+                    tx = self.build_transaction(
+                        account.address, to_address, amount, nonce, gas_limit, gas_price, fee_tier
+                    )
+                    raw_tx = self.sign_transaction(account, tx)
+                except Exception:
+                    # Nothing was sent, the nonce is still free
+                    self.nonces.release(account.address, nonce)
+                    raise
+                try:
+                    return self.broadcast_transaction(raw_tx)
+                except Exception as e:
+                    if not self.nonces.handle_error(account.address, nonce, e) or attempt:
+                        raise
         except Exception as e:
             raise ValueError(f"Failed to send transaction: {str(e)}")
     
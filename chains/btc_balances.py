@@ -0,0 +1,198 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from bitcoinlib import services
+
+from .rpc_cache import RpcCache, LATEST
+
+# Worker threads of the per-address fallback
+DEFAULT_BALANCE_WORKERS = 8
+# Seconds to wait for a multi-address response
+MULTI_BALANCE_TIMEOUT = 15
+# Requests per second sent to one provider, by bitcoinlib provider type
+PROVIDER_RATE_LIMITS = {
+    "blockchaininfo": 5,
+    "blockchair": 1,
+    "blockcypher": 3,
+    "blockstream": 10,
+    "mempool": 10,
+}
+# Rate for providers missing from PROVIDER_RATE_LIMITS
+DEFAULT_RATE_LIMIT = 3
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate (float): Calls per second
+        """
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def next_slot(self) -> float:
+        """Monotonic time at which the next call may be made."""
+        return self._next
+
+    def acquire(self):
+        """Block until the next call may be made."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def blockchaininfo_balances(session: requests.Session, url: str, addresses: list) -> dict:
+    """Confirmed satoshis per address from blockchain.info's balance endpoint."""
+    response = session.get(f"{url}balance", params={"active": "|".join(addresses)}, timeout=MULTI_BALANCE_TIMEOUT)
+    response.raise_for_status()
+    return {address: entry["final_balance"] for address, entry in response.json().items()}
+
+
+def blockchair_balances(session: requests.Session, url: str, addresses: list) -> dict:
+    """Satoshis per address from Blockchair's address dashboard."""
+    response = session.get(f"{url}dashboards/addresses/{','.join(addresses)}", timeout=MULTI_BALANCE_TIMEOUT)
+    response.raise_for_status()
+    entries = response.json()["data"]["addresses"]
+    return {address: entry["balance"] for address, entry in entries.items()}
+
+
+# bitcoinlib provider type -> (function(session, url, addresses) -> {address: satoshis}, addresses per request)
+MULTI_BALANCE_PROVIDERS = {
+    "blockchaininfo": (blockchaininfo_balances, 100),
+    "blockchair": (blockchair_balances, 100),
+}
+
+
+class BalanceScanner:
+    """
+    Balances of many Bitcoin addresses at once.
+
+    Addresses go to providers that answer for a list of addresses in one
+    request first; what they could not answer is looked up one address per
+    call on a bounded thread pool, spread over the network's providers,
+    each lookup going to the provider that can take it soonest. Lookups
+    call the bitcoinlib provider clients directly rather than through
+    Service, whose cache check costs an extra blockcount request, so every
+    request made passes through that provider's RateLimiter. The limiters
+    are shared by all lookups of the scanner, so large scans stay under
+    free API limits.
+    """
+
+    def __init__(self, btc_client, max_workers: int = DEFAULT_BALANCE_WORKERS):
+        """
+        Args:
+            btc_client (BitcoinClient): Client whose network, providers and cache are used
+            max_workers (int): Concurrent per-address lookups
+        """
+        self.client = btc_client
+        self.max_workers = max_workers
+        self.service = btc_client.service
+        self.providers = {
+            name: definition for name, definition in self.service.providers.items()
+            if definition.get("url") and definition.get("api_key") != "api-key-needed"
+            and hasattr(self._client_class(definition), "getbalance")
+        }
+        self.limiters = {
+            name: RateLimiter(PROVIDER_RATE_LIMITS.get(definition["provider"], DEFAULT_RATE_LIMIT))
+            for name, definition in self.providers.items()
+        }
+        self.session = requests.Session()
+        self._local = threading.local()
+
+    def get_balances(self, addresses: list) -> dict:
+        """
+        Look up the balance of every address.
+
+        Returns:
+            dict: Maps each address, in input order, to (balance in BTC, None)
+                  or (None, error message)
+        """
+        results = {address: None for address in addresses}
+        pending = []
+        for address in results:
+            hit, satoshis = self.client.cache.get(RpcCache.key("getbalance", (address,)))
+            if hit:
+                results[address] = (satoshis / 100000000, None)
+            else:
+                pending.append(address)
+
+        if pending:
+            pending = self._multi_address(pending, results)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                for address, result in zip(pending, executor.map(self._single_address, pending)):
+                    results[address] = result
+        return results
+
+    def _store(self, address: str, satoshis: int) -> tuple:
+        """Cache a looked up balance like get_balance() does and return its result entry."""
+        self.client.cache.put(RpcCache.key("getbalance", (address,)), satoshis, LATEST)
+        return satoshis / 100000000, None
+
+    def _multi_address(self, addresses: list, results: dict) -> list:
+        """Answer what multi-address providers can, returning the addresses left over."""
+        for name, definition in self.providers.items():
+            if not addresses or definition["provider"] not in MULTI_BALANCE_PROVIDERS:
+                continue
+            fetch, batch_size = MULTI_BALANCE_PROVIDERS[definition["provider"]]
+            left = []
+            for offset in range(0, len(addresses), batch_size):
+                chunk = addresses[offset:offset + batch_size]
+                self.limiters[name].acquire()
+                try:
+                    # Providers may normalize case, bech32 addresses come back lowercased
+                    balances = {address.lower(): value for address, value in fetch(self.session, definition["url"], chunk).items()}
+                except Exception:
+                    # Leave the rest to the next provider or the per-address lookups
+                    left.extend(addresses[offset:])
+                    break
+                for address in chunk:
+                    if address.lower() in balances:
+                        results[address] = self._store(address, balances[address.lower()])
+                    else:
+                        left.append(address)
+            addresses = left
+        return addresses
+
+    @staticmethod
+    def _client_class(definition: dict):
+        return getattr(getattr(services, definition["provider"]), definition["client_class"])
+
+    def _provider_client(self, name: str):
+        """bitcoinlib client of one provider, built as Service does, one per thread as clients keep request state."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if name not in clients:
+            definition = self.providers[name]
+            clients[name] = self._client_class(definition)(
+                self.service.network, definition["url"], definition["denominator"],
+                definition.get("api_key", ""), definition.get("provider_coin_id", ""),
+                definition.get("network_overrides", ""), definition.get("timeout") or self.service.timeout,
+                None, self.service.strict, "", definition.get("secure", True)
+            )
+        return clients[name]
+
+    def _single_address(self, address: str) -> tuple:
+        """Balance of one address, trying the least busy providers first."""
+        if not self.providers:
+            return None, "No balance providers configured"
+        error = None
+        for name in sorted(self.providers, key=lambda name: self.limiters[name].next_slot):
+            self.limiters[name].acquire()
+            try:
+                satoshis = self._provider_client(name).getbalance([address])
+            except Exception as e:
+                error = f"{name}: {str(e)}"
+                continue
+            return self._store(address, satoshis)
+        return None, error
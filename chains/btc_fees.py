@@ -0,0 +1,123 @@
+import math
+import threading
+import time
+
+# Weight units of one signed input spending each address format (the formats
+# of BitcoinMode._get_witness_type): P2PKH 148 vB, P2SH-P2WPKH 91 vB and
+# P2WPKH 68 vB, with 72 byte signatures including the sighash byte
+INPUT_WEIGHT = {"legacy": 592, "segwit": 364, "bech32": 272}
+# Weight units of one output paying each script type
+OUTPUT_WEIGHT = {"legacy": 136, "segwit": 128, "bech32": 124, "p2wsh": 172}
+# Version and locktime; input and output counts are added per transaction
+TX_BASE_WEIGHT = 32
+# SegWit marker and flag bytes, only counted when an input has a witness
+SEGWIT_MARKER_WEIGHT = 2
+
+# Confirmation targets in blocks of each fee priority
+FEE_TARGETS = {"fast": 2, "normal": 6, "slow": 25}
+# Seconds a fee estimate is reused
+FEE_CACHE_TTL = 60
+# sat/vB below which default nodes do not relay transactions
+MIN_RELAY_FEE_RATE = 1
+
+
+def varint_size(n: int) -> int:
+    """Serialized size in bytes of a Bitcoin CompactSize integer."""
+    if n < 0xfd:
+        return 1
+    return 3 if n <= 0xffff else 5
+
+
+def output_format(address: str) -> str:
+    """
+    Script type an address pays to, as an OUTPUT_WEIGHT key.
+
+    Mainnet and testnet prefixes are recognized; anything else is priced
+    as a legacy output.
+    """
+    lowered = address.lower()
+    if lowered.startswith(("bc1", "tb1", "bcrt1")):
+        # 20 byte programs (P2WPKH) are 42-44 characters, 32 byte ones (P2WSH, taproot) longer
+        return "bech32" if len(address) <= 44 else "p2wsh"
+    if address[:1] in ("3", "2"):
+        return "segwit"
+    return "legacy"
+
+
+def tx_vsize(address_format: str, n_inputs: int, output_formats: list) -> int:
+    """
+    Virtual size of a transaction spending n_inputs outputs of address_format.
+
+    Args:
+        address_format (str): Format of the spent outputs (legacy, segwit, bech32)
+        n_inputs (int): Number of inputs
+        output_formats (list): OUTPUT_WEIGHT key of every output
+
+    Returns:
+        int: Size in vbytes, rounded up
+    """
+    weight = TX_BASE_WEIGHT + 4 * (varint_size(n_inputs) + varint_size(len(output_formats)))
+    weight += n_inputs * INPUT_WEIGHT[address_format]
+    weight += sum(OUTPUT_WEIGHT[output] for output in output_formats)
+    if address_format != "legacy" and n_inputs:
+        weight += SEGWIT_MARKER_WEIGHT
+    return math.ceil(weight / 4)
+
+
+def tx_fee(fee_rate: float, address_format: str, n_inputs: int, output_formats: list) -> int:
+    """Satoshis to pay at fee_rate sat/vB for the transaction shape of tx_vsize()."""
+    return math.ceil(fee_rate * tx_vsize(address_format, n_inputs, output_formats))
+
+
+class FeeEstimator:
+    """
+    sat/vB fee rates per confirmation target, from Service.estimatefee.
+
+    Estimates are kept for ttl seconds per target, so a burst of sends asks
+    the provider once. Rates never go below MIN_RELAY_FEE_RATE.
+    """
+
+    def __init__(self, service_getter, ttl: float = FEE_CACHE_TTL):
+        """
+        Args:
+            service_getter: Callable returning the bitcoinlib Service to query
+            ttl (float): Seconds an estimate is reused
+        """
+        self.service_getter = service_getter
+        self.ttl = ttl
+        self._rates = {}  # target blocks -> (sat/vB, monotonic time fetched)
+        self._lock = threading.Lock()
+
+    def fee_rate(self, target: int = FEE_TARGETS["normal"]) -> float:
+        """
+        Fee rate for confirmation within target blocks.
+
+        Returns:
+            float: sat/vB
+        """
+        with self._lock:
+            cached = self._rates.get(target)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        # bitcoinlib estimates are satoshis per 1000 vbytes
+        rate = max(self.service_getter().estimatefee(blocks=target) / 1000, MIN_RELAY_FEE_RATE)
+        with self._lock:
+            self._rates[target] = (rate, time.monotonic())
+        return rate
+
+    def estimates(self, targets: dict = None) -> dict:
+        """
+        Fee rates of several priorities.
+
+        Args:
+            targets (dict): Priority name -> confirmation target, FEE_TARGETS if None
+
+        Returns:
+            dict: Priority name -> sat/vB
+        """
+        return {name: self.fee_rate(blocks) for name, blocks in (targets or FEE_TARGETS).items()}
+
+    def clear(self):
+        """Forget cached estimates."""
+        with self._lock:
+            self._rates.clear()
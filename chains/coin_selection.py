@@ -0,0 +1,332 @@
+import bisect
+import math
+import random
+from dataclasses import dataclass, field
+
+from .btc_fees import INPUT_WEIGHT, OUTPUT_WEIGHT, output_format, tx_fee, tx_vsize
+from .utxo import DUST_LIMIT
+
+# sat/vB we expect to pay when these outputs are spent later; inputs spent
+# below it count as savings, so cheap periods consolidate and busy ones don't
+LONG_TERM_FEE_RATE = 10
+# Branch-and-bound gives up after this many search steps, as Bitcoin Core does
+BNB_MAX_TRIES = 100000
+# Knapsack aims for change of at least this much so it is worth spending later
+KNAPSACK_MIN_CHANGE = 1000000
+# Random subset rounds of the knapsack solver, as in Bitcoin Core
+KNAPSACK_ITERATIONS = 1000
+
+
+@dataclass
+class Selection:
+    """Inputs picked for a payment and what the resulting transaction costs."""
+    strategy: str
+    inputs: list
+    amount: int
+    fee: int
+    change: int
+    vsize: int
+    waste: int
+    input_total: int = field(init=False)
+
+    def __post_init__(self):
+        self.input_total = sum(utxo["value"] for utxo in self.inputs)
+
+    def to_dict(self) -> dict:
+        """Convert selection summary to dictionary."""
+        return {
+            "strategy": self.strategy,
+            "inputs": len(self.inputs),
+            "input_total": self.input_total,
+            "amount": self.amount,
+            "fee": self.fee,
+            "change": self.change,
+            "vsize": self.vsize,
+            "waste": self.waste
+        }
+
+
+class _Costs:
+    """Fee arithmetic shared by the strategies for one payment."""
+
+    def __init__(self, amount, fee_rate, long_term_fee_rate, address_format, recipient_format):
+        self.amount = amount
+        self.fee_rate = fee_rate
+        self.address_format = address_format
+        self.outputs = [recipient_format]
+        self.outputs_with_change = [recipient_format, address_format]
+        input_vbytes = INPUT_WEIGHT[address_format] / 4
+        self.input_fee = math.ceil(input_vbytes * fee_rate)
+        # Spending an input now rather than later at the long-term rate
+        self.input_waste = self.input_fee - math.ceil(input_vbytes * long_term_fee_rate)
+        # Creating a change output now and spending it later
+        change_vbytes = OUTPUT_WEIGHT[address_format] / 4
+        self.cost_of_change = math.ceil(change_vbytes * fee_rate) + math.ceil(input_vbytes * long_term_fee_rate)
+        # What the effective values of the inputs must cover: the amount and
+        # the fee of everything but the inputs (input fees round up, so any
+        # set reaching it pays the exact fee)
+        self.target = amount + self.fee(1, False) - self.input_fee
+
+    def fee(self, n_inputs: int, with_change: bool) -> int:
+        outputs = self.outputs_with_change if with_change else self.outputs
+        return tx_fee(self.fee_rate, self.address_format, n_inputs, outputs)
+
+    def effective_value(self, utxo: dict) -> int:
+        return utxo["value"] - self.input_fee
+
+    def build(self, strategy: str, inputs: list):
+        """Selection for inputs with or without change, None if they fall short."""
+        n = len(inputs)
+        total = sum(utxo["value"] for utxo in inputs)
+        waste = n * self.input_waste
+        fee = self.fee(n, True)
+        change = total - self.amount - fee
+        if change >= DUST_LIMIT:
+            vsize = tx_vsize(self.address_format, n, self.outputs_with_change)
+            return Selection(strategy, inputs, self.amount, fee, change, vsize, waste + self.cost_of_change)
+        fee = self.fee(n, False)
+        excess = total - self.amount - fee
+        if excess < 0:
+            return None
+        # Change too small to be worth an output goes to the miner
+        vsize = tx_vsize(self.address_format, n, self.outputs)
+        return Selection(strategy, inputs, self.amount, fee + excess, 0, vsize, waste + excess)
+
+
+def branch_and_bound(utxos: list, costs: _Costs) -> list:
+    """
+    Search for a changeless input set, Bitcoin Core's SelectCoinsBnB.
+
+    Inputs are explored largest first, looking for effective values summing
+    to between the target and the target plus the cost of a change output;
+    of those the set with the least waste wins.
+
+    Returns:
+        list: Selected UTXOs, None if no changeless set was found
+    """
+    pool = sorted(
+        (utxo for utxo in utxos if costs.effective_value(utxo) > 0),
+        key=costs.effective_value,
+        reverse=True
+    )
+    values = [costs.effective_value(utxo) for utxo in pool]
+    target = costs.target
+    upper = target + costs.cost_of_change
+    available = sum(values)
+    if available < target:
+        return None
+
+    waste_per_input = costs.input_waste
+    value = 0
+    waste = 0
+    selected = []  # Indices into pool of the current branch
+    best = None
+    best_waste = math.inf
+    index = 0
+    for _ in range(BNB_MAX_TRIES):
+        backtrack = False
+        if value + available < target or value > upper or (waste > best_waste and waste_per_input > 0):
+            backtrack = True
+        elif value >= target:
+            if waste + value - target <= best_waste:
+                best = list(selected)
+                best_waste = waste + value - target
+            backtrack = True
+
+        if backtrack:
+            if not selected:
+                break
+            # Return skipped inputs to the lookahead, then exclude the last included one
+            index -= 1
+            while index > selected[-1]:
+                available += values[index]
+                index -= 1
+            value -= values[index]
+            waste -= waste_per_input
+            selected.pop()
+        else:
+            available -= values[index]
+            # An input equal to the excluded one before it would only repeat that branch
+            if not selected or index - 1 == selected[-1] or values[index] != values[index - 1]:
+                selected.append(index)
+                value += values[index]
+                waste += waste_per_input
+        index += 1
+
+    return [pool[i] for i in best] if best is not None else None
+
+
+def _approximate_best_subset(values: list, total: int, target: int, rng: random.Random) -> tuple:
+    """
+    Random subsets of values reaching target, keeping the smallest sum found.
+
+    Bitcoin Core's ApproximateBestSubset on values sorted largest first. A
+    value that reaches the target is recorded and dropped again, so a run of
+    values at least as large as the remaining gap leaves the running sum
+    alone; the run is skipped with a bisect and only the smallest value
+    tried in it is recorded, which gives the same results as walking it.
+    """
+    n = len(values)
+    negated = [-value for value in values]  # Ascending, for bisect
+    best = None
+    best_value = total
+    for _ in range(KNAPSACK_ITERATIONS):
+        if best_value == target:
+            break
+        included = set()
+        value = 0
+        reached = False
+        for second_pass in (False, True):
+            if reached:
+                break
+            # First pass tries inputs at random, the second tries all the rest
+            if second_pass:
+                considered = lambda i: i not in included  # noqa: E731
+            else:
+                considered = lambda i: rng.random() < 0.5  # noqa: E731
+            i = 0
+            while i < n:
+                # values[i:run_end] each reach the target from here
+                run_end = bisect.bisect_right(negated, value - target)
+                if run_end > i:
+                    for j in range(run_end - 1, i - 1, -1):
+                        if considered(j):
+                            reached = True
+                            if value + values[j] < best_value:
+                                best_value = value + values[j]
+                                best = included | {j}
+                            break
+                    i = run_end
+                # The next value tried stays below the target and is kept
+                while i < n and not considered(i):
+                    i += 1
+                if i < n:
+                    value += values[i]
+                    included.add(i)
+                    i += 1
+    if best is None:
+        return [True] * n, total
+    return [i in best for i in range(n)], best_value
+
+
+def knapsack(utxos: list, costs: _Costs, rng: random.Random = None) -> list:
+    """
+    Bitcoin Core's knapsack solver on effective values.
+
+    An exact single input wins outright; otherwise random subsets of the
+    inputs smaller than the target are tried, aiming for KNAPSACK_MIN_CHANGE
+    of change, and compared with the smallest input larger than the target.
+
+    Returns:
+        list: Selected UTXOs, None if the pool cannot pay
+    """
+    rng = rng or random.Random()
+    target = costs.target
+    applicable = []
+    lowest_larger = None
+    for utxo in utxos:
+        value = costs.effective_value(utxo)
+        if value <= 0:
+            continue
+        if value == target:
+            return [utxo]
+        if value < target + KNAPSACK_MIN_CHANGE:
+            applicable.append((value, utxo))
+        elif lowest_larger is None or value < costs.effective_value(lowest_larger):
+            lowest_larger = utxo
+
+    total = sum(value for value, _ in applicable)
+    if total == target:
+        return [utxo for _, utxo in applicable]
+    if total < target:
+        return [lowest_larger] if lowest_larger else None
+
+    applicable.sort(key=lambda pair: pair[0], reverse=True)
+    values = [value for value, _ in applicable]
+    best, best_value = _approximate_best_subset(values, total, target, rng)
+    if best_value != target and total >= target + KNAPSACK_MIN_CHANGE:
+        best, best_value = _approximate_best_subset(values, total, target + KNAPSACK_MIN_CHANGE, rng)
+
+    if lowest_larger and (
+        best_value != target and best_value < target + KNAPSACK_MIN_CHANGE
+        or costs.effective_value(lowest_larger) <= best_value
+    ):
+        return [lowest_larger]
+    return [utxo for (_, utxo), included in zip(applicable, best) if included]
+
+
+def largest_first(utxos: list, costs: _Costs) -> list:
+    """
+    Add the largest inputs until amount and fee are covered.
+
+    Returns:
+        list: Selected UTXOs, None if the pool cannot pay
+    """
+    selected = []
+    value = 0
+    for utxo in sorted(utxos, key=lambda utxo: utxo["value"], reverse=True):
+        if costs.effective_value(utxo) <= 0:
+            break  # Smaller inputs cost more to spend than they add
+        selected.append(utxo)
+        value += costs.effective_value(utxo)
+        if value >= costs.target:
+            return selected
+    return None
+
+
+# Strategy name -> function(utxos, costs) returning the selected UTXOs or None
+STRATEGIES = {
+    "bnb": branch_and_bound,
+    "knapsack": knapsack,
+    "largest_first": largest_first,
+}
+
+
+def select_coins(
+    utxos: list,
+    amount: int,
+    fee_rate: float,
+    address_format: str = "bech32",
+    to_address: str = None,
+    strategy: str = "auto",
+    long_term_fee_rate: float = LONG_TERM_FEE_RATE
+) -> Selection:
+    """
+    Pick inputs paying amount at fee_rate.
+
+    With strategy "auto" every strategy runs and the selection with the
+    least waste wins, fewer inputs breaking ties; waste is the fee paid
+    above the long-term rate plus change that is created or given away.
+
+    Args:
+        utxos (list): Spendable UTXO dicts with txid, output_n and value
+        amount (int): Satoshis to pay the recipient
+        fee_rate (float): sat/vB to pay
+        address_format (str): Format of the spent outputs and of the change
+        to_address (str): Recipient, which sets the size of its output; an
+                          output of address_format is assumed if None
+        strategy (str): "auto" or a key of STRATEGIES
+        long_term_fee_rate (float): sat/vB expected when spending change later
+
+    Returns:
+        Selection: The chosen inputs with fee, change and vsize
+
+    Raises:
+        ValueError: If the strategy is unknown or the UTXOs cannot pay
+    """
+    if strategy != "auto" and strategy not in STRATEGIES:
+        raise ValueError(f"Unknown coin selection strategy: {strategy}")
+    recipient_format = output_format(to_address) if to_address else address_format
+    costs = _Costs(amount, fee_rate, long_term_fee_rate, address_format, recipient_format)
+
+    names = list(STRATEGIES) if strategy == "auto" else [strategy]
+    selections = []
+    for name in names:
+        inputs = STRATEGIES[name](utxos, costs)
+        selection = costs.build(name, inputs) if inputs else None
+        if selection:
+            selections.append(selection)
+    if not selections:
+        available = sum(utxo["value"] for utxo in utxos)
+        raise ValueError(f"Insufficient funds: {available} satoshis available, {amount} plus fees needed")
+    return min(selections, key=lambda selection: (selection.waste, len(selection.inputs)))
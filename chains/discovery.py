@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from .util import derive_range
+
+# BIP-44 recommends giving up on an account after 20 consecutive unused addresses
+DEFAULT_GAP_LIMIT = 20
+
+
+def eth_probe(eth_client):
+    """
+    Build a discovery probe backed by an Ethereumchain client.
+
+    An address counts as used if it holds ETH or has sent a transaction.
+    """
+    def probe(address: str) -> tuple:
+        balance = eth_client.get_balance(address)
+        used = balance > 0 or eth_client.get_transaction_count(address) > 0
+        return balance, used
+    return probe
+
+
+def btc_probe(btc_client):
+    """
+    Build a discovery probe backed by a BitcoinClient.
+
+    An address counts as used if it holds BTC or appears in any transaction.
+    """
+    def probe(address: str) -> tuple:
+        balance = btc_client.get_balance(address)
+        used = balance > 0 or btc_client.has_history(address)
+        return balance, used
+    return probe
+
+
+def discover_account(
+    executor: ThreadPoolExecutor,
+    chain: str,
+    mnemonic: str,
+    account: int,
+    probe,
+    gap_limit: int = DEFAULT_GAP_LIMIT,
+    witness_type: str = "legacy",
+) -> tuple[list, bool]:
+    """
+    Scan one account's addresses until gap_limit consecutive unused ones are seen.
+
+    Addresses are derived by the Go core gap_limit at a time and each batch
+    is probed concurrently on executor.
+
+    Returns:
+        tuple: (funded addresses, whether any address of the account was used)
+    """
+    funded = []
+    last_used = -1
+    start = 0
+    while start - (last_used + 1) < gap_limit:
+        batch = list(derive_range(chain, mnemonic, account, start, gap_limit, witness_type))
+        results = executor.map(lambda row: probe(row[1]), batch)
+        for (index, address, private_key), (balance, used) in zip(batch, results):
+            if used:
+                last_used = index
+            if balance > 0:
+                funded.append({
+                    "chain": chain,
+                    "account": account,
+                    "index": index,
+                    "address": address,
+                    "private_key": private_key,
+                    "balance": balance,
+                })
+        start += gap_limit
+    return funded, last_used >= 0
+
+
+def discover(
+    mnemonic: str,
+    probes: dict,
+    gap_limit: int = DEFAULT_GAP_LIMIT,
+    max_accounts: int = 20,
+    max_workers: int = 8,
+    witness_type: str = "legacy",
+) -> list[dict]:
+    """
+    Find every funded address of a mnemonic following the BIP-44 gap-limit rule.
+
+    Accounts are scanned in order and discovery of a chain stops at the
+    first account with no used address.
+
+    Args:
+        mnemonic: BIP-39 mnemonic phrase
+        probes: Mapping of chain (eth, btc, sol) to a callable taking an address
+            and returning (balance, used), e.g. eth_probe(client)
+        gap_limit: Consecutive unused addresses after which an account is exhausted
+        max_accounts: Upper bound on accounts scanned per chain
+        max_workers: Maximum number of concurrent balance/history probes
+        witness_type: Address format for Bitcoin (legacy, segwit, bech32)
+
+    Returns:
+        list: Funded addresses as dicts with chain, account, index, address,
+            private_key and balance
+    """
+    funded = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chain, probe in probes.items():
+            for account in range(max_accounts):
+                account_funded, used = discover_account(
+                    executor, chain, mnemonic, account, probe, gap_limit, witness_type
+                )
+                funded.extend(account_funded)
+                if not used:
+                    break
+    return funded
@@ -0,0 +1,166 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+
+from web3.exceptions import MethodUnavailable
+
+# Reward percentiles sampled per block, one per tier
+TIERS = {"slow": 10, "normal": 50, "fast": 90}
+# Blocks of history the estimates are computed over
+DEFAULT_WINDOW = 20
+# Seconds a fee estimate is reused before checking for a new block
+DEFAULT_MAX_AGE = 3
+# maxFeePerGas covers this many full base fee increases (12.5% each)
+BASE_FEE_HEADROOM = 2
+
+
+class NoBaseFeeError(ValueError):
+    """The network has no EIP-1559 base fee, so transactions need a legacy gasPrice."""
+
+
+class FeeOracle:
+    """
+    EIP-1559 fee estimates from a rolling eth_feeHistory window.
+
+    The window holds the base fee and the slow/normal/fast priority fee
+    percentiles of the last window blocks. It is refreshed at most once
+    every max_age seconds, and only blocks that are new since the last
+    refresh are fetched, usually a single-block eth_feeHistory call. All
+    sends on a client share one oracle.
+    """
+
+    def __init__(self, w3_getter, window: int = DEFAULT_WINDOW, max_age: float = DEFAULT_MAX_AGE):
+        """
+        Args:
+            w3_getter: Callable returning the Web3 connection to query
+            window (int): Blocks of fee history to keep
+            max_age (float): Seconds before checking for a new block
+        """
+        self.w3_getter = w3_getter
+        self.window = window
+        self.max_age = max_age
+        self._blocks = deque(maxlen=window)  # (block number, {tier: reward})
+        self._head = None
+        self._next_base_fee = None
+        self._checked_at = 0.0
+        self._error = None
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def _append(self, history: dict):
+        oldest = history["oldestBlock"]
+        for offset, rewards in enumerate(history.get("reward") or []):
+            block = oldest + offset
+            if self._head is None or block > self._head:
+                self._blocks.append((block, dict(zip(TIERS, rewards))))
+                self._head = block
+        # The last base fee is the one the next block will charge
+        self._next_base_fee = history["baseFeePerGas"][-1]
+
+    def _is_fresh(self) -> bool:
+        """Whether the last refresh is recent enough to reuse."""
+        if time.monotonic() - self._checked_at >= self.max_age:
+            return False
+        # An unsupported network is remembered too, so it is not re-probed per send
+        if self._error:
+            raise self._error
+        return True
+
+    def _missing(self, head: int) -> int:
+        """Blocks to fetch to bring the window up to head."""
+        return self.window if self._head is None else min(head - self._head, self.window)
+
+    def _fail(self, error: Exception):
+        if isinstance(error, MethodUnavailable):
+            # Nodes without eth_feeHistory predate London
+            self._error = NoBaseFeeError(f"Network does not support EIP-1559 fees: {str(error)}")
+            self._checked_at = time.monotonic()
+            raise self._error from error
+        # Timeouts and HTTP errors are not cached, the next call tries again
+        raise ValueError(f"Failed to get fee history: {str(error)}") from error
+
+    def refresh(self, force: bool = False):
+        """Fetch fee history for blocks mined since the last refresh."""
+        with self._lock:
+            if not force and self._is_fresh():
+                return
+            w3 = self.w3_getter()
+            percentiles = list(TIERS.values())
+            try:
+                latest = w3.eth.fee_history(1, "latest", percentiles)
+                missing = self._missing(latest["oldestBlock"])
+                if missing > 1:
+                    # Blocks were mined since the last refresh, fill the gap at once
+                    self._append(w3.eth.fee_history(missing, latest["oldestBlock"], percentiles))
+                else:
+                    self._append(latest)
+                self._error = None
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                self._fail(e)
+
+    async def refresh_async(self, w3, force: bool = False):
+        """
+        refresh() for asyncio clients.
+
+        Args:
+            w3: AsyncWeb3 connection to query
+            force (bool): Refresh even if the window is recent
+        """
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        # Coroutines arriving during a refresh wait for it instead of repeating it
+        async with self._async_lock:
+            if not force and self._is_fresh():
+                return
+            percentiles = list(TIERS.values())
+            try:
+                latest = await w3.eth.fee_history(1, "latest", percentiles)
+                missing = self._missing(latest["oldestBlock"])
+                if missing > 1:
+                    history = await w3.eth.fee_history(missing, latest["oldestBlock"], percentiles)
+                else:
+                    history = latest
+                with self._lock:
+                    self._append(history)
+                    self._error = None
+                    self._checked_at = time.monotonic()
+            except Exception as e:
+                self._fail(e)
+
+    def estimate(self, tier: str = "normal", refresh: bool = True) -> dict:
+        """
+        Get EIP-1559 fee fields for a transaction.
+
+        Args:
+            tier (str): "slow", "normal" or "fast"
+            refresh (bool): Refresh the window first if it is stale; asyncio
+                            clients await refresh_async() and pass False
+
+        Returns:
+            dict: maxFeePerGas, maxPriorityFeePerGas and the expected baseFeePerGas, in wei
+
+        Raises:
+            NoBaseFeeError: If the network has no base fee
+            ValueError: If tier is unknown or fee history cannot be fetched
+        """
+        if tier not in TIERS:
+            raise ValueError(f"Unknown fee tier: {tier} (use {', '.join(TIERS)})")
+        if refresh:
+            self.refresh()
+        with self._lock:
+            if not self._next_base_fee or not self._blocks:
+                raise NoBaseFeeError("Network does not support EIP-1559 fees")
+            priority_fee = int(statistics.median(rewards[tier] for _, rewards in self._blocks))
+            base_fee = self._next_base_fee
+        return {
+            "maxFeePerGas": base_fee * BASE_FEE_HEADROOM + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+            "baseFeePerGas": base_fee
+        }
+
+    def estimates(self, refresh: bool = True) -> dict:
+        """Get estimate() for every tier."""
+        return {tier: self.estimate(tier, refresh) for tier in TIERS}
@@ -0,0 +1,283 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from py_types.transaction import Transaction
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+# ERC20.decimals()
+DECIMALS_SELECTOR = "0x313ce567"
+
+DEFAULT_DB_PATH = "transfers.db"
+# Blocks behind the head left unindexed so reorgs cannot leave stale rows
+DEFAULT_SAFE_DEPTH = 12
+# eth_getLogs block span bounds; the span adapts between them
+INITIAL_SPAN = 2000
+MIN_SPAN = 1
+MAX_SPAN = 100000
+# Grow the span while a range returns fewer logs than this
+SPARSE_LOGS = 500
+# Calls per JSON-RPC batch for block timestamps and token decimals
+LOOKUP_BATCH_SIZE = 100
+
+# Provider error messages rejecting a range for its size
+RANGE_ERRORS = ("query returned more than", "too many results", "block range", "response size exceeded", "limit exceeded")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    token TEXT NOT NULL,
+    from_address TEXT NOT NULL,
+    to_address TEXT NOT NULL,
+    amount_raw TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    timestamp INTEGER,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_from ON transfers (from_address, block_number);
+CREATE INDEX IF NOT EXISTS transfers_to ON transfers (to_address, block_number);
+CREATE INDEX IF NOT EXISTS transfers_block ON transfers (block_number);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    address TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    address TEXT PRIMARY KEY,
+    decimals INTEGER
+);
+"""
+
+
+def _topic(address: str) -> str:
+    """Left-pad an address to a 32-byte log topic."""
+    return "0x" + address.lower().removeprefix("0x").rjust(64, "0")
+
+
+def _address(topic: str) -> str:
+    return "0x" + topic[-40:]
+
+
+class TransferIndexer:
+    """
+    Incremental ERC-20 Transfer history for a set of addresses, kept in SQLite.
+
+    index() pulls Transfer logs to and from the addresses with eth_getLogs,
+    both directions in one JSON-RPC batch per block range. The range starts
+    at INITIAL_SPAN blocks, halves whenever the provider rejects it as too
+    large and doubles while ranges come back sparse. Each range is stored
+    together with the new checkpoint of its addresses in one SQLite
+    transaction, so an interrupted run resumes where it stopped. history()
+    then answers from the local database without touching the node.
+    """
+
+    def __init__(self, eth_client, db_path: str = DEFAULT_DB_PATH, safe_depth: int = DEFAULT_SAFE_DEPTH):
+        """
+        Args:
+            eth_client: Ethereumchain used for log, block and token lookups
+            db_path (str): SQLite database file, created if missing
+            safe_depth (int): Blocks behind the head that are not indexed yet
+        """
+        self.eth_client = eth_client
+        self.safe_depth = safe_depth
+        self.span = INITIAL_SPAN
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def checkpoint(self, address: str):
+        """Last indexed block of address, or None if it was never indexed."""
+        row = self._db.execute(
+            "SELECT last_block FROM checkpoints WHERE address = ?", (address.lower(),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def index(self, addresses: list, start_block: int = 0, progress=None) -> int:
+        """
+        Index Transfer logs of addresses up to the safe head.
+
+        Addresses seen for the first time start at start_block; the others
+        continue from their checkpoint.
+
+        Args:
+            addresses (list): Wallet addresses to index
+            start_block (int): First block for new addresses
+            progress: Optional callback(last_block, target_block)
+
+        Returns:
+            int: Number of new transfers stored
+        """
+        target = self.eth_client.w3.eth.block_number - self.safe_depth
+        groups = {}
+        for address in dict.fromkeys(a.lower() for a in addresses):
+            last = self.checkpoint(address)
+            groups.setdefault(start_block - 1 if last is None else last, []).append(address)
+
+        stored = 0
+        with self._lock:
+            # Bring the furthest-behind group up to the next one, then move on together
+            while groups:
+                last = min(groups)
+                group = groups.pop(last)
+                stop = min(min(groups, default=target), target)
+                stored += self._index_range(group, last + 1, stop, target, progress)
+                if stop < target:
+                    groups.setdefault(stop, []).extend(group)
+        return stored
+
+    def _index_range(self, addresses: list, from_block: int, to_block: int, target: int, progress) -> int:
+        stored = 0
+        block = from_block
+        topics = [_topic(address) for address in addresses]
+        # Span that last worked, restored if a range fails for another reason than its size
+        good_span = self.span
+        while block <= to_block:
+            end = min(block + self.span - 1, to_block)
+            query = {"fromBlock": hex(block), "toBlock": hex(end)}
+            try:
+                replies = self.eth_client.rpc_batch([
+                    ("eth_getLogs", [{**query, "topics": [TRANSFER_TOPIC, topics]}]),
+                    ("eth_getLogs", [{**query, "topics": [TRANSFER_TOPIC, None, topics]}]),
+                ])
+            except ConnectionError:
+                # Every endpoint failed already, a smaller range would not help
+                self.span = good_span
+                raise
+            errors = [error for _, error in replies if error]
+            if errors:
+                if self.span > MIN_SPAN and any(text in errors[0].lower() for text in RANGE_ERRORS):
+                    self.span = max(MIN_SPAN, self.span // 2)
+                    continue
+                self.span = good_span
+                raise ConnectionError(f"eth_getLogs failed for blocks {block}-{end}: {errors[0]}")
+
+            logs = {}
+            for result, _ in replies:
+                for log in result:
+                    # ERC-721 shares the event signature but indexes the token id
+                    if len(log["topics"]) == 3 and not log.get("removed"):
+                        logs[(log["transactionHash"], int(log["logIndex"], 16))] = log
+            stored += self._store(logs, addresses, end)
+            if len(logs) < SPARSE_LOGS:
+                self.span = min(MAX_SPAN, self.span * 2)
+            good_span = self.span
+            block = end + 1
+            if progress:
+                progress(end, target)
+        return stored
+
+    def _store(self, logs: dict, addresses: list, last_block: int) -> int:
+        """Insert logs and advance the checkpoints of addresses in one transaction."""
+        timestamps = self._block_timestamps({int(log["blockNumber"], 16) for log in logs.values()})
+        self._fetch_decimals({log["address"].lower() for log in logs.values()})
+        rows = [
+            (
+                tx_hash,
+                log_index,
+                log["address"].lower(),
+                _address(log["topics"][1]),
+                _address(log["topics"][2]),
+                str(int(log["data"], 16) if log["data"] not in ("0x", "") else 0),
+                int(log["blockNumber"], 16),
+                timestamps.get(int(log["blockNumber"], 16)),
+            )
+            for (tx_hash, log_index), log in logs.items()
+        ]
+        with self._db:
+            cursor = self._db.executemany("INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.executemany(
+                "INSERT INTO checkpoints VALUES (?, ?) ON CONFLICT(address) DO UPDATE SET last_block = excluded.last_block",
+                [(address, last_block) for address in addresses],
+            )
+        return cursor.rowcount
+
+    def _block_timestamps(self, blocks: set) -> dict:
+        blocks = sorted(blocks)
+        timestamps = {}
+        for offset in range(0, len(blocks), LOOKUP_BATCH_SIZE):
+            chunk = blocks[offset:offset + LOOKUP_BATCH_SIZE]
+            replies = self.eth_client.rpc_batch([("eth_getBlockByNumber", [hex(b), False]) for b in chunk])
+            for block, (result, _) in zip(chunk, replies):
+                if result:
+                    timestamps[block] = int(result["timestamp"], 16)
+        return timestamps
+
+    def _fetch_decimals(self, tokens: set):
+        """Look up decimals() of tokens not seen before."""
+        known = {row[0] for row in self._db.execute("SELECT address FROM tokens")}
+        new = sorted(tokens - known)
+        for offset in range(0, len(new), LOOKUP_BATCH_SIZE):
+            chunk = new[offset:offset + LOOKUP_BATCH_SIZE]
+            replies = self.eth_client.rpc_batch([
+                ("eth_call", [{"to": token, "data": DECIMALS_SELECTOR}, "latest"]) for token in chunk
+            ])
+            with self._db:
+                self._db.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?)", [
+                    (token, int(result, 16) if result and result != "0x" and not error else None)
+                    for token, (result, error) in zip(chunk, replies)
+                ])
+
+    def history(
+        self,
+        address: str,
+        token: str = None,
+        from_block: int = None,
+        to_block: int = None,
+        limit: int = None
+    ) -> list:
+        """
+        Transfers to or from address, oldest first, from the local database.
+
+        Args:
+            address (str): Wallet address
+            token (str, optional): Only transfers of this token contract
+            from_block (int, optional): First block to include
+            to_block (int, optional): Last block to include
+            limit (int, optional): Maximum number of transfers
+
+        Returns:
+            list: Transaction records; amounts are exact Decimals scaled by the
+                  token's decimals when known, raw_data holds the token, log
+                  index and raw amount
+        """
+        address = address.lower()
+        query = """
+            SELECT t.tx_hash, t.log_index, t.token, t.from_address, t.to_address,
+                   t.amount_raw, t.block_number, t.timestamp, k.decimals
+            FROM transfers t LEFT JOIN tokens k ON k.address = t.token
+            WHERE (t.from_address = ? OR t.to_address = ?)
+        """
+        params = [address, address]
+        if token:
+            query += " AND t.token = ?"
+            params.append(token.lower())
+        if from_block is not None:
+            query += " AND t.block_number >= ?"
+            params.append(from_block)
+        if to_block is not None:
+            query += " AND t.block_number <= ?"
+            params.append(to_block)
+        query += " ORDER BY t.block_number, t.log_index"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        transactions = []
+        for tx_hash, log_index, token_address, sender, recipient, amount_raw, block, timestamp, decimals in self._db.execute(query, params):
+            transactions.append(Transaction(
+                tx_hash=tx_hash,
+                chain="ethereum",
+                from_address=sender,
+                to_address=recipient,
+                amount=Decimal(amount_raw).scaleb(-(decimals or 0)),
+                status="confirmed",
+                timestamp=datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None,
+                block_number=block,
+                raw_data={"token": token_address, "log_index": log_index, "amount_raw": amount_raw, "decimals": decimals},
+            ))
+        return transactions
@@ -0,0 +1,138 @@
+import heapq
+import threading
+
+# Node error messages meaning the local nonce view is behind the chain
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "nonce is too low", "already been used", "oldnonce")
+# Node error messages meaning the transaction with this nonce is already in the pool
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "alreadyknown", "replacement transaction underpriced")
+# Node error messages meaning the transaction was validated and turned away,
+# so its nonce is still free
+REJECTED_ERRORS = (
+    "insufficient funds", "intrinsic gas too low", "fee too low", "transaction underpriced",
+    "less than block base fee", "exceeds block gas limit", "higher than max fee per gas",
+    "invalid sender", "oversized data", "exceeds the configured cap",
+)
+
+
+class NonceManager:
+    """
+    Hands out account nonces locally so back-to-back sends need no
+    get_transaction_count round trip and never collide.
+
+    Each account is synced once from the node's pending transaction count.
+    After that allocate() returns increasing nonces under a per-account lock.
+    A nonce whose transaction the node rejected is released and handed out
+    again before any new one, so a failed send does not leave a gap that
+    would stall every later transaction. Errors showing the local view is
+    stale, and failures where the transaction may have reached the node
+    anyway, make the next allocation resync from the node.
+    """
+
+    def __init__(self, fetch_pending_count):
+        """
+        Args:
+            fetch_pending_count: Callable returning the pending transaction
+                                 count of an address from the node
+        """
+        self.fetch_pending_count = fetch_pending_count
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def _account(self, address: str) -> dict:
+        with self._lock:
+            return self._accounts.setdefault(address.lower(), {
+                "lock": threading.Lock(),
+                "next": None,       # next fresh nonce, None until synced
+                "released": [],     # min-heap of nonces to reuse
+            })
+
+    def allocate(self, address: str) -> int:
+        """
+        Reserve the next nonce for address.
+
+        If the transaction does not reach the node, pass the error to
+        handle_error() so the nonce is reused or the account resynced.
+        """
+        state = self._account(address)
+        with state["lock"]:
+            if state["next"] is None:
+                state["next"] = self.fetch_pending_count(address)
+            if state["released"]:
+                return heapq.heappop(state["released"])
+            nonce = state["next"]
+            state["next"] += 1
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """
+        Return a nonce whose transaction never reached the node.
+
+        The nonce is reused by the next allocate(), closing the gap.
+        """
+        state = self._account(address)
+        with state["lock"]:
+            if state["next"] is not None and nonce < state["next"] and nonce not in state["released"]:
+                heapq.heappush(state["released"], nonce)
+
+    def resync(self, address: str, pending_count: int = None) -> int:
+        """
+        Reload the nonce of address from the node and drop local state.
+
+        Args:
+            address (str): Account to resync
+            pending_count (int, optional): Pending transaction count already
+                fetched by the caller, e.g. through an async client
+
+        Returns:
+            int: The next nonce that will be allocated
+        """
+        state = self._account(address)
+        with state["lock"]:
+            state["next"] = self.fetch_pending_count(address) if pending_count is None else pending_count
+            state["released"] = []
+            return state["next"]
+
+    def invalidate(self, address: str):
+        """Forget the local nonce of address so the next allocate() resyncs."""
+        state = self._account(address)
+        with state["lock"]:
+            state["next"] = None
+            state["released"] = []
+
+    def is_synced(self, address: str) -> bool:
+        """Check whether allocate() can answer without asking the node."""
+        state = self._account(address)
+        with state["lock"]:
+            return state["next"] is not None
+
+    def handle_error(self, address: str, nonce: int, error: Exception) -> bool:
+        """
+        Update nonce state after a failed broadcast.
+
+        The nonce is only released when the node definitely rejected the
+        transaction. Timeouts, dropped connections and unknown errors are
+        ambiguous: the transaction may be pending, so the account is
+        resynced from the node instead of reusing the nonce.
+
+        Returns:
+            bool: True if the nonce was stale and the send can be retried
+                  with a freshly allocated nonce
+        """
+        message = str(error).lower()
+        if any(text in message for text in NONCE_TOO_LOW_ERRORS):
+            self.invalidate(address)
+            return True
+        if any(text in message for text in ALREADY_KNOWN_ERRORS):
+            # A transaction with this nonce is pending, keep it consumed
+            return False
+        if any(text in message for text in REJECTED_ERRORS):
+            self.release(address, nonce)
+            return False
+        self.invalidate(address)
+        return False
+
+    def pending_gaps(self, address: str) -> list:
+        """Nonces released by failed sends that have not been reused yet."""
+        state = self._account(address)
+        with state["lock"]:
+            return sorted(state["released"])
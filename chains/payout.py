@@ -0,0 +1,231 @@
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from web3 import Web3
+
+# Concurrent eth_sendRawTransaction calls
+DEFAULT_MAX_WORKERS = 8
+
+# Errors meaning the node already has this exact transaction
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction")
+
+
+def read_recipients(path: str) -> list:
+    """
+    Read and validate a payout file.
+
+    CSV files have an address and an amount column, with an optional header
+    row. JSONL files have one {"to": ..., "amount": ...} object per line.
+    Every row is validated before anything is signed.
+
+    Args:
+        path (str): Path to a .csv or .jsonl file
+
+    Returns:
+        list: Dicts with row number, checksummed recipient and Decimal amount
+
+    Raises:
+        ValueError: Listing every invalid row, if any
+    """
+    rows = []
+    with open(path, newline="") as f:
+        if path.lower().endswith((".jsonl", ".json")):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        entry = json.loads(line)
+                        rows.append((number, entry.get("to") or entry.get("address"), entry.get("amount")))
+                    except (ValueError, AttributeError):
+                        rows.append((number, None, None))
+        else:
+            for number, fields in enumerate(csv.reader(f), 1):
+                if not fields or not "".join(fields).strip() or fields[0].startswith("#"):
+                    continue
+                if number == 1 and not fields[0].strip().lower().startswith("0x"):
+                    continue  # Header row
+                rows.append((number, fields[0].strip(), fields[1].strip() if len(fields) > 1 else None))
+
+    recipients = []
+    errors = []
+    for number, to_address, amount in rows:
+        if not isinstance(to_address, str) or not Web3.is_address(to_address):
+            errors.append(f"row {number}: invalid address {to_address!r}")
+            continue
+        try:
+            amount = Decimal(str(amount))
+        except InvalidOperation:
+            errors.append(f"row {number}: invalid amount {amount!r}")
+            continue
+        if not amount.is_finite() or amount <= 0:
+            errors.append(f"row {number}: amount must be positive")
+            continue
+        recipients.append({"row": number, "to": Web3.to_checksum_address(to_address), "amount": amount})
+
+    if errors:
+        raise ValueError(f"{len(errors)} invalid row(s): " + "; ".join(errors[:20]))
+    if not recipients:
+        raise ValueError("No recipients in file")
+    return recipients
+
+
+class PayoutJournal:
+    """
+    Append-only JSONL record of a payout run, one line per state change.
+
+    A row is journaled as "signed" with its raw transaction before anything
+    is broadcast, then as "sent" or "failed". Replaying the journal gives the
+    latest state of every row, so an interrupted or failed run resumes by
+    re-sending the same signed transactions instead of paying anyone twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.rows[entry["row"]] = entry
+
+    def record(self, entry: dict):
+        """Append entry and make it the current state of its row."""
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.rows[entry["row"]] = entry
+
+
+def _is_known(eth_client, tx_hash: str) -> bool:
+    """Check whether the node has seen the transaction with tx_hash."""
+    try:
+        eth_client.w3.eth.get_transaction(tx_hash)
+        return True
+    except Exception:
+        return False
+
+
+def run_payout(
+    eth_client,
+    account,
+    recipients: list,
+    journal_path: str,
+    gas_limit: int = 21000,
+    gas_price: int = None,
+    fee_tier: str = "normal",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    on_result=None
+) -> dict:
+    """
+    Pay every recipient from one account.
+
+    All transactions are signed up front with sequential nonces and
+    journaled, then broadcast max_workers at a time. Rows already sent in
+    a previous run with the same journal are skipped. Rows that were signed
+    or failed are first re-broadcast unchanged, with their original nonce,
+    so a payment that reached the node before is never signed twice. Only a
+    row whose nonce has since been mined by another transaction, and whose
+    own transaction is unknown to the node, is signed again with a new nonce.
+
+    Args:
+        eth_client: Ethereumchain connected to the network
+        account: eth_account signer paying the recipients
+        recipients (list): Rows from read_recipients()
+        journal_path (str): JSONL journal file, created if missing
+        gas_limit (int): Gas limit per transaction
+        gas_price (int): Legacy gas price in wei, overrides fee_tier
+        fee_tier (str): EIP-1559 fee tier from the client's fee oracle
+        max_workers (int): Concurrent broadcasts
+        on_result: Optional callback receiving each final journal entry
+
+    Returns:
+        dict: Counts of sent, failed and skipped rows
+    """
+    journal = PayoutJournal(journal_path)
+    summary = {"sent": 0, "failed": 0, "skipped": 0}
+
+    def broadcast(entry: dict) -> dict:
+        result = dict(entry)
+        tx_hash = "0x" + Web3.keccak(hexstr=entry["raw_tx"]).hex().removeprefix("0x")
+        try:
+            result["hash"] = eth_client.broadcast_transaction(entry["raw_tx"])
+            result["status"] = "sent"
+            result.pop("error", None)
+        except Exception as e:
+            message = str(e)
+            if any(text in message.lower() for text in ALREADY_KNOWN_ERRORS) or _is_known(eth_client, tx_hash):
+                # Re-broadcast of a transaction that is already pending or mined
+                result["hash"] = tx_hash
+                result["status"] = "sent"
+                result.pop("error", None)
+            else:
+                eth_client.nonces.handle_error(account.address, entry["nonce"], e)
+                result["status"] = "failed"
+                result["error"] = message
+        journal.record(result)
+        return result
+
+    def finish(result: dict):
+        summary[result["status"]] += 1
+        if on_result:
+            on_result(result)
+
+    to_sign = []
+    resumed = []
+    for recipient in recipients:
+        previous = journal.rows.get(recipient["row"])
+        if previous and (previous["to"], previous["amount"]) != (recipient["to"], str(recipient["amount"])):
+            raise ValueError(f"Row {recipient['row']} differs from the journal {journal_path}, use a new journal")
+        if previous and previous["status"] == "sent":
+            summary["skipped"] += 1
+        elif previous:
+            resumed.append((recipient, previous))
+        else:
+            to_sign.append(recipient)
+
+    if resumed:
+        # Transactions signed in a previous run go out first with their own nonces
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(broadcast, [entry for _, entry in resumed]))
+        confirmed = eth_client.w3.eth.get_transaction_count(account.address, "latest")
+        next_nonce = 0
+        for (recipient, _), result in zip(resumed, results):
+            if result["status"] == "failed" and result["nonce"] < confirmed:
+                # broadcast() found no transaction with its hash, yet the nonce
+                # is mined: another transaction used it, so this row was never paid
+                to_sign.append(recipient)
+                continue
+            if result["status"] == "failed":
+                # Still valid with its nonce, new rows must not take it
+                next_nonce = max(next_nonce, result["nonce"] + 1)
+            finish(result)
+        pending_count = eth_client.nonces.fetch_pending_count(account.address)
+        eth_client.nonces.resync(account.address, max(pending_count, next_nonce))
+
+    pending = []
+    for recipient in sorted(to_sign, key=lambda recipient: recipient["row"]):
+        nonce = eth_client.nonces.allocate(account.address)
+        tx = eth_client.build_transaction(
+            account.address, recipient["to"], recipient["amount"], nonce, gas_limit, gas_price, fee_tier
+        )
+        entry = {
+            "row": recipient["row"],
+            "to": recipient["to"],
+            "amount": str(recipient["amount"]),
+            "nonce": nonce,
+            "raw_tx": eth_client.sign_transaction(account, tx),
+            "status": "signed"
+        }
+        journal.record(entry)
+        pending.append(entry)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(broadcast, pending):
+            finish(result)
+    return summary
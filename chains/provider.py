@@ -0,0 +1,307 @@
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers import JSONBaseProvider
+
+from .rpc_cache import RpcCache, eth_cacheable, eth_cache_tier
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 15
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.25
+# Seconds before an endpoint marked down is tried again
+DEFAULT_RECHECK_INTERVAL = 30
+# Endpoints more than this many blocks behind the best one fail health checks
+DEFAULT_MAX_LAG = 5
+# Keep-alive connections kept per host
+POOL_SIZE = 32
+
+# Calls with side effects; everything else is a read that is safe to retry
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+
+@dataclass
+class Endpoint:
+    """An RPC endpoint and its last observed health."""
+    url: str
+    healthy: bool = True
+    failures: int = 0
+    down_until: float = 0.0
+    last_error: Optional[str] = None
+    latency_ms: Optional[float] = None
+    block_number: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """Convert endpoint status to dictionary."""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "latency_ms": self.latency_ms,
+            "block_number": self.block_number,
+            "last_error": self.last_error
+        }
+
+
+class RetryableError(Exception):
+    """An endpoint failure worth retrying on another endpoint."""
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """
+    Web3 HTTP provider over an ordered list of endpoints.
+
+    Requests go to the first healthy endpoint through a shared keep-alive
+    connection pool. Transport errors, HTTP 429 and 5xx responses mark the
+    endpoint down for recheck_interval seconds and fail over to the next one.
+    Reads are retried over the whole list up to retries times with jittered
+    exponential backoff; writes are tried once per endpoint and only fail over
+    when the connection could not be made.
+
+    With a cache, read calls are answered from it where possible and only the
+    misses of a batch are sent; eth_blockNumber replies move its head.
+    """
+
+    def __init__(
+        self,
+        endpoints: list,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        recheck_interval: float = DEFAULT_RECHECK_INTERVAL,
+        session: requests.Session = None,
+        cache: RpcCache = None
+    ):
+        """
+        Args:
+            endpoints (list): RPC URLs in order of preference
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for a response
+            retries (int): Rounds over the endpoint list for reads
+            backoff (float): Base delay between rounds, doubled each round
+            recheck_interval (float): Seconds before a failed endpoint is retried
+            session (requests.Session): Session to share, one is created if None
+            cache (RpcCache): Response cache for read calls, None to disable
+        """
+        super().__init__()
+        self.endpoints = [Endpoint(url) for url in endpoints]
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.recheck_interval = recheck_interval
+        self.session = session or self._create_session()
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"FailoverHTTPProvider({', '.join(e.url for e in self.endpoints)})"
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Content-Type"] = "application/json"
+        return session
+
+    # -- endpoint list -- #
+
+    def add_endpoint(self, url: str, position: int = None):
+        """Add an endpoint, at the end of the list unless position is given."""
+        with self._lock:
+            if any(e.url == url for e in self.endpoints):
+                raise ValueError(f"Endpoint already configured: {url}")
+            endpoints = list(self.endpoints)
+            endpoints.insert(len(endpoints) if position is None else position, Endpoint(url))
+            self.endpoints = endpoints
+
+    def remove_endpoint(self, url: str):
+        """Remove an endpoint from the list."""
+        with self._lock:
+            endpoints = [e for e in self.endpoints if e.url != url]
+            if len(endpoints) == len(self.endpoints):
+                raise ValueError(f"Unknown endpoint: {url}")
+            self.endpoints = endpoints
+
+    @property
+    def primary_url(self) -> Optional[str]:
+        """URL of the endpoint requests currently go to first."""
+        candidates = self._candidates()
+        return candidates[0].url if candidates else None
+
+    def _candidates(self) -> list:
+        """Healthy endpoints first, then ones due for a recheck, then the rest."""
+        now = time.monotonic()
+        endpoints = list(self.endpoints)
+        healthy = [e for e in endpoints if e.healthy]
+        due = [e for e in endpoints if not e.healthy and e.down_until <= now]
+        down = [e for e in endpoints if not e.healthy and e.down_until > now]
+        # With every endpoint down, trying one is better than failing outright
+        return healthy + due + sorted(down, key=lambda e: e.down_until)
+
+    def _mark_down(self, endpoint: Endpoint, error: Exception):
+        endpoint.healthy = False
+        endpoint.failures += 1
+        endpoint.last_error = str(error)
+        endpoint.down_until = time.monotonic() + self.recheck_interval
+
+    def _mark_up(self, endpoint: Endpoint, latency: float):
+        endpoint.healthy = True
+        endpoint.failures = 0
+        endpoint.latency_ms = round(latency * 1000, 1)
+
+    def check_health(self, max_lag: int = DEFAULT_MAX_LAG) -> list:
+        """
+        Probe every endpoint with eth_blockNumber.
+
+        Endpoints that fail, or lag more than max_lag blocks behind the
+        most advanced one, are marked down.
+
+        Returns:
+            list: Endpoint status dicts in list order
+        """
+        endpoints = list(self.endpoints)
+        for endpoint in endpoints:
+            try:
+                reply = self._post(endpoint, {"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []})
+                endpoint.block_number = int(reply["result"], 16)
+            except Exception as e:
+                self._mark_down(endpoint, e)
+
+        heads = [e.block_number for e in endpoints if e.healthy and e.block_number is not None]
+        for endpoint in endpoints:
+            if endpoint.healthy and heads and endpoint.block_number < max(heads) - max_lag:
+                self._mark_down(endpoint, f"{max(heads) - endpoint.block_number} blocks behind")
+        return [e.to_dict() for e in endpoints]
+
+    # -- transport -- #
+
+    def _post(self, endpoint: Endpoint, payload):
+        """POST one JSON-RPC payload to endpoint, updating its health."""
+        start = time.monotonic()
+        try:
+            response = self.session.post(endpoint.url, data=json.dumps(payload), timeout=self.timeout)
+        except requests.RequestException as e:
+            self._mark_down(endpoint, e)
+            raise RetryableError(str(e)) from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            error = RetryableError(f"HTTP {response.status_code} from {endpoint.url}")
+            self._mark_down(endpoint, error)
+            raise error
+        try:
+            # Some nodes send JSON-RPC errors with a 4xx status, keep their body
+            reply = response.json()
+        except ValueError as e:
+            response.raise_for_status()
+            error = RetryableError(f"Invalid JSON from {endpoint.url}")
+            self._mark_down(endpoint, error)
+            raise error from e
+        self._mark_up(endpoint, time.monotonic() - start)
+        return reply
+
+    def request(self, payload, idempotent: bool = True):
+        """
+        Send a JSON-RPC request or batch, failing over between endpoints.
+
+        Args:
+            payload (dict | list): JSON-RPC request object or batch
+            idempotent (bool): Whether the request may be retried
+
+        Returns:
+            dict | list: Decoded JSON-RPC response
+
+        Raises:
+            ConnectionError: If no endpoint could serve the request
+        """
+        if self.cache is not None and idempotent:
+            return self._cached_request(payload)
+        return self._send(payload, idempotent)
+
+    def _cached_request(self, payload):
+        """request() for reads, serving what it can from the cache."""
+        calls = payload if isinstance(payload, list) else [payload]
+        replies = [None] * len(calls)
+        misses = []
+        for i, call in enumerate(calls):
+            method, params = call["method"], call.get("params") or []
+            if eth_cacheable(method, params):
+                hit, result = self.cache.get(RpcCache.key(method, params))
+                if hit:
+                    replies[i] = {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+                    continue
+            misses.append(i)
+        if not misses:
+            return replies if isinstance(payload, list) else replies[0]
+
+        response = self._send([calls[i] for i in misses] if isinstance(payload, list) else payload, True)
+        if isinstance(payload, list) and not isinstance(response, list):
+            return response  # The whole batch was rejected
+        by_id = {reply.get("id"): reply for reply in (response if isinstance(response, list) else [response])}
+        for i in misses:
+            call = calls[i]
+            reply = by_id.get(call.get("id"))
+            replies[i] = reply
+            if not reply or "error" in reply or "result" not in reply:
+                continue
+            method, params, result = call["method"], call.get("params") or [], reply["result"]
+            if method == "eth_blockNumber":
+                self.cache.set_head(int(result, 16))
+            tier = eth_cache_tier(method, params, result, self.cache.head)
+            if tier:
+                self.cache.put(RpcCache.key(method, params), result, tier)
+        if not isinstance(payload, list):
+            return replies[0]
+        return [reply for reply in replies if reply is not None]
+
+    def _send(self, payload, idempotent: bool):
+        """Send payload over the endpoint list, see request()."""
+        rounds = self.retries if idempotent else 1
+        errors = []
+        for attempt in range(rounds):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            for endpoint in self._candidates():
+                try:
+                    return self._post(endpoint, payload)
+                except RetryableError as e:
+                    errors.append(f"{endpoint.url}: {e}")
+                    cause = e.__cause__
+                    if not idempotent and not isinstance(cause, requests.ConnectionError):
+                        # The write may have reached the node; resending is the caller's call
+                        raise ConnectionError(f"Request failed: {e}")
+        if not self.endpoints:
+            raise ConnectionError("No RPC endpoints configured")
+        raise ConnectionError(f"All RPC endpoints failed: {'; '.join(errors[-len(self.endpoints):])}")
+
+    # -- web3 provider interface -- #
+
+    def make_request(self, method, params):
+        payload = {"jsonrpc": "2.0", "method": method, "params": params or [], "id": next(self.request_counter)}
+        return self.request(payload, idempotent=method not in WRITE_METHODS)
+
+    def make_batch_request(self, batch_requests):
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params or [], "id": next(self.request_counter)}
+            for method, params in batch_requests
+        ]
+        response = self.request(payload, idempotent=not any(method in WRITE_METHODS for method, _ in batch_requests))
+        if not isinstance(response, list):
+            return response
+        return sorted(response, key=lambda reply: reply.get("id", 0))
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            return "result" in self.make_request("web3_clientVersion", [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Cached responses kept per tier before the least recently used are evicted
+DEFAULT_MAX_ENTRIES = 10000
+# Seconds a "latest" read is trusted when no newer head has been seen
+DEFAULT_LATEST_TTL = 2
+# Blocks below the head after which block-pinned results are treated as final
+DEFAULT_SAFE_DEPTH = 12
+
+LATEST = "latest"
+IMMUTABLE = "immutable"
+
+# Results that never change for the same parameters
+ETH_IMMUTABLE_METHODS = {
+    "eth_chainId",
+    "net_version",
+    "eth_getBlockByHash",
+    "eth_getBlockTransactionCountByHash",
+    "eth_getTransactionByBlockHashAndIndex",
+}
+# Results that hold until the next block
+ETH_LATEST_METHODS = {"eth_blockNumber", "eth_gasPrice", "eth_maxPriorityFeePerGas", "eth_blobBaseFee"}
+# Position of the block parameter of block-pinned reads; missing means "latest"
+ETH_BLOCK_PARAM = {
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getTransactionCount": 1,
+    "eth_call": 1,
+    "eth_estimateGas": 1,
+    "eth_getProof": 2,
+    "eth_feeHistory": 1,
+    "eth_getBlockByNumber": 0,
+    "eth_getBlockTransactionCountByNumber": 0,
+    "eth_getTransactionByBlockNumberAndIndex": 0,
+}
+# Lookups by transaction hash, final once the transaction is buried
+ETH_TX_METHODS = {"eth_getTransactionByHash", "eth_getTransactionReceipt"}
+
+
+class RpcCache:
+    """
+    Two-tier response cache keyed by method and parameters.
+
+    Immutable results stay until evicted by LRU. Latest results are tied to
+    the head block they were read at: they are dropped as soon as a newer
+    head is reported through set_head(), and after latest_ttl seconds in
+    case no head feed is running. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, latest_ttl: float = DEFAULT_LATEST_TTL):
+        """
+        Args:
+            max_entries (int): Entries kept per tier
+            latest_ttl (float): Seconds a latest result may be served without a head update
+        """
+        self.max_entries = max_entries
+        self.latest_ttl = latest_ttl
+        self.head = None
+        self._immutable = OrderedDict()
+        self._latest = OrderedDict()  # key -> (value, cached_at)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, params) -> str:
+        """Cache key for a call."""
+        return method + json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, key: str):
+        """
+        Look up key.
+
+        Returns:
+            tuple: (True, value) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            if key in self._immutable:
+                self._immutable.move_to_end(key)
+                self._hits += 1
+                return True, self._immutable[key]
+            entry = self._latest.get(key)
+            if entry and time.monotonic() - entry[1] < self.latest_ttl:
+                self._latest.move_to_end(key)
+                self._hits += 1
+                return True, entry[0]
+            self._misses += 1
+            return False, None
+
+    def put(self, key: str, value, tier: str):
+        """Store value in the IMMUTABLE or LATEST tier."""
+        with self._lock:
+            if tier == IMMUTABLE:
+                entries = self._immutable
+                entries[key] = value
+                self._latest.pop(key, None)
+            else:
+                entries = self._latest
+                entries[key] = (value, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._evictions += 1
+
+    def set_head(self, block: int):
+        """Record the current head; a newer head invalidates every latest result."""
+        with self._lock:
+            if self.head is None or block > self.head:
+                self._latest.clear()
+            # A lower head is a reorg or a lagging endpoint, keep the highest seen
+            if self.head is None or block >= self.head:
+                self.head = block
+
+    def invalidate_latest(self):
+        """Drop every latest result, e.g. after sending a transaction."""
+        with self._lock:
+            self._latest.clear()
+
+    def clear(self):
+        """Drop everything and reset the statistics."""
+        with self._lock:
+            self._immutable.clear()
+            self._latest.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "immutable_entries": len(self._immutable),
+                "latest_entries": len(self._latest),
+                "evictions": self._evictions,
+                "head": self.head
+            }
+
+
+def _block_tier(block, head, safe_depth: int):
+    """Tier for a result read at block, or None if it must not be cached."""
+    if isinstance(block, dict):
+        # EIP-1898 block reference
+        if "blockHash" in block:
+            return IMMUTABLE
+        block = block.get("blockNumber")
+    if block is None or block in ("latest", "safe", "finalized"):
+        return LATEST
+    if block == "earliest":
+        return IMMUTABLE
+    if block == "pending":
+        return None
+    number = int(block, 16) if isinstance(block, str) else block
+    if head is not None and number <= head - safe_depth:
+        return IMMUTABLE
+    return LATEST
+
+
+def eth_cache_tier(method: str, params: list, result, head, safe_depth: int = DEFAULT_SAFE_DEPTH):
+    """
+    Decide how an Ethereum JSON-RPC result may be cached.
+
+    Results at or near the head stay in the LATEST tier so a reorg cannot
+    pin a wrong answer; they become IMMUTABLE once safe_depth blocks deep.
+
+    Args:
+        method (str): JSON-RPC method
+        params (list): Call parameters
+        result: Result returned by the node
+        head (int): Current head block, or None if unknown
+        safe_depth (int): Blocks below head after which results are final
+
+    Returns:
+        str: IMMUTABLE, LATEST, or None if the result must not be cached
+    """
+    params = params or []
+    if method in ETH_IMMUTABLE_METHODS:
+        return IMMUTABLE if result is not None else LATEST
+    if method in ETH_LATEST_METHODS:
+        return LATEST
+    if method in ETH_TX_METHODS:
+        if not result or result.get("blockNumber") is None:
+            return LATEST  # Pending or unknown, ask again next block
+        return _block_tier(result["blockNumber"], head, safe_depth)
+    if method == "eth_getLogs":
+        query = params[0] if params else {}
+        if "blockHash" in query:
+            return IMMUTABLE
+        return _block_tier(query.get("toBlock", "latest"), head, safe_depth)
+    if method in ETH_BLOCK_PARAM:
+        position = ETH_BLOCK_PARAM[method]
+        return _block_tier(params[position] if len(params) > position else "latest", head, safe_depth)
+    return None
+
+
+def eth_cacheable(method: str, params: list) -> bool:
+    """Whether a call may be answered from the cache at all."""
+    if method in ETH_BLOCK_PARAM:
+        position = ETH_BLOCK_PARAM[method]
+        return not (len(params or []) > position and params[position] == "pending")
+    return method in ETH_IMMUTABLE_METHODS or method in ETH_LATEST_METHODS or method in ETH_TX_METHODS or method == "eth_getLogs"
@@ -0,0 +1,124 @@
+import threading
+import time
+from .util import decrypt_key
+
+# Default idle time after which an unlocked key is wiped, in seconds
+DEFAULT_IDLE_TIMEOUT = 300
+
+
+class KeySession:
+    """
+    Decrypted private key held in memory so that many signing operations
+    pay for the scrypt key derivation only once.
+
+    The key is decrypted by the Go core on unlock() and turned into a
+    signer object by signer_factory (e.g. eth_account's Account.from_key).
+    The session locks itself after idle_timeout seconds without use, or
+    explicitly through lock(). Locking zeroes the key bytes held by the
+    session and drops the signer. Python cannot guarantee that copies made
+    by third-party libraries are wiped, so this is best effort.
+    """
+
+    def __init__(self, signer_factory, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.signer_factory = signer_factory
+        self.idle_timeout = idle_timeout
+        self.encrypted_key = None
+        self._key = None
+        self._signer = None
+        self._last_used = 0.0
+        self._timer = None
+        self._lock = threading.RLock()
+
+    @property
+    def is_unlocked(self) -> bool:
+        """Check whether the session holds a usable key."""
+        with self._lock:
+            self._expire_if_idle()
+            return self._signer is not None
+
+    def unlock(self, encrypted_key: str, password: str):
+        """
+        Decrypt encrypted_key and keep its signer in memory.
+
+        Raises:
+            ValueError: If the key cannot be decrypted with password
+        """
+        self.load(encrypted_key, decrypt_key(encrypted_key, password))
+
+    def load(self, encrypted_key: str, private_key: str):
+        """
+        Keep an already decrypted key in memory, as unlock() does.
+
+        Args:
+            encrypted_key (str): The encrypted form of private_key, used to match signer() requests
+            private_key (str): The decrypted private key in hex format
+        """
+        with self._lock:
+            self.lock()
+            self._key = bytearray.fromhex(private_key)
+            self._signer = self.signer_factory(private_key)
+            self.encrypted_key = encrypted_key
+            self._touch()
+
+    def signer(self, encrypted_key: str = None):
+        """
+        Return the unlocked signer, refreshing the idle timer.
+
+        Args:
+            encrypted_key (str, optional): If given, the signer is only returned
+                when the session was unlocked with this encrypted key
+
+        Returns:
+            The signer object, or None if the session is locked or holds another key
+        """
+        with self._lock:
+            self._expire_if_idle()
+            if self._signer is None:
+                return None
+            if encrypted_key is not None and encrypted_key != self.encrypted_key:
+                return None
+            self._touch()
+            return self._signer
+
+    def lock(self):
+        """Wipe the decrypted key and drop the signer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._key is not None:
+                for i in range(len(self._key)):
+                    self._key[i] = 0
+            self._key = None
+            self._signer = None
+            self.encrypted_key = None
+
+    def _touch(self):
+        """Record a use and make sure the idle timer is running. Caller holds self._lock."""
+        self._last_used = time.monotonic()
+        if self._timer is None:
+            self._arm_timer(self.idle_timeout)
+
+    def _arm_timer(self, delay: float):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        """Lock when idle, otherwise re-arm for the remaining idle time."""
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return  # Superseded by lock() or a newer timer
+            self._timer = None
+            if self._signer is None:
+                return
+            remaining = self.idle_timeout - (time.monotonic() - self._last_used)
+            if remaining <= 0:
+                self.lock()
+            else:
+                self._arm_timer(remaining)
+
+    def _expire_if_idle(self):
+        """Lock the session if it has been idle too long. Caller holds self._lock."""
+        if self._signer is not None and time.monotonic() - self._last_used >= self.idle_timeout:
+            self.lock()
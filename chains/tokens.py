@@ -0,0 +1,133 @@
+import json
+from decimal import Decimal
+from eth_abi import encode, decode
+from web3 import Web3
+from py_types.token import Token
+
+# Multicall3 is deployed at the same address on mainnet, most L2s and testnets
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Function selectors
+AGGREGATE3 = bytes.fromhex("82ad56cb")      # aggregate3((address,bool,bytes)[])
+GET_ETH_BALANCE = bytes.fromhex("4d2301cc")  # Multicall3.getEthBalance(address)
+BALANCE_OF = bytes.fromhex("70a08231")       # ERC20.balanceOf(address)
+
+# balanceOf costs roughly 5-10k gas, so 1000 calls stay well under the
+# 50M gas cap most nodes apply to eth_call and return ~160 KB
+DEFAULT_CALLS_PER_MULTICALL = 1000
+# eth_calls sent together in one JSON-RPC batch request
+DEFAULT_MULTICALLS_PER_REQUEST = 10
+# Balance key of the chain's native token, which has no contract address
+NATIVE_TOKEN_KEY = "native"
+
+
+def token_key(token: Token) -> str:
+    """Key of token in get_balances() results: its lowercase contract address, or NATIVE_TOKEN_KEY"""
+    return NATIVE_TOKEN_KEY if token.is_native else token.contract_address.lower()
+
+
+class TokenScanner:
+    """
+    Read ERC-20 and native balances for many (holder, token) pairs through
+    Multicall3 aggregate3.
+
+    Pairs are packed into aggregate3 calls of up to calls_per_multicall
+    balanceOf calls, and those eth_calls are sent multicalls_per_request at
+    a time as JSON-RPC batches. A multicall that the node rejects (gas cap,
+    response size) is split in half and retried.
+    """
+
+    def __init__(
+        self,
+        eth_client,
+        multicall_address: str = MULTICALL3_ADDRESS,
+        calls_per_multicall: int = DEFAULT_CALLS_PER_MULTICALL,
+        multicalls_per_request: int = DEFAULT_MULTICALLS_PER_REQUEST
+    ):
+        """
+        Args:
+            eth_client: Ethereumchain, or any object with a compatible rpc_batch()
+            multicall_address (str): Multicall3 contract, override for dev nodes
+            calls_per_multicall (int): Maximum balance reads per aggregate3 call
+            multicalls_per_request (int): Maximum eth_calls per HTTP request
+        """
+        self.eth_client = eth_client
+        self.multicall_address = Web3.to_checksum_address(multicall_address)
+        self.calls_per_multicall = calls_per_multicall
+        self.multicalls_per_request = multicalls_per_request
+
+    def get_balances(self, holders: list, tokens: list, block="latest") -> dict:
+        """
+        Get the balance of every token for every holder.
+
+        Args:
+            holders (list): Addresses to check
+            tokens (list): Token objects; native tokens (no contract_address)
+                           are read with Multicall3.getEthBalance
+            block (str | int): Block tag or number to read balances at
+
+        Returns:
+            dict: holder -> {token_key(token) -> balance scaled by the token's
+                  decimals, or None if the call failed}, in input order. Keys
+                  are contract addresses since symbols are not unique
+        """
+        block_id = hex(block) if isinstance(block, int) else block
+        balances = {holder: {token_key(token): None for token in tokens} for holder in holders}
+
+        pairs = [(holder, token) for holder in balances for token in tokens]
+        chunks = [
+            pairs[offset:offset + self.calls_per_multicall]
+            for offset in range(0, len(pairs), self.calls_per_multicall)
+        ]
+        while chunks:
+            batch = chunks[:self.multicalls_per_request]
+            chunks = chunks[self.multicalls_per_request:]
+            replies = self.eth_client.rpc_batch([
+                ("eth_call", [{"to": self.multicall_address, "data": self._encode(chunk)}, block_id])
+                for chunk in batch
+            ])
+            for chunk, (result, error) in zip(batch, replies):
+                if error:
+                    if len(chunk) > 1:
+                        # Too much work for one eth_call, retry as two halves
+                        middle = len(chunk) // 2
+                        chunks += [chunk[:middle], chunk[middle:]]
+                    continue
+                for (holder, token), value in zip(chunk, self._decode(result)):
+                    if value is not None:
+                        balances[holder][token_key(token)] = Decimal(value).scaleb(-token.decimals)
+        return balances
+
+    def _encode(self, chunk: list) -> str:
+        """aggregate3 calldata reading the balance of each (holder, token) pair"""
+        calls = []
+        for holder, token in chunk:
+            argument = encode(["address"], [Web3.to_checksum_address(holder)])
+            if token.is_native:
+                calls.append((self.multicall_address, True, GET_ETH_BALANCE + argument))
+            else:
+                calls.append((Web3.to_checksum_address(token.contract_address), True, BALANCE_OF + argument))
+        return "0x" + (AGGREGATE3 + encode(["(address,bool,bytes)[]"], [calls])).hex()
+
+    @staticmethod
+    def _decode(result: str) -> list:
+        """Raw balances from aggregate3 return data, None for failed calls"""
+        (results,) = decode(["(bool,bytes)[]"], bytes.fromhex(result.removeprefix("0x")))
+        return [
+            int.from_bytes(data[:32], "big") if success and len(data) >= 32 else None
+            for success, data in results
+        ]
+
+
+def load_tokens(path: str) -> list:
+    """
+    Load a token list from a JSON file.
+
+    Args:
+        path (str): File holding a list of Token.to_dict() style objects
+
+    Returns:
+        list: Token objects
+    """
+    with open(path) as f:
+        return [Token.from_dict(entry) for entry in json.load(f)]
@@ -1,44 +1,192 @@
 import subprocess
 import json
+import threading
+import atexit
+import itertools
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from pathlib import Path
-import os
 from py_types.wallet import Wallet
 
-# Print the current working directory
-print(f"Current working directory: {os.getcwd()}")
-
 GO_CORE_PATH=Path("go-core/core.exe")
-# Print the absolute path to the executable
-print(f"Absolute path to go core: {os.path.abspath(GO_CORE_PATH)}")
 
-def call_go_core(args:list)->str:
-    """Execute go command with fallback to interactive mode"""
-    try:
-        # First try direct command execution
-        print(f"Executing: {str(GO_CORE_PATH)} {' '.join(args)}")
-        
-        result = subprocess.run(
-            [str(GO_CORE_PATH)] + args,
-            check=True,
+
+class GoCoreWorker:
+    """
+    Long-lived Go core process running in worker mode (`core.exe serve`).
+
+    Requests are written to the worker's stdin as one JSON object per line
+    ({"id", "method", "params"}) and answered on stdout with {"id", "result"}
+    or {"id", "error"}. The Go side handles requests concurrently, so a
+    background reader thread routes each response to the caller waiting on
+    that ID. If the process dies it is restarted on the next call.
+    """
+
+    def __init__(self, path=GO_CORE_PATH, timeout: float = 30):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._proc = None
+        self._reader = None
+        self._pending = {}
+        self._progress = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the worker process if it is not running. Caller holds self._lock."""
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        self._proc = subprocess.Popen(
+            [str(self.path), "serve"],
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            timeout=5  # Add timeout to prevent hanging
+            bufsize=1,
         )
-        
-    
-        
-        return result.stdout.strip()
-    
-    except Exception as e:
-        print(f"General exception: {str(e)}")
-        raise
-    
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(self._proc,), daemon=True
+        )
+        self._reader.start()
+
+    def _read_loop(self, proc):
+        """Dispatch response frames from proc to their waiting futures."""
+        for line in proc.stdout:
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                continue
+            request_id = frame.get("id")
+            if "progress" in frame:
+                on_progress = self._progress.get(request_id)
+                if on_progress is not None:
+                    on_progress(frame["progress"])
+                continue
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+                self._progress.pop(request_id, None)
+            if future is None:
+                continue
+            if frame.get("error"):
+                future.set_exception(ValueError(frame["error"]))
+            else:
+                future.set_result(frame.get("result"))
+
+        # stdout closed: the process exited, fail everything still in flight
+        with self._lock:
+            if self._proc is proc:
+                self._proc = None
+            pending, self._pending = self._pending, {}
+            self._progress = {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("Go core worker exited unexpectedly"))
+
+    def submit(self, method: str, params: dict = None, on_progress=None) -> Future:
+        """
+        Send a request without waiting; the returned Future resolves to its result.
+
+        on_progress, if given, is called from the reader thread with each
+        progress frame the method emits before its result.
+        """
+        params = params or {}
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+            request_id = next(self._ids)
+            future.request_id = request_id
+            self._pending[request_id] = future
+            if on_progress is not None:
+                self._progress[request_id] = on_progress
+            frame = json.dumps({"id": request_id, "method": method, "params": params})
+            try:
+                self._proc.stdin.write(frame + "\n")
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self._pending.pop(request_id, None)
+                self._progress.pop(request_id, None)
+                self._proc = None
+                raise RuntimeError(f"Go core worker is not running: {str(e)}")
+        return future
+
+    def call(self, method: str, params: dict = None, timeout: float = None):
+        """
+        Execute a worker method and return its decoded result.
+
+        The call is retried once on a fresh process if the worker dies
+        before answering; every core method is safe to repeat.
+
+        Raises:
+            ValueError: The core rejected the request (bad mnemonic, wrong password...)
+            RuntimeError: The worker could not be started or kept crashing
+        """
+        params = params or {}
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            try:
+                return self.submit(method, params).result(timeout=timeout)
+            except RuntimeError:
+                if attempt == 1:
+                    raise
+
+    async def call_async(self, method: str, params: dict = None, timeout: float = None):
+        """
+        Awaitable call(): the event loop waits on the worker's answer
+        without blocking a thread.
+        """
+        import asyncio  # Only asyncio clients need it, keep it off the CLI startup path
+        params = params or {}
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(self.submit(method, params)), timeout)
+            except RuntimeError:
+                if attempt == 1:
+                    raise
+
+    def cancel(self, future: Future) -> Future:
+        """Ask the worker to cancel the request behind a future returned by submit()."""
+        return self.submit("cancel", {"id": future.request_id})
+
+    def close(self):
+        """Stop the worker process, if running."""
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> GoCoreWorker:
+    """Return the shared Go core worker for this session, creating it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = GoCoreWorker()
+            atexit.register(_worker.close)
+        return _worker
+
+
+def call_core(method: str, **params):
+    """Execute a Go core method through the shared worker process."""
+    return get_worker().call(method, params)
+
+
+async def call_core_async(method: str, **params):
+    """Awaitable call_core() for asyncio code."""
+    return await get_worker().call_async(method, params)
+
 
 def generate_mnemonic()->str:
     """Generate a BIP-39 mnemonic"""
-    # Debug: Print when function is called                 
-    return call_go_core(["generate-mnemonic"])
+    return call_core("generate-mnemonic")
  
 
 def encrypt_key(privkey_hex:str, password:str=None)->str:
@@ -54,12 +202,12 @@ def encrypt_key(privkey_hex:str, password:str=None)->str:
     """
     if password:
         # Use provided password
-        return call_go_core(["encrypt", privkey_hex, password])
+        return call_core("encrypt", private_key=privkey_hex, password=password)
     else:
         # Generate a password
         import secrets
         generated_password = secrets.token_hex(16)
-        encrypted_key = call_go_core(["encrypt", privkey_hex, generated_password])
+        encrypted_key = call_core("encrypt", private_key=privkey_hex, password=generated_password)
         return encrypted_key, generated_password
 
 def decrypt_key(encrypted_key:str, password:str)->str:
@@ -73,33 +221,107 @@ def decrypt_key(encrypted_key:str, password:str)->str:
     Returns:
         str: Decrypted private key
     """
-    return call_go_core(["decrypt", encrypted_key, password])
+    return call_core("decrypt", encrypted_key=encrypted_key, password=password)
 
 
-def derive_key(mnemonic: str) -> tuple[str, str]:
+def _crypt_batch(method: str, records, batch_size: int, in_flight: int = 2):
     """
-    Derive address and private key for a specific blockchain.
+    Stream records through a Go core bulk method, yielding (result, error) in input order.
+
+    Up to in_flight batches are queued in the worker at once so its goroutine
+    pool stays busy across batch boundaries.
+    """
+    worker = get_worker()
+    pending = deque()
+    batch = []
+
+    def drain():
+        for item in pending.popleft().result():
+            yield item.get("result"), item.get("error")
+
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            pending.append(worker.submit(method, {"records": batch}))
+            batch = []
+            while len(pending) >= in_flight:
+                yield from drain()
+    if batch:
+        pending.append(worker.submit(method, {"records": batch}))
+    while pending:
+        yield from drain()
+
+
+def encrypt_keys(records, batch_size: int = 256):
+    """
+    Encrypt many private keys in parallel using Go core.
     
     Args:
-        chain_type: Type of blockchain (eth, btc, sol)
-        mnemonic: BIP-39 mnemonic phrase
+        records: Iterable of (privkey_hex, password) tuples
+        batch_size: Records per Go core request
         
-    Returns:
-        Tuple of (address, private_key)
+    Yields:
+        Tuples of (encrypted_key, error) in input order; exactly one is None
+    """
+    return _crypt_batch(
+        "encrypt-batch",
+        ({"key": key, "password": password} for key, password in records),
+        batch_size,
+    )
+
+def decrypt_keys(records, batch_size: int = 256):
     """
-    output = call_go_core(["derive-key", mnemonic])
-    lines = output.split("\n")
+    Decrypt many private keys in parallel using Go core.
     
-    # Parse output lines for address and private key
-    if len(lines) < 2:
-        raise ValueError(f"Unexpected output format: {output}")
+    Args:
+        records: Iterable of (encrypted_key, password) tuples
+        batch_size: Records per Go core request
+        
+    Yields:
+        Tuples of (private_key, error) in input order; exactly one is None
+    """
+    return _crypt_batch(
+        "decrypt-batch",
+        ({"key": key, "password": password} for key, password in records),
+        batch_size,
+    )
+
+def rekey_keys(records, batch_size: int = 256):
+    """
+    Re-encrypt many keys under new passwords in parallel using Go core.
     
-    address_line, privkey_line = lines[0], lines[1]
+    The decrypted keys never leave the Go process.
     
-    return (
-        address_line.split(": ")[1].strip(),  # Address
-        privkey_line.split(": ")[1].strip()   # Private Key
+    Args:
+        records: Iterable of (encrypted_key, old_password, new_password) tuples
+        batch_size: Records per Go core request
+        
+    Yields:
+        Tuples of (encrypted_key, error) in input order; exactly one is None
+    """
+    return _crypt_batch(
+        "rekey-batch",
+        (
+            {"key": key, "password": old, "new_password": new}
+            for key, old, new in records
+        ),
+        batch_size,
     )
+
+
+def derive_key(mnemonic: str) -> tuple[str, str]:
+    """
+    Derive Ethereum address and private key.
+    
+    Args:
+        mnemonic: BIP-39 mnemonic phrase
+        
+    Returns:
+        Tuple of (address, private_key)
+    """
+    result = call_core("derive-key", mnemonic=mnemonic)
+    return result["address"], result["private_key"]
+
 def derive_sol(mnemonic:str)->tuple[str,str]:
     """
     Derive address and private key for Solana.
@@ -107,19 +329,8 @@ def derive_sol(mnemonic:str)->tuple[str,str]:
     Args:
         mnemonic: BIP-39 mnemonic phrase
     """
-    output = call_go_core(["derive-sol", mnemonic])
-    lines = output.split("\n")
-    
-    # Parse output lines for address and private key
-    if len(lines) < 2:
-        raise ValueError(f"Unexpected output format: {output}")
-    
-    address_line, privkey_line = lines[0], lines[1]
-    
-    return (
-        address_line.split(": ")[1].strip(),  # Address
-        privkey_line.split(": ")[1].strip()   # Private Key
-    )
+    result = call_core("derive-sol", mnemonic=mnemonic)
+    return result["address"], result["private_key"]
 
 def derive_btc(mnemonic: str, witness_type="legacy") -> tuple[str, str]:
     """
@@ -129,16 +340,125 @@ def derive_btc(mnemonic: str, witness_type="legacy") -> tuple[str, str]:
         mnemonic: BIP-39 mnemonic phrase
         witness_type: Address format (legacy, segwit, bech32)
     """
-    output = call_go_core(["derive-btc", mnemonic, witness_type])
-    lines = output.split("\n")
+    result = call_core("derive-btc", mnemonic=mnemonic, witness_type=witness_type)
+    return result["address"], result["private_key"]
+
+def derive_all(mnemonic: str) -> dict:
+    """
+    Derive the default keys of every chain with one seed computation.
     
-    # Parse output lines for address and private key
-    if len(lines) < 2:
-        raise ValueError(f"Unexpected output format: {output}")
+    Args:
+        mnemonic: BIP-39 mnemonic phrase
     
-    address_line, privkey_line = lines[0], lines[1]
+    Returns:
+        Dict with "eth", "btc" and "sol" entries holding path, private_key,
+        public_key and address; the "btc" entry has "addresses" keyed by
+        format (legacy, segwit, bech32) instead of "address"
+    """
+    return call_core("derive-all", mnemonic=mnemonic)
+
+def clear_key_cache():
+    """Wipe the seeds and extended keys cached by the Go core worker."""
+    call_core("cache-clear")
+
+
+def derive_range(
+    chain: str,
+    mnemonic: str,
+    account: int = 0,
+    start: int = 0,
+    count: int = 1,
+    witness_type: str = "legacy",
+    batch_size: int = 1000,
+):
+    """
+    Derive consecutive address indices of one account.
+
+    Rows are requested from the Go core in batches of batch_size and
+    yielded as they arrive, so tens of thousands of addresses can be
+    provisioned without holding them all in memory.
+
+    Args:
+        chain: Blockchain (eth, btc, sol)
+        mnemonic: BIP-39 mnemonic phrase
+        account: BIP-44 account number
+        start: First address index
+        count: Number of addresses to derive
+        witness_type: Address format for Bitcoin (legacy, segwit, bech32)
+        batch_size: Rows per Go core request
+
+    Yields:
+        Tuples of (index, address, private_key)
+    """
+    end = start + count
+    for batch_start in range(start, end, batch_size):
+        rows = call_core(
+            "derive-range",
+            chain=chain,
+            mnemonic=mnemonic,
+            account=account,
+            start=batch_start,
+            count=min(batch_size, end - batch_start),
+            witness_type=witness_type,
+        )
+        for row in rows:
+            yield row["index"], row["address"], row["private_key"]
+
+
+def vanity(
+    chain: str,
+    prefix: str = "",
+    suffix: str = "",
+    witness_type: str = "legacy",
+    mnemonic: str = None,
+    account: int = 0,
+    start_index: int = 0,
+    case_sensitive: bool = False,
+    timeout: float = None,
+    on_progress=None,
+):
+    """
+    Search for an address matching a prefix and/or suffix on all CPU cores.
+    
+    Without a mnemonic every candidate is a fresh mnemonic and the match is
+    its first address, so it can be used directly with 'create'. With a
+    mnemonic, address indices of the given account are searched instead,
+    which is much faster but yields an address at a non-zero index.
     
-    return (
-        address_line.split(": ")[1].strip(),  # Address
-        privkey_line.split(": ")[1].strip()   # Private Key
-    )
\ No newline at end of file
+    Args:
+        chain: Blockchain (eth, btc, sol)
+        prefix: Required start of the address (e.g. "0xabc", "1Love", "bc1qxy")
+        suffix: Required end of the address
+        witness_type: Address format for Bitcoin (legacy, segwit, bech32)
+        mnemonic: Mnemonic whose address indices are searched
+        account: BIP-44 account searched when a mnemonic is given
+        start_index: First address index searched when a mnemonic is given
+        case_sensitive: Match base58 characters exactly
+        timeout: Seconds after which the search is cancelled
+        on_progress: Called about once a second with a dict of attempts,
+            keys_per_sec and elapsed
+        
+    Returns:
+        dict: mnemonic (fresh mode only), index, path, address, private_key
+            and attempts, or None if the search timed out
+    """
+    worker = get_worker()
+    params = {
+        "chain": chain,
+        "prefix": prefix,
+        "suffix": suffix,
+        "witness_type": witness_type,
+        "case_sensitive": case_sensitive,
+        "mnemonic": mnemonic or "",
+        "account": account,
+        "start_index": start_index,
+    }
+    future = worker.submit("vanity", params, on_progress=on_progress)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        worker.cancel(future)
+        return None
+    except KeyboardInterrupt:
+        worker.cancel(future)
+        raise
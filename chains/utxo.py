@@ -0,0 +1,134 @@
+import threading
+import time
+
+# Outputs worth less than this many satoshis are not created; the value goes to the fee
+DUST_LIMIT = 546
+# Seconds between full reloads of an address; sync() only fetches newer outputs in between
+FULL_SYNC_INTERVAL = 600
+# UTXOs requested per getutxos page
+UTXO_PAGE_SIZE = 1000
+
+
+def outpoint(utxo: dict) -> tuple:
+    """(txid, output index) identifying a UTXO."""
+    return utxo["txid"], utxo["output_n"]
+
+
+class UtxoSet:
+    """
+    Unspent outputs of the addresses we send from, held in memory.
+
+    refresh() reloads an address from the provider; sync() only asks for
+    outputs newer than the last confirmed one it has seen, and falls back to
+    a full reload every FULL_SYNC_INTERVAL seconds to notice outputs spent
+    elsewhere. Outputs spent by our own broadcasts are hidden until the
+    provider stops reporting them, and our change outputs are usable right
+    away, so back-to-back sends neither double-spend nor wait for
+    confirmations.
+    """
+
+    def __init__(self, service_getter):
+        """
+        Args:
+            service_getter: Callable returning the bitcoinlib Service to query
+        """
+        self.service_getter = service_getter
+        self._utxos = {}  # address -> {outpoint: utxo}
+        self._spent = set()
+        self._cursor = {}  # address -> txid of the newest confirmed UTXO seen
+        self._synced_at = {}  # address -> monotonic time of the last full reload
+        self._lock = threading.Lock()
+
+    def _fetch(self, address: str, after_txid: str = "") -> list:
+        """getutxos for address, oldest first, following pages until complete."""
+        service = self.service_getter()
+        fetched = []
+        while True:
+            page = service.getutxos(address, after_txid=after_txid, limit=UTXO_PAGE_SIZE)
+            fetched.extend(page)
+            if getattr(service, "complete", True) or not page:
+                break
+            after_txid = page[-1]["txid"]
+        with self._lock:
+            confirmed = [utxo["txid"] for utxo in fetched if utxo.get("confirmations")]
+            if confirmed:
+                self._cursor[address] = confirmed[-1]
+        return fetched
+
+    def sync(self, address: str, max_age: float = FULL_SYNC_INTERVAL) -> list:
+        """
+        Bring the outputs of address up to date, incrementally when possible.
+
+        Args:
+            address (str): Address to sync
+            max_age (float): Seconds after which a full reload is done instead
+
+        Returns:
+            list: Spendable UTXO dicts of address, largest first
+        """
+        synced_at = self._synced_at.get(address)
+        if synced_at is None or time.monotonic() - synced_at > max_age or address not in self._cursor:
+            return self.refresh(address)
+        fetched = self._fetch(address, self._cursor[address])
+        with self._lock:
+            known = self._utxos.setdefault(address, {})
+            for utxo in fetched:
+                known[outpoint(utxo)] = utxo
+        return self.available(address)
+
+    def invalidate(self, address: str):
+        """Make the next sync() of address a full reload."""
+        self._synced_at.pop(address, None)
+
+    def refresh(self, address: str) -> list:
+        """
+        Reload the unspent outputs of address from the provider.
+
+        Returns:
+            list: Spendable UTXO dicts of address, largest first
+        """
+        fetched = self._fetch(address)
+        with self._lock:
+            self._synced_at[address] = time.monotonic()
+            known = {outpoint(utxo): utxo for utxo in fetched}
+            for point, utxo in self._utxos.get(address, {}).items():
+                if point in known:
+                    continue
+                if utxo.get("pending") and point not in self._spent:
+                    known[point] = utxo  # Our change, not indexed by the provider yet
+                else:
+                    # The provider no longer reports it, stop tracking the spend
+                    self._spent.discard(point)
+            self._utxos[address] = known
+        return self.available(address)
+
+    def available(self, address: str) -> list:
+        """Spendable UTXOs of address as last loaded, largest first."""
+        with self._lock:
+            utxos = [
+                utxo for point, utxo in self._utxos.get(address, {}).items()
+                if point not in self._spent
+            ]
+        return sorted(utxos, key=lambda utxo: utxo["value"], reverse=True)
+
+    def balance(self, address: str) -> int:
+        """Spendable satoshis of address as last loaded."""
+        return sum(utxo["value"] for utxo in self.available(address))
+
+    def spend(self, utxos: list):
+        """Hide utxos consumed by a broadcast transaction."""
+        with self._lock:
+            self._spent.update(outpoint(utxo) for utxo in utxos)
+
+    def add(self, address: str, txid: str, output_n: int, value: int):
+        """Make an output of our own unconfirmed transaction spendable."""
+        utxo = {
+            "address": address,
+            "txid": txid,
+            "output_n": output_n,
+            "value": value,
+            "confirmations": 0,
+            "pending": True
+        }
+        with self._lock:
+            self._utxos.setdefault(address, {})[outpoint(utxo)] = utxo
@@ -0,0 +1,207 @@
+import threading
+
+# Confirmations after which a transaction is reported final and dropped
+DEFAULT_CONFIRMATIONS = 12
+# Seconds between head checks when running in the background
+DEFAULT_POLL_INTERVAL = 4
+# Receipt lookups per JSON-RPC batch request
+RECEIPT_BATCH_SIZE = 100
+
+
+class TxWatcher:
+    """
+    Tracks many transaction hashes for one Ethereumchain client.
+
+    Each poll() costs one eth_blockNumber call, or none when the client has a
+    WebSocket head feed, which also lets wait() return as soon as a block
+    arrives instead of sleeping poll_interval. Only when the head has moved
+    are receipts fetched, in JSON-RPC batches and only for hashes that are
+    still pending; confirmations of mined hashes are computed from the
+    shared head. The new head block rides along in the first batch: when it
+    does not directly extend the previous head (its parent hash differs, or
+    blocks were skipped) a reorg may have happened, and only then are the
+    receipts of mined hashes fetched again. A missing receipt puts the hash
+    back to pending, one in a different block replaces the old one.
+    Callbacks receive an event dict whenever a hash changes status
+    (pending -> confirmed/failed, or back to pending after a reorg) or
+    block, and once more when it reaches the confirmation threshold, after
+    which it is no longer tracked.
+
+    Event dicts have the keys hash, status, previous_status, block_number,
+    confirmations and final.
+    """
+
+    def __init__(
+        self,
+        eth_client,
+        confirmations: int = DEFAULT_CONFIRMATIONS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Args:
+            eth_client: Ethereumchain used for head and receipt lookups
+            confirmations (int): Confirmations at which a hash is final
+            poll_interval (float): Seconds between polls in the background thread
+        """
+        self.eth_client = eth_client
+        self.confirmations = confirmations
+        self.poll_interval = poll_interval
+        self.head = None
+        self._head_hash = None
+        self._tracked = {}  # hash -> {"status", "block_number", "block_hash"}
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on_change(self, callback):
+        """Register callback(event) for status changes and final confirmations."""
+        self._callbacks.append(callback)
+
+    def add(self, tx_hash: str):
+        """Start tracking tx_hash as pending."""
+        with self._lock:
+            self._tracked.setdefault(tx_hash.lower(), {"status": "pending", "block_number": None, "block_hash": None})
+
+    def remove(self, tx_hash: str):
+        """Stop tracking tx_hash."""
+        with self._lock:
+            self._tracked.pop(tx_hash.lower(), None)
+
+    @property
+    def tracked(self) -> dict:
+        """Current status of every tracked hash."""
+        with self._lock:
+            return {tx_hash: dict(state) for tx_hash, state in self._tracked.items()}
+
+    def poll(self) -> list:
+        """
+        Check for a new block and update tracked hashes.
+
+        Returns:
+            list: Events emitted by this poll
+        """
+        heads = self._feed()
+        head = heads.head if heads else self.eth_client.w3.eth.block_number
+        if head == self.head:
+            return []
+        previous_head, self.head = self.head, head
+
+        with self._lock:
+            pending = [tx_hash for tx_hash, state in self._tracked.items() if state["status"] == "pending"]
+            mined = [tx_hash for tx_hash, state in self._tracked.items() if state["status"] != "pending"]
+        block, receipts = self._fetch_receipts(pending, head_block=head)
+        # Mined hashes are only looked up again when the chain may have reorged
+        extends = block is not None and previous_head == head - 1 and block["parentHash"] == self._head_hash
+        self._head_hash = block["hash"] if block else None
+        if mined and not extends:
+            receipts.update(self._fetch_receipts(mined)[1])
+        verified = set(receipts) if not extends else set(receipts) | set(mined)
+
+        events = []
+        with self._lock:
+            for tx_hash, receipt in receipts.items():
+                state = self._tracked.get(tx_hash)
+                if state is None:
+                    continue
+                previous = state["status"]
+                if not receipt:
+                    if state["block_hash"] is not None:
+                        # Its block was reorged out, wait for it to be mined again
+                        state.update(status="pending", block_number=None, block_hash=None)
+                        events.append(self._event(tx_hash, state, previous, final=False))
+                    continue
+                if receipt["blockHash"] == state["block_hash"]:
+                    continue
+                state["block_number"] = int(receipt["blockNumber"], 16)
+                state["block_hash"] = receipt["blockHash"]
+                state["status"] = "confirmed" if int(receipt["status"], 16) == 1 else "failed"
+                events.append(self._event(tx_hash, state, previous, final=False))
+
+            # Only hashes known to still be in place can become final
+            for tx_hash, state in list(self._tracked.items()):
+                if (
+                    tx_hash in verified and state["block_number"] is not None
+                    and head - state["block_number"] >= self.confirmations
+                ):
+                    events.append(self._event(tx_hash, state, state["status"], final=True))
+                    del self._tracked[tx_hash]
+
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
+
+    def _fetch_receipts(self, hashes: list, head_block: int = None) -> tuple:
+        """
+        Receipts of hashes in JSON-RPC batches.
+
+        Args:
+            hashes (list): Transaction hashes to look up
+            head_block (int, optional): Block whose header is added to the first batch
+
+        Returns:
+            tuple: (head block or None, {hash: receipt, or None if the node has none});
+                   hashes whose lookup failed are left out
+        """
+        block = None
+        receipts = {}
+        extra = [("eth_getBlockByNumber", [hex(head_block), False])] if head_block is not None else []
+        for offset in range(0, max(len(hashes), len(extra)), RECEIPT_BATCH_SIZE):
+            chunk = hashes[offset:offset + RECEIPT_BATCH_SIZE]
+            replies = self.eth_client.rpc_batch(extra + [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk])
+            if extra:
+                block = replies[0][0]
+                replies = replies[1:]
+                extra = []
+            for tx_hash, (receipt, error) in zip(chunk, replies):
+                # Errors leave the hash as it is until the next block
+                if not error:
+                    receipts[tx_hash] = receipt
+        return block, receipts
+
+    def _event(self, tx_hash: str, state: dict, previous: str, final: bool) -> dict:
+        return {
+            "hash": tx_hash,
+            "status": state["status"],
+            "previous_status": previous,
+            "block_number": state["block_number"],
+            "confirmations": 0 if state["block_number"] is None else self.head - state["block_number"],
+            "final": final
+        }
+
+    def _feed(self):
+        """The client's connected head feed, if any."""
+        heads = getattr(self.eth_client, "heads", None)
+        return heads if heads is not None and heads.connected and heads.head is not None else None
+
+    def wait(self):
+        """Wait for the next block, or poll_interval seconds without a head feed."""
+        heads = self._feed()
+        if heads:
+            heads.wait_for_head(self.head, self.poll_interval)
+        else:
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Poll every poll_interval seconds in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                # A failed poll is retried on the next interval
+                pass
+            self.wait()
@@ -0,0 +1,227 @@
+import asyncio
+import itertools
+import json
+import threading
+
+import aiohttp
+
+# Seconds before the first reconnect attempt, doubled up to MAX_RECONNECT_DELAY
+DEFAULT_RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+# Seconds start() waits for the first subscription to be confirmed
+SUBSCRIBE_TIMEOUT = 10
+# Latest-tier cache lifetime while heads are pushed; a missed head still expires
+FEED_LATEST_TTL = 60
+
+
+class HeadSubscriber:
+    """
+    Push feed of new blocks over an eth_subscribe WebSocket.
+
+    Subscribes to newHeads and, with pending=True, to full pending
+    transactions, which are filtered down to tracked addresses. Every new
+    head moves the RPC cache head, dropping cached balances and other
+    latest reads, wakes threads blocked in wait_for_head() and runs the
+    on_head callbacks. The connection lives on an asyncio loop in a daemon
+    thread and is re-established with backoff when it drops; callbacks run
+    on that thread.
+    """
+
+    def __init__(self, ws_url: str, cache=None, pending: bool = False, reconnect_delay: float = DEFAULT_RECONNECT_DELAY):
+        """
+        Args:
+            ws_url (str): ws:// or wss:// endpoint
+            cache (RpcCache): Cache to move to each new head, optional
+            pending (bool): Also subscribe to pending transactions
+            reconnect_delay (float): Seconds before the first reconnect attempt
+        """
+        self.ws_url = ws_url
+        self.cache = cache
+        self.pending = pending
+        self.reconnect_delay = reconnect_delay
+        self.head = None
+        self.connected = False
+        self.last_error = None
+        self._addresses = set()
+        self._head_callbacks = []
+        self._pending_callbacks = []
+        self._subscriptions = {}  # subscription id -> "newHeads" | "pending"
+        self._ids = itertools.count(1)
+        self._cache_ttl = cache.latest_ttl if cache else None
+        self._condition = threading.Condition()
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self._stopping = False
+
+    def on_head(self, callback):
+        """Register callback(header) for every new block header."""
+        self._head_callbacks.append(callback)
+
+    def on_pending(self, callback):
+        """Register callback(tx) for pending transactions to or from tracked addresses."""
+        self._pending_callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Unregister a head or pending callback."""
+        for callbacks in (self._head_callbacks, self._pending_callbacks):
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def track(self, address: str):
+        """Report pending transactions to or from address."""
+        self._addresses.add(address.lower())
+
+    def untrack(self, address: str):
+        """Stop reporting pending transactions of address."""
+        self._addresses.discard(address.lower())
+
+    def wait_for_head(self, after: int = None, timeout: float = None):
+        """
+        Block until a head newer than after arrives.
+
+        Args:
+            after (int): Head already seen, None to wait for any head
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            int: The current head, unchanged if the wait timed out
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.head is not None and (after is None or self.head > after) or self._stopping,
+                timeout
+            )
+            return self.head
+
+    def start(self, timeout: float = SUBSCRIBE_TIMEOUT):
+        """
+        Connect in a background thread and wait for the subscription.
+
+        Raises:
+            ConnectionError: If the first connection fails or the subscription
+                             is not confirmed within timeout
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout) or self._stopping:
+            self.stop()
+            raise ConnectionError(f"Failed to subscribe to {self.ws_url}: {self.last_error or 'timed out'}")
+
+    def stop(self):
+        """Close the connection and stop the background thread."""
+        self._stopping = True
+        with self._condition:
+            self._condition.notify_all()
+        if self._loop and self._task:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run_loop(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self._run(ready))
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+            self._loop = self._task = None
+
+    async def _run(self, ready: threading.Event):
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping:
+                try:
+                    async with session.ws_connect(self.ws_url, heartbeat=30) as ws:
+                        await self._subscribe(ws)
+                        self._set_connected(True)
+                        ready.set()
+                        delay = self.reconnect_delay
+                        async for message in ws:
+                            if message.type != aiohttp.WSMsgType.TEXT:
+                                break
+                            self._dispatch(json.loads(message.data))
+                    self.last_error = "WebSocket closed"
+                except Exception as e:
+                    self.last_error = str(e) or type(e).__name__
+                    if not ready.is_set():
+                        # Fail start() right away instead of retrying a bad URL
+                        self._stopping = True
+                        ready.set()
+                finally:
+                    self._set_connected(False)
+                if self._stopping:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _subscribe(self, ws):
+        self._subscriptions.clear()
+        kinds = [("newHeads", ["newHeads"])]
+        if self.pending:
+            kinds.append(("pending", ["newPendingTransactions", True]))
+        for kind, params in kinds:
+            request_id = next(self._ids)
+            await ws.send_json({"jsonrpc": "2.0", "id": request_id, "method": "eth_subscribe", "params": params})
+            # Notifications for an earlier subscription may arrive first
+            while True:
+                reply = await asyncio.wait_for(ws.receive_json(), SUBSCRIBE_TIMEOUT)
+                if reply.get("id") == request_id:
+                    break
+                self._dispatch(reply)
+            if "error" in reply:
+                if kind == "newHeads":
+                    raise ConnectionError(f"eth_subscribe failed: {reply['error']}")
+                # Nodes without full pending transactions still give us heads
+                self.last_error = f"Pending transactions unavailable: {reply['error']}"
+                continue
+            self._subscriptions[reply["result"]] = kind
+
+    def _dispatch(self, message: dict):
+        if message.get("method") != "eth_subscription":
+            return
+        params = message.get("params") or {}
+        kind = self._subscriptions.get(params.get("subscription"))
+        result = params.get("result")
+        if kind == "newHeads" and result:
+            self._new_head(result)
+        elif kind == "pending" and isinstance(result, dict):
+            parties = {(result.get("from") or "").lower(), (result.get("to") or "").lower()}
+            if parties & self._addresses:
+                self._notify(self._pending_callbacks, result)
+
+    def _new_head(self, header: dict):
+        number = int(header["number"], 16)
+        with self._condition:
+            if self.head is not None and number <= self.head:
+                # A replacement block at a known height still outdates latest reads
+                if self.cache is not None:
+                    self.cache.invalidate_latest()
+                return
+            self.head = number
+            if self.cache is not None:
+                self.cache.set_head(number)
+            self._condition.notify_all()
+        self._notify(self._head_callbacks, header)
+
+    @staticmethod
+    def _notify(callbacks: list, value):
+        for callback in list(callbacks):
+            try:
+                callback(value)
+            except Exception:
+                # A failing callback must not stop the feed
+                pass
+
+    def _set_connected(self, connected: bool):
+        self.connected = connected
+        if self.cache is not None:
+            # Without pushed heads, latest reads fall back to the short lifetime
+            self.cache.latest_ttl = FEED_LATEST_TTL if connected else self._cache_ttl
@@ -1,8 +1,21 @@
 import sys
-from chains.util import call_go_core, generate_mnemonic,derive_key
+from chains.util import generate_mnemonic,derive_key, derive_all, vanity
 from py_types.wallet import Wallet
-from utils.bitcoin_mode import BitcoinMode
-from utils.ethereum_mode import EthereumMode
+
+# Chain modes pull in web3/eth_account/bitcoinlib, so they are imported on first
+# use by get_mode() rather than here; 'generate' and 'help' never pay for them.
+_MODES = {
+    "eth": ("utils.ethereum_mode", "EthereumMode"),
+    "btc": ("utils.bitcoin_mode", "BitcoinMode"),
+}
+
+def get_mode(name, modes):
+    """Return the mode handler for a chain, importing and creating it on first use"""
+    if name not in modes:
+        import importlib
+        module_name, class_name = _MODES[name]
+        modes[name] = getattr(importlib.import_module(module_name), class_name)()
+    return modes[name]
 
 def print_welcome():
     print("\n" + "="*60)
@@ -20,6 +33,9 @@ def print_help():
     print("\n  eth           - Enter Ethereum mode")    
     print("\n🔹 General Commands:")
     print("  generate      - Generate new BIP-39 mnemonic phrase")
+    print("  derive-all [mnemonic] - Show the ETH, BTC (every format) and SOL addresses of a mnemonic")
+    print("  vanity <chain> <prefix> [format] - Find a mnemonic whose address starts with prefix")
+    print("                  (chain: eth, btc, sol; format for btc: legacy, segwit, bech32)")
     print("  help          - Show this help message")
     print("  exit          - Exit the program")
     print("\n" + "="*60)
@@ -61,11 +77,59 @@ def handle_eth_command(args, last_mnemonic):
     except Exception as e:
         print(f"\n⚠️  Error deriving Ethereum keys: {str(e)}")
 
+def handle_derive_all_command(args, last_mnemonic):
+    """Show the default addresses and public keys of every chain"""
+    mnemonic = get_mnemonic_from_user(args, last_mnemonic)
+    try:
+        keys = derive_all(mnemonic)
+        print(f"\n🔑 Ethereum ({keys['eth']['path']}):")
+        print(f"Address: {keys['eth']['address']}")
+        print(f"Public Key: {keys['eth']['public_key']}")
+        print(f"\n🔑 Bitcoin ({keys['btc']['path']}):")
+        for address_format, address in keys["btc"]["addresses"].items():
+            print(f"{address_format.capitalize()} Address: {address}")
+        print(f"Public Key: {keys['btc']['public_key']}")
+        print(f"\n🔑 Solana ({keys['sol']['path']}):")
+        print(f"Address: {keys['sol']['address']}")
+        print(f"Public Key: {keys['sol']['public_key']}\n")
+    except Exception as e:
+        print(f"\n⚠️  Error deriving keys: {str(e)}")
+
+def handle_vanity_command(args):
+    """Search for a vanity address and return the matching mnemonic"""
+    parts = args.split()
+    if len(parts) < 2:
+        print("\n⚠️ Usage: vanity <eth|btc|sol> <prefix> [legacy|segwit|bech32]\n")
+        return None
+    chain, prefix = parts[0], parts[1]
+    witness_type = parts[2] if len(parts) > 2 else "legacy"
+    
+    def show_progress(progress):
+        print(f"\r⏳ {progress['attempts']:,} keys tried ({progress['keys_per_sec']:,.0f} keys/sec)", end="", flush=True)
+    
+    print(f"\n🔍 Searching for {chain.upper()} address starting with '{prefix}' (Ctrl+C to cancel)...")
+    try:
+        match = vanity(chain, prefix=prefix, witness_type=witness_type, on_progress=show_progress)
+    except KeyboardInterrupt:
+        print("\n\n↩️ Vanity search cancelled\n")
+        return None
+    except ValueError as e:
+        print(f"\n⚠️ {str(e)}\n")
+        return None
+    
+    print("\n\n" + "="*60)
+    print(" " * 20 + "✨ VANITY ADDRESS ✨")
+    print("="*60)
+    print(f"\nAddress: {match['address']}")
+    print(f"Mnemonic: {match['mnemonic']}")
+    print(f"Found after {match['attempts']:,} attempts")
+    print("\n⚠️ IMPORTANT: Save this mnemonic securely!\n")
+    return match["mnemonic"]
+
 def main():
     print_welcome()
     last_mnemonic = None
-    eth_mode = EthereumMode()
-    btc_mode = BitcoinMode()
+    modes = {}
     
     while True:
         try:
@@ -94,15 +158,23 @@ def main():
                 print("\n⚠️ IMPORTANT: Save this mnemonic securely!")
                 print("It can be used to recover your wallet if lost.\n")
 
+            elif command == "derive-all":
+                handle_derive_all_command(args, last_mnemonic)
+
+            elif command == "vanity":
+                mnemonic = handle_vanity_command(args)
+                if mnemonic:
+                    last_mnemonic = mnemonic
+
             elif command == "eth":
                 # Pass the current wallet state to the Ethereum mode
                 # and get the updated wallet state when it returns
-                eth_mode.start(last_mnemonic)
+                get_mode("eth", modes).start(last_mnemonic)
 
             elif command == "btc":
                 # Pass the current wallet state to the Bitcoin mode
                 # and get the updated wallet state when it returns
-                btc_mode.start(last_mnemonic)
+                get_mode("btc", modes).start(last_mnemonic)
             else:
                 print("\n" + "="*60)
                 print(" " * 20 + "⚠️ UNKNOWN COMMAND ⚠️")
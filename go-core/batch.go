@@ -0,0 +1,163 @@
+package main
+
+import (
+	"context"
+	"encoding/hex"
+	"fmt"
+	"runtime"
+	"sync"
+)
+
+// scryptSlots bounds the number of concurrent scrypt derivations across all
+// batch jobs in the process. Each derivation is CPU bound and allocates
+// 128*N*r bytes (32 MiB with the parameters in crypto.go), so running more
+// than one per core only adds memory pressure.
+var scryptSlots = make(chan struct{}, runtime.NumCPU())
+
+// CryptoRecord is one input of a bulk encrypt, decrypt or rekey job
+type CryptoRecord struct {
+	Key         string `json:"key"`                    // private key hex (encrypt) or encrypted key hex (decrypt, rekey)
+	Password    string `json:"password"`               // password to encrypt with, or to decrypt with
+	NewPassword string `json:"new_password,omitempty"` // rekey only: password to re-encrypt with
+}
+
+// CryptoResult is the outcome of one CryptoRecord
+type CryptoResult struct {
+	Index  int    `json:"index"`
+	Result string `json:"result,omitempty"`
+	Error  string `json:"error,omitempty"`
+}
+
+// cryptoOps maps bulk modes to the operation applied to each record
+var cryptoOps = map[string]func(CryptoRecord) (string, error){
+	"encrypt": encryptRecord,
+	"decrypt": decryptRecord,
+	"rekey":   rekeyRecord,
+}
+
+func encryptRecord(record CryptoRecord) (string, error) {
+	privKey, err := hex.DecodeString(record.Key)
+	if err != nil {
+		return "", fmt.Errorf("invalid private key hex: %w", err)
+	}
+	encrypted, err := EncryptPrivateKey(privKey, record.Password)
+	if err != nil {
+		return "", err
+	}
+	return hex.EncodeToString(encrypted), nil
+}
+
+func decryptRecord(record CryptoRecord) (string, error) {
+	encrypted, err := hex.DecodeString(record.Key)
+	if err != nil {
+		return "", fmt.Errorf("invalid encrypted key hex: %w", err)
+	}
+	decrypted, err := DecryptPrivateKey(encrypted, record.Password)
+	if err != nil {
+		return "", err
+	}
+	return hex.EncodeToString(decrypted), nil
+}
+
+// rekeyRecord re-encrypts a key under a new password without the plaintext
+// ever leaving the core
+func rekeyRecord(record CryptoRecord) (string, error) {
+	encrypted, err := hex.DecodeString(record.Key)
+	if err != nil {
+		return "", fmt.Errorf("invalid encrypted key hex: %w", err)
+	}
+	privKey, err := DecryptPrivateKey(encrypted, record.Password)
+	if err != nil {
+		return "", err
+	}
+	defer func() {
+		for i := range privKey {
+			privKey[i] = 0
+		}
+	}()
+	reencrypted, err := EncryptPrivateKey(privKey, record.NewPassword)
+	if err != nil {
+		return "", err
+	}
+	return hex.EncodeToString(reencrypted), nil
+}
+
+// CryptBatch applies the bulk operation mode to every record read from records,
+// fanning the work out over one goroutine per CPU, and passes the results to
+// emit in input order as soon as each one and all its predecessors are done.
+// A failing record produces a CryptoResult with Error set and does not stop the job.
+func CryptBatch(ctx context.Context, mode string, records <-chan CryptoRecord, emit func(CryptoResult) error) error {
+	op, ok := cryptoOps[mode]
+	if !ok {
+		return fmt.Errorf("unknown batch mode: %s", mode)
+	}
+
+	type job struct {
+		index  int
+		record CryptoRecord
+	}
+	jobs := make(chan job)
+	results := make(chan CryptoResult)
+	ctx, cancel := context.WithCancel(ctx)
+	defer cancel()
+
+	// Feed jobs with their input position so results can be reordered
+	go func() {
+		defer close(jobs)
+		index := 0
+		for record := range records {
+			select {
+			case jobs <- job{index: index, record: record}:
+				index++
+			case <-ctx.Done():
+				return
+			}
+		}
+	}()
+
+	var wg sync.WaitGroup
+	for i := 0; i < cap(scryptSlots); i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for j := range jobs {
+				scryptSlots <- struct{}{}
+				value, err := op(j.record)
+				<-scryptSlots
+
+				result := CryptoResult{Index: j.index, Result: value}
+				if err != nil {
+					result.Error = err.Error()
+				}
+				select {
+				case results <- result:
+				case <-ctx.Done():
+					return
+				}
+			}
+		}()
+	}
+	go func() {
+		wg.Wait()
+		close(results)
+	}()
+
+	// Emit in order, buffering results that finished ahead of their predecessors
+	pending := make(map[int]CryptoResult)
+	next := 0
+	for result := range results {
+		pending[result.Index] = result
+		for {
+			ready, ok := pending[next]
+			if !ok {
+				break
+			}
+			delete(pending, next)
+			next++
+			if err := emit(ready); err != nil {
+				return err
+			}
+		}
+	}
+	return ctx.Err()
+}
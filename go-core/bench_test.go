@@ -0,0 +1,130 @@
+package main
+
+import (
+	"testing"
+
+	"github.com/tyler-smith/go-bip39"
+)
+
+// Benchmarks for the crypto core. Run from go-core/ with:
+//
+//	go test -run '^$' -bench . -benchmem
+//
+// "Cold" derivations clear the derivation cache every iteration and so include
+// the PBKDF2 seed stretch; "Warm" ones measure the cached path.
+
+const benchMnemonic = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+func BenchmarkGenerateMnemonic(b *testing.B) {
+	for i := 0; i < b.N; i++ {
+		if _, err := GenerateMnemonic(); err != nil {
+			b.Fatal(err)
+		}
+	}
+}
+
+func BenchmarkNewSeed(b *testing.B) {
+	for i := 0; i < b.N; i++ {
+		bip39.NewSeed(benchMnemonic, "")
+	}
+}
+
+// deriveCases mirrors the derivations exposed by main.go and the worker
+var deriveCases = []struct {
+	name        string
+	path        string
+	chainType   ChainType
+	witnessType string
+}{
+	{"Ethereum", "m/44'/60'/0'/0/0", Ethereum, ""},
+	{"BitcoinLegacy", "m/44'/0'/0'/0/0", Bitcoin, "legacy"},
+	{"BitcoinSegwit", "m/44'/0'/0'/0/0", Bitcoin, "segwit"},
+	{"BitcoinBech32", "m/44'/0'/0'/0/0", Bitcoin, "bech32"},
+	{"Solana", "m/44'/501'/0'/0", Solana, ""},
+}
+
+func BenchmarkDeriveKeyCold(b *testing.B) {
+	for _, c := range deriveCases {
+		b.Run(c.name, func(b *testing.B) {
+			for i := 0; i < b.N; i++ {
+				derivationCache.Clear()
+				if _, _, err := DeriveKey(benchMnemonic, c.path, c.chainType, c.witnessType); err != nil {
+					b.Fatal(err)
+				}
+			}
+		})
+	}
+}
+
+func BenchmarkDeriveKeyWarm(b *testing.B) {
+	for _, c := range deriveCases {
+		b.Run(c.name, func(b *testing.B) {
+			derivationCache.Clear()
+			for i := 0; i < b.N; i++ {
+				if _, _, err := DeriveKey(benchMnemonic, c.path, c.chainType, c.witnessType); err != nil {
+					b.Fatal(err)
+				}
+			}
+		})
+	}
+}
+
+// BenchmarkDeriveAll derives every chain and Bitcoin format, with and without a cached seed
+func BenchmarkDeriveAll(b *testing.B) {
+	for _, cold := range []bool{true, false} {
+		name := "Warm"
+		if cold {
+			name = "Cold"
+		}
+		b.Run(name, func(b *testing.B) {
+			derivationCache.Clear()
+			for i := 0; i < b.N; i++ {
+				if cold {
+					derivationCache.Clear()
+				}
+				if _, err := DeriveAll(benchMnemonic); err != nil {
+					b.Fatal(err)
+				}
+			}
+		})
+	}
+}
+
+// BenchmarkDeriveRange reports the cost per derived address of a 1000 row range
+func BenchmarkDeriveRange(b *testing.B) {
+	for _, c := range deriveCases {
+		b.Run(c.name, func(b *testing.B) {
+			for i := 0; i < b.N; i++ {
+				err := DeriveRange(benchMnemonic, c.chainType, 0, 0, 1000, c.witnessType, func(DerivedAddress) error {
+					return nil
+				})
+				if err != nil {
+					b.Fatal(err)
+				}
+			}
+			b.ReportMetric(float64(b.Elapsed().Nanoseconds())/float64(b.N*1000), "ns/address")
+		})
+	}
+}
+
+func BenchmarkEncryptPrivateKey(b *testing.B) {
+	privKey := make([]byte, 32)
+	for i := 0; i < b.N; i++ {
+		if _, err := EncryptPrivateKey(privKey, "benchmark-password"); err != nil {
+			b.Fatal(err)
+		}
+	}
+}
+
+func BenchmarkDecryptPrivateKey(b *testing.B) {
+	encrypted, err := EncryptPrivateKey(make([]byte, 32), "benchmark-password")
+	if err != nil {
+		b.Fatal(err)
+	}
+	b.ResetTimer()
+	for i := 0; i < b.N; i++ {
+		if _, err := DecryptPrivateKey(encrypted, "benchmark-password"); err != nil {
+			b.Fatal(err)
+		}
+	}
+}
@@ -0,0 +1,264 @@
+package main
+
+import (
+	"container/list"
+	"crypto/hmac"
+	"crypto/rand"
+	"crypto/sha256"
+	"encoding/hex"
+	"fmt"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/btcsuite/btcd/chaincfg"
+	"github.com/btcsuite/btcutil/hdkeychain"
+	"github.com/tyler-smith/go-bip39"
+)
+
+const (
+	// Derivation cache bounds. Entries are seeds and extended keys; each is small,
+	// the limits exist to bound how long key material stays in memory.
+	keyCacheCapacity = 1024
+	keyCacheTTL      = 10 * time.Minute
+	keyCacheSweep    = time.Minute
+)
+
+// derivationCache is shared by DeriveKey and DeriveRange so repeated derivations
+// for the same wallet skip the PBKDF2 seed stretch and the hardened path prefix.
+var derivationCache = newKeyCache(keyCacheCapacity, keyCacheTTL)
+
+// cacheEntry holds either a seed or an extended key
+type cacheEntry struct {
+	key     string
+	seed    []byte
+	node    *hdkeychain.ExtendedKey
+	expires time.Time
+	refs    int  // callers currently using node outside the cache lock
+	evicted bool // removed from the cache, zeroize once refs drops to zero
+}
+
+// zero wipes the key material held by the entry
+func (e *cacheEntry) zero() {
+	for i := range e.seed {
+		e.seed[i] = 0
+	}
+	if e.node != nil {
+		e.node.Zero()
+	}
+}
+
+// keyCache is an LRU with TTL for BIP-39 seeds and intermediate extended keys.
+// Entries are keyed by a salted HMAC fingerprint of the mnemonic, so the
+// mnemonic itself is never kept, and evicted entries are zeroized.
+type keyCache struct {
+	mu       sync.Mutex
+	salt     []byte
+	capacity int
+	ttl      time.Duration
+	entries  map[string]*list.Element
+	order    *list.List // front is most recently used
+}
+
+func newKeyCache(capacity int, ttl time.Duration) *keyCache {
+	salt := make([]byte, 32)
+	if _, err := rand.Read(salt); err != nil {
+		panic(fmt.Sprintf("failed to generate cache salt: %v", err))
+	}
+	c := &keyCache{
+		salt:     salt,
+		capacity: capacity,
+		ttl:      ttl,
+		entries:  make(map[string]*list.Element),
+		order:    list.New(),
+	}
+	go c.sweep(keyCacheSweep)
+	return c
+}
+
+// fingerprint returns the cache identity of a mnemonic
+func (c *keyCache) fingerprint(mnemonic string) string {
+	mac := hmac.New(sha256.New, c.salt)
+	mac.Write([]byte(mnemonic))
+	return hex.EncodeToString(mac.Sum(nil))
+}
+
+// nodeKey builds the cache key of the extended key at components below the master
+func nodeKey(fingerprint string, components []uint32) string {
+	var b strings.Builder
+	b.WriteString(fingerprint)
+	b.WriteString("/m")
+	for _, c := range components {
+		b.WriteByte('/')
+		b.WriteString(strconv.FormatUint(uint64(c), 10))
+	}
+	return b.String()
+}
+
+// lookup returns the live entry for key, dropping it if expired. Caller holds c.mu.
+func (c *keyCache) lookup(key string) *cacheEntry {
+	elem, ok := c.entries[key]
+	if !ok {
+		return nil
+	}
+	entry := elem.Value.(*cacheEntry)
+	if time.Now().After(entry.expires) {
+		c.remove(elem)
+		return nil
+	}
+	c.order.MoveToFront(elem)
+	return entry
+}
+
+// store inserts entry and evicts least recently used entries beyond capacity. Caller holds c.mu.
+func (c *keyCache) store(entry *cacheEntry) *cacheEntry {
+	if elem, ok := c.entries[entry.key]; ok {
+		// Another caller raced us to the same node; keep theirs
+		c.order.MoveToFront(elem)
+		entry.zero()
+		return elem.Value.(*cacheEntry)
+	}
+	entry.expires = time.Now().Add(c.ttl)
+	c.entries[entry.key] = c.order.PushFront(entry)
+	for c.order.Len() > c.capacity {
+		c.remove(c.order.Back())
+	}
+	return entry
+}
+
+// remove evicts elem, zeroizing it now or when its last user releases it. Caller holds c.mu.
+func (c *keyCache) remove(elem *list.Element) {
+	entry := elem.Value.(*cacheEntry)
+	c.order.Remove(elem)
+	delete(c.entries, entry.key)
+	entry.evicted = true
+	if entry.refs == 0 {
+		entry.zero()
+	}
+}
+
+func (c *keyCache) release(entry *cacheEntry) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	entry.refs--
+	if entry.refs == 0 && entry.evicted {
+		entry.zero()
+	}
+}
+
+// seed returns a private copy of the BIP-39 seed for mnemonic, computing it at most
+// once per TTL. The caller should wipe the copy when done.
+func (c *keyCache) seed(mnemonic, fingerprint string) []byte {
+	key := fingerprint + "/seed"
+	c.mu.Lock()
+	if entry := c.lookup(key); entry != nil {
+		seed := append([]byte(nil), entry.seed...)
+		c.mu.Unlock()
+		return seed
+	}
+	c.mu.Unlock()
+
+	// The PBKDF2 stretch runs outside the lock so other wallets are not blocked
+	seed := bip39.NewSeed(mnemonic, "")
+	c.mu.Lock()
+	c.store(&cacheEntry{key: key, seed: append([]byte(nil), seed...)})
+	c.mu.Unlock()
+	return seed
+}
+
+// fillPubKey computes the public key of a private node before it is cached.
+// Child() on a private key fills it in lazily, which would be a write racing
+// with other goroutines deriving from the same shared node.
+func fillPubKey(node *hdkeychain.ExtendedKey) error {
+	if _, err := node.ECPubKey(); err != nil {
+		return fmt.Errorf("failed to compute public key: %w", err)
+	}
+	return nil
+}
+
+// Derive returns the extended key at path for mnemonic. It resumes from the deepest
+// cached prefix of path and caches every node it walks, so once an account-level
+// key such as m/44'/60'/0' is cached, deriving any address below it costs only the
+// remaining child steps. The returned key is shared: it is safe for concurrent
+// Child calls but must not be used after calling release.
+func (c *keyCache) Derive(mnemonic, path string) (*hdkeychain.ExtendedKey, func(), error) {
+	components, err := ParsePath(path)
+	if err != nil {
+		return nil, nil, err
+	}
+	fingerprint := c.fingerprint(mnemonic)
+
+	c.mu.Lock()
+	var entry *cacheEntry
+	depth := len(components)
+	for ; depth >= 0; depth-- {
+		if entry = c.lookup(nodeKey(fingerprint, components[:depth])); entry != nil {
+			break
+		}
+	}
+
+	if entry == nil {
+		c.mu.Unlock()
+		seed := c.seed(mnemonic, fingerprint)
+		masterKey, err := hdkeychain.NewMaster(seed, &chaincfg.MainNetParams)
+		for i := range seed {
+			seed[i] = 0
+		}
+		if err != nil {
+			return nil, nil, fmt.Errorf("failed to create master key: %w", err)
+		}
+		if err := fillPubKey(masterKey); err != nil {
+			return nil, nil, err
+		}
+		c.mu.Lock()
+		entry = c.store(&cacheEntry{key: nodeKey(fingerprint, nil), node: masterKey})
+		depth = 0
+	}
+
+	// Walk the remaining components while holding the lock, which keeps the
+	// parent nodes from being zeroized underneath us. Each step is a single CKD.
+	for ; depth < len(components); depth++ {
+		child, err := entry.node.Child(components[depth])
+		if err != nil {
+			c.mu.Unlock()
+			return nil, nil, fmt.Errorf("failed to derive child key at depth %d: %w", depth+1, err)
+		}
+		if err := fillPubKey(child); err != nil {
+			c.mu.Unlock()
+			return nil, nil, err
+		}
+		entry = c.store(&cacheEntry{key: nodeKey(fingerprint, components[:depth+1]), node: child})
+	}
+
+	entry.refs++
+	c.mu.Unlock()
+	return entry.node, func() { c.release(entry) }, nil
+}
+
+// Clear evicts and zeroizes every cached seed and key
+func (c *keyCache) Clear() {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	for c.order.Len() > 0 {
+		c.remove(c.order.Back())
+	}
+}
+
+// sweep periodically evicts expired entries so idle key material does not linger
+func (c *keyCache) sweep(interval time.Duration) {
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for range ticker.C {
+		now := time.Now()
+		c.mu.Lock()
+		for elem := c.order.Back(); elem != nil; {
+			prev := elem.Prev()
+			if now.After(elem.Value.(*cacheEntry).expires) {
+				c.remove(elem)
+			}
+			elem = prev
+		}
+		c.mu.Unlock()
+	}
+}
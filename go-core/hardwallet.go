@@ -1,18 +1,19 @@
 package main
 
 import (
-	"crypto/ecdsa"
 	"crypto/ed25519"
 	"encoding/hex"
 	"fmt"
+	"hash"
 	"strconv"
 	"strings"
 
+	"github.com/btcsuite/btcd/btcec"
 	"github.com/btcsuite/btcd/chaincfg"
 	"github.com/btcsuite/btcutil"
 	"github.com/btcsuite/btcutil/base58"
 	"github.com/btcsuite/btcutil/hdkeychain"
-	"github.com/ethereum/go-ethereum/crypto"
+	"github.com/ethereum/go-ethereum/common"
 	"github.com/tyler-smith/go-bip39"
 	"golang.org/x/crypto/sha3"
 )
@@ -33,39 +34,31 @@ func DeriveKey(mnemonic, path string, chainType ChainType, witnessType ...string
         return "", "", fmt.Errorf("invalid mnemonic phrase")
     }
 
-    // Generate seed from mnemonic (consider adding a passphrase for additional security)
-    seed := bip39.NewSeed(mnemonic, "")
+    // Walk the path through the derivation cache, which reuses the seed and any
+    // intermediate keys already computed for this mnemonic
+    derivedKey, release, err := derivationCache.Derive(mnemonic, path)
+    if err != nil {
+        return "", "", err
+    }
+    defer release()
 
-    // Switch case to determine which blockchain key derivation function to call
-    switch chainType {
-    case Bitcoin:
-        // If witnessType is provided, pass it to deriveBitcoinKey
-        if len(witnessType) > 0 {
-            return deriveBitcoinKeyWithFormat(seed, path, witnessType[0])
-        }
-        return deriveBitcoinKey(seed, path) // Original function for backward compatibility
-    case Ethereum:
-        return deriveEthereumKey(seed, path)
-    case Solana:
-        return deriveSolanaKey(seed, path)
-    default:
-        return "", "", fmt.Errorf("unsupported chain type")
+    format := "legacy" // Original Bitcoin format for backward compatibility
+    if len(witnessType) > 0 {
+        format = witnessType[0]
     }
+    return keyFromExtended(derivedKey, chainType, format)
 }
 // deriveBitcoinKeyWithFormat derives a Bitcoin private key and address with specified format
 func deriveBitcoinKeyWithFormat(seed []byte, path string, witnessType string) (string, string, error) {
-    // Generate master key from seed
-    masterKey, err := hdkeychain.NewMaster(seed, &chaincfg.MainNetParams)
+    derivedKey, err := deriveFromSeed(seed, path)
     if err != nil {
-        return "", "", fmt.Errorf("failed to create master key: %w", err)
-    }
-
-    // Derive key from the given derivation path
-    derivedKey, err := DeriveKeyFromPath(masterKey, path)
-    if err != nil {
-        return "", "", fmt.Errorf("failed to derive key: %w", err)
+        return "", "", err
     }
+    return bitcoinKeyFromExtended(derivedKey, witnessType)
+}
 
+// bitcoinKeyFromExtended returns the hex private key and address of an already derived key
+func bitcoinKeyFromExtended(derivedKey *hdkeychain.ExtendedKey, witnessType string) (string, string, error) {
     // Extract private key
     privateKey, err := derivedKey.ECPrivKey()
     if err != nil {
@@ -79,60 +72,58 @@ func deriveBitcoinKeyWithFormat(seed []byte, path string, witnessType string) (s
         return "", "", fmt.Errorf("failed to extract public key: %w", err)
     }
 
-    // Generate Bitcoin address based on witnessType
-    var address string
+    address, err := bitcoinAddress(pubKey.SerializeCompressed(), witnessType)
+    if err != nil {
+        return "", "", err
+    }
+    return privKeyHex, address, nil
+}
+
+// bitcoinAddress encodes a compressed public key as a Bitcoin address of the given witnessType
+func bitcoinAddress(compressedPubKey []byte, witnessType string) (string, error) {
+    pubKeyHash := btcutil.Hash160(compressedPubKey)
     switch strings.ToLower(witnessType) {
-    case "legacy":
-        // Legacy address (P2PKH)
-        pubKeyHash := btcutil.Hash160(pubKey.SerializeCompressed())
-        legacyAddress, err := btcutil.NewAddressPubKeyHash(pubKeyHash, &chaincfg.MainNetParams)
-        if err != nil {
-            return "", "", fmt.Errorf("failed to create legacy Bitcoin address: %w", err)
-        }
-        address = legacyAddress.EncodeAddress()
     case "segwit":
         // SegWit address (P2SH-wrapped)
-        witnessProgram := btcutil.Hash160(pubKey.SerializeCompressed())
-        witnessProgramHash := btcutil.Hash160(append([]byte{0x00, 0x14}, witnessProgram...))
+        witnessProgramHash := btcutil.Hash160(append([]byte{0x00, 0x14}, pubKeyHash...))
         segwitAddress, err := btcutil.NewAddressScriptHashFromHash(witnessProgramHash, &chaincfg.MainNetParams)
         if err != nil {
-            return "", "", fmt.Errorf("failed to create segwit Bitcoin address: %w", err)
+            return "", fmt.Errorf("failed to create segwit Bitcoin address: %w", err)
         }
-        address = segwitAddress.EncodeAddress()
+        return segwitAddress.EncodeAddress(), nil
     case "bech32":
         // Native SegWit address (Bech32/P2WPKH)
-        witnessProg := btcutil.Hash160(pubKey.SerializeCompressed())
-        bech32Address, err := btcutil.NewAddressWitnessPubKeyHash(witnessProg, &chaincfg.MainNetParams)
+        bech32Address, err := btcutil.NewAddressWitnessPubKeyHash(pubKeyHash, &chaincfg.MainNetParams)
         if err != nil {
-            return "", "", fmt.Errorf("failed to create bech32 Bitcoin address: %w", err)
+            return "", fmt.Errorf("failed to create bech32 Bitcoin address: %w", err)
         }
-        address = bech32Address.EncodeAddress()
+        return bech32Address.EncodeAddress(), nil
     default:
-        // Default to legacy if unknown format specified
-        pubKeyHash := btcutil.Hash160(pubKey.SerializeCompressed())
+        // Legacy address (P2PKH), also used when an unknown format is specified
         legacyAddress, err := btcutil.NewAddressPubKeyHash(pubKeyHash, &chaincfg.MainNetParams)
         if err != nil {
-            return "", "", fmt.Errorf("failed to create Bitcoin address: %w", err)
+            return "", fmt.Errorf("failed to create legacy Bitcoin address: %w", err)
         }
-        address = legacyAddress.EncodeAddress()
+        return legacyAddress.EncodeAddress(), nil
     }
-
-    return privKeyHex, address, nil
 }
+
 // deriveBitcoinKey derives a Bitcoin private key and address from the seed and derivation path
 func deriveBitcoinKey(seed []byte, path string) (string, string, error) {
-	// Generate master key from seed
-	masterKey, err := hdkeychain.NewMaster(seed, &chaincfg.MainNetParams)
-	if err != nil {
-		return "", "", fmt.Errorf("failed to create master key: %w", err) // Return error if key generation fails
-	}
+	return deriveBitcoinKeyWithFormat(seed, path, "legacy") // Original format for backward compatibility
+}
 
-	// Derive key from the given derivation path
-	derivedKey, err := DeriveKeyFromPath(masterKey, path)
+// deriveEthereumKey derives an Ethereum private key and address from the seed and derivation path
+func deriveEthereumKey(seed []byte, path string) (string, string, error) {
+	derivedKey, err := deriveFromSeed(seed, path)
 	if err != nil {
-		return "", "", fmt.Errorf("failed to derive key: %w", err) // Return error if derivation fails
+		return "", "", err
 	}
+	return ethereumKeyFromExtended(derivedKey)
+}
 
+// ethereumKeyFromExtended returns the hex private key and address of an already derived key
+func ethereumKeyFromExtended(derivedKey *hdkeychain.ExtendedKey) (string, string, error) {
 	// Extract private key
 	privateKey, err := derivedKey.ECPrivKey()
 	if err != nil {
@@ -140,63 +131,60 @@ func deriveBitcoinKey(seed []byte, path string) (string, string, error) {
 	}
 	privKeyHex := hex.EncodeToString(privateKey.Serialize()) // Convert private key to hexadecimal format
 
-	// Extract public key
-	pubKey, err := derivedKey.ECPubKey()
-	if err != nil {
-		return "", "", fmt.Errorf("failed to extract public key: %w", err) // Return error if public key extraction fails
-	}
+	// Generate Ethereum address from public key
+	var address common.Address
+	ethereumAddress(sha3.NewLegacyKeccak256(), privateKey.PubKey(), address[:])
 
-	// Generate Bitcoin address
-	pubKeyHash := btcutil.Hash160(pubKey.SerializeCompressed()) // Compute hash of the compressed public key
-	address, err := btcutil.NewAddressPubKeyHash(pubKeyHash, &chaincfg.MainNetParams)
-	if err != nil {
-		return "", "", fmt.Errorf("failed to create Bitcoin address: %w", err) // Return error if address creation fails
-	}
+	return privKeyHex, address.Hex(), nil // Return private key and checksummed Ethereum address
+}
 
-	return privKeyHex, address.EncodeAddress(), nil // Return private key and Bitcoin address
+// ethereumAddress writes the 20-byte Ethereum address of pubKey into out, using
+// hasher as scratch space so hot loops can reuse one Keccak state
+func ethereumAddress(hasher hash.Hash, pubKey *btcec.PublicKey, out []byte) {
+	// The address is the last 20 bytes of Keccak-256 over the uncompressed key without its 0x04 prefix
+	var digest [32]byte
+	hasher.Reset()
+	hasher.Write(pubKey.SerializeUncompressed()[1:])
+	copy(out, hasher.Sum(digest[:0])[12:])
 }
 
-// deriveEthereumKey derives an Ethereum private key and address from the seed and derivation path
-func deriveEthereumKey(seed []byte, path string) (string, string, error) {
+// deriveFromSeed builds the master key for seed and walks path from it
+func deriveFromSeed(seed []byte, path string) (*hdkeychain.ExtendedKey, error) {
 	// Generate master key from seed
 	masterKey, err := hdkeychain.NewMaster(seed, &chaincfg.MainNetParams)
 	if err != nil {
-		return "", "", fmt.Errorf("failed to create master key: %w", err) // Return error if key generation fails
+		return nil, fmt.Errorf("failed to create master key: %w", err) // Return error if key generation fails
 	}
 
 	// Derive key from the given derivation path
 	derivedKey, err := DeriveKeyFromPath(masterKey, path)
 	if err != nil {
-		return "", "", fmt.Errorf("failed to derive key: %w", err) // Return error if derivation fails
+		return nil, fmt.Errorf("failed to derive key: %w", err) // Return error if derivation fails
 	}
+	return derivedKey, nil
+}
 
-	// Extract private key
-	privateKey, err := derivedKey.ECPrivKey()
+// DeriveKeyFromPath derives a child key from a master key using a BIP32 derivation path
+func DeriveKeyFromPath(masterKey *hdkeychain.ExtendedKey, path string) (*hdkeychain.ExtendedKey, error) {
+	components, err := ParsePath(path)
 	if err != nil {
-		return "", "", fmt.Errorf("failed to extract private key: %w", err) // Return error if private key extraction fails
+		return nil, err
 	}
-	privKeyBytes := privateKey.Serialize()
-	privKeyHex := hex.EncodeToString(privKeyBytes) // Convert private key to hexadecimal format
+	key := masterKey
 
-	// Convert to Ethereum private key
-	ethPrivKey, err := crypto.ToECDSA(privKeyBytes)
-	if err != nil {
-		return "", "", fmt.Errorf("failed to convert to Ethereum private key: %w", err)
+	for depth, childNum := range components {
+		key, err = key.Child(childNum)
+		if err != nil {
+			return nil, fmt.Errorf("failed to derive child key at depth %d: %w", depth+1, err)
+		}
 	}
-
-	// Generate Ethereum address from public key
-	publicKey := ethPrivKey.Public().(*ecdsa.PublicKey)
-	address := crypto.PubkeyToAddress(*publicKey)
-
-	return privKeyHex, address.Hex(), nil // Return private key and Ethereum address
+	return key, nil
 }
 
-// DeriveKeyFromPath derives a child key from a master key using a BIP32 derivation path
-func DeriveKeyFromPath(masterKey *hdkeychain.ExtendedKey, path string) (*hdkeychain.ExtendedKey, error) {
-	components := strings.Split(path, "/")
-	key := masterKey
-
-	for _, component := range components {
+// ParsePath converts a BIP32 derivation path such as m/44'/60'/0'/0/0 into child numbers
+func ParsePath(path string) ([]uint32, error) {
+	var childNums []uint32
+	for _, component := range strings.Split(path, "/") {
 		if component == "m" || component == "" {
 			continue
 		}
@@ -205,42 +193,34 @@ func DeriveKeyFromPath(masterKey *hdkeychain.ExtendedKey, path string) (*hdkeych
 		var childNum uint32
 		if strings.HasSuffix(component, "'") || strings.HasSuffix(component, "h") {
 			// Support both ' and h as hardened indicators
-			index, err := strconv.Atoi(strings.TrimRight(component, "'h"))
+			index, err := strconv.ParseUint(strings.TrimRight(component, "'h"), 10, 31)
 			if err != nil {
 				return nil, fmt.Errorf("invalid path component: %s", component)
 			}
 			childNum = uint32(index) + hdkeychain.HardenedKeyStart
 		} else {
-			index, err := strconv.Atoi(component)
+			index, err := strconv.ParseUint(component, 10, 31)
 			if err != nil {
 				return nil, fmt.Errorf("invalid path component: %s", component)
 			}
 			childNum = uint32(index)
 		}
-
-		var err error
-		key, err = key.Child(childNum)
-		if err != nil {
-			return nil, fmt.Errorf("failed to derive child key at component %s: %w", component, err)
-		}
+		childNums = append(childNums, childNum)
 	}
-	return key, nil
+	return childNums, nil
 }
 
 // deriveSolanaKey derives a Solana private key and address from the seed and derivation path
 func deriveSolanaKey(seed []byte, path string) (string, string, error) {
-	// Generate master key from seed
-	masterKey, err := hdkeychain.NewMaster(seed, &chaincfg.MainNetParams)
-	if err != nil {
-		return "", "", fmt.Errorf("failed to create master key: %w", err)
-	}
-
-	// Derive key from the given derivation path
-	derivedKey, err := DeriveKeyFromPath(masterKey, path)
+	derivedKey, err := deriveFromSeed(seed, path)
 	if err != nil {
-		return "", "", fmt.Errorf("failed to derive key: %w", err)
+		return "", "", err
 	}
+	return solanaKeyFromExtended(derivedKey)
+}
 
+// solanaKeyFromExtended returns the hex private key and address of an already derived key
+func solanaKeyFromExtended(derivedKey *hdkeychain.ExtendedKey) (string, string, error) {
 	// Extract private key
 	privateKey, err := derivedKey.ECPrivKey()
 	if err != nil {
@@ -249,18 +229,212 @@ func deriveSolanaKey(seed []byte, path string) (string, string, error) {
 	privKeyBytes := privateKey.Serialize()
 	privKeyHex := hex.EncodeToString(privKeyBytes)
 
+	// Solana addresses are the base58 encoding of the public key
+	solanaAddress := base58.Encode(solanaPublicKey(privKeyBytes))
+
+	return privKeyHex, solanaAddress, nil
+}
+
+// solanaPublicKey returns the ed25519 public key derived from a secp256k1 private key
+func solanaPublicKey(privKeyBytes []byte) ed25519.PublicKey {
 	// For Solana, we need to convert the secp256k1 private key to ed25519
 	// Note: This is a simplified approach - in production, use a proper Solana SDK
 	// We're using the private key to seed an ed25519 key
 	hash := sha3.Sum512(privKeyBytes)
-	var edPrivateKey ed25519.PrivateKey = make([]byte, ed25519.PrivateKeySize)
-	copy(edPrivateKey, hash[:32])
-	
-	// Generate the public key
-	publicKey := ed25519.PublicKey(edPrivateKey.Public().(ed25519.PublicKey))
-	
-	// Solana addresses are the base58 encoding of the public key
-	solanaAddress := base58.Encode(publicKey)
+	edPrivateKey := ed25519.NewKeyFromSeed(hash[:ed25519.SeedSize])
+	return edPrivateKey.Public().(ed25519.PublicKey)
+}
 
-	return privKeyHex, solanaAddress, nil
-}
\ No newline at end of file
+// DerivedAddress is one row produced by DeriveRange
+type DerivedAddress struct {
+	Index      uint32 `json:"index"`
+	Path       string `json:"path"`
+	Address    string `json:"address"`
+	PrivateKey string `json:"private_key"`
+}
+
+// ParseChainType converts a chain name as used by the Python side into a ChainType
+func ParseChainType(name string) (ChainType, error) {
+	switch strings.ToLower(name) {
+	case "eth", "ethereum":
+		return Ethereum, nil
+	case "btc", "bitcoin":
+		return Bitcoin, nil
+	case "sol", "solana":
+		return Solana, nil
+	default:
+		return 0, fmt.Errorf("unsupported chain: %s", name)
+	}
+}
+
+// accountBranchPath returns the path of the key whose direct children are the
+// address indices of an account. Index 0 of account 0 matches the fixed paths
+// used by derive-key, derive-btc and derive-sol.
+func accountBranchPath(chainType ChainType, account uint32) (string, error) {
+	switch chainType {
+	case Ethereum:
+		return fmt.Sprintf("m/44'/60'/%d'/0", account), nil
+	case Bitcoin:
+		return fmt.Sprintf("m/44'/0'/%d'/0", account), nil
+	case Solana:
+		return fmt.Sprintf("m/44'/501'/%d'", account), nil
+	default:
+		return "", fmt.Errorf("unsupported chain type")
+	}
+}
+
+// keyFromExtended returns the hex private key and address of derivedKey for chainType
+func keyFromExtended(derivedKey *hdkeychain.ExtendedKey, chainType ChainType, witnessType string) (string, string, error) {
+	switch chainType {
+	case Bitcoin:
+		return bitcoinKeyFromExtended(derivedKey, witnessType)
+	case Ethereum:
+		return ethereumKeyFromExtended(derivedKey)
+	case Solana:
+		return solanaKeyFromExtended(derivedKey)
+	default:
+		return "", "", fmt.Errorf("unsupported chain type")
+	}
+}
+
+// DeriveRange derives count consecutive address indices of an account starting at start.
+// The account branch key comes from the derivation cache; every row then costs a
+// single child derivation. Rows are passed to emit in index order as they are produced,
+// and derivation stops at the first error returned by emit.
+func DeriveRange(mnemonic string, chainType ChainType, account, start, count uint32, witnessType string, emit func(DerivedAddress) error) error {
+	if !bip39.IsMnemonicValid(mnemonic) {
+		return fmt.Errorf("invalid mnemonic phrase")
+	}
+	if account >= hdkeychain.HardenedKeyStart || uint64(start)+uint64(count) > uint64(hdkeychain.HardenedKeyStart) {
+		return fmt.Errorf("index range out of bounds")
+	}
+
+	branchPath, err := accountBranchPath(chainType, account)
+	if err != nil {
+		return err
+	}
+
+	branchKey, release, err := derivationCache.Derive(mnemonic, branchPath)
+	if err != nil {
+		return err
+	}
+	defer release()
+
+	for index := start; index < start+count; index++ {
+		childPath := fmt.Sprintf("%s/%d", branchPath, index)
+		child, err := branchKey.Child(index)
+		if err != nil {
+			return fmt.Errorf("failed to derive child key %d: %w", index, err)
+		}
+		privKey, address, err := keyFromExtended(child, chainType, witnessType)
+		if err != nil {
+			return err
+		}
+		if err := emit(DerivedAddress{Index: index, Path: childPath, Address: address, PrivateKey: privKey}); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// Default account path of each chain, as used by the derive-* commands
+const (
+	ethereumPath = "m/44'/60'/0'/0/0"
+	bitcoinPath  = "m/44'/0'/0'/0/0"
+	solanaPath   = "m/44'/501'/0'/0"
+)
+
+// bitcoinWitnessTypes lists the Bitcoin address formats returned by DeriveAll
+var bitcoinWitnessTypes = []string{"legacy", "segwit", "bech32"}
+
+// ChainKeys is the default key of one chain as returned by DeriveAll. Bitcoin
+// fills Addresses with one entry per witness type instead of Address.
+type ChainKeys struct {
+	Path       string            `json:"path"`
+	Address    string            `json:"address,omitempty"`
+	Addresses  map[string]string `json:"addresses,omitempty"`
+	PrivateKey string            `json:"private_key"`
+	PublicKey  string            `json:"public_key"`
+}
+
+// AllKeys holds the default keys of every supported chain for one mnemonic
+type AllKeys struct {
+	Ethereum ChainKeys `json:"eth"`
+	Bitcoin  ChainKeys `json:"btc"`
+	Solana   ChainKeys `json:"sol"`
+}
+
+// DeriveAll derives the default Ethereum, Bitcoin and Solana keys of mnemonic, with
+// every Bitcoin address format and the public keys, from a single seed stretch.
+// All three paths go through the derivation cache, which computes the seed once.
+func DeriveAll(mnemonic string) (*AllKeys, error) {
+	if !bip39.IsMnemonicValid(mnemonic) {
+		return nil, fmt.Errorf("invalid mnemonic phrase")
+	}
+	keys := &AllKeys{
+		Ethereum: ChainKeys{Path: ethereumPath},
+		Bitcoin:  ChainKeys{Path: bitcoinPath, Addresses: make(map[string]string, len(bitcoinWitnessTypes))},
+		Solana:   ChainKeys{Path: solanaPath},
+	}
+
+	// Ethereum: uncompressed public key, as used for address hashing
+	ethKey, release, err := derivationCache.Derive(mnemonic, ethereumPath)
+	if err != nil {
+		return nil, err
+	}
+	keys.Ethereum.PrivateKey, keys.Ethereum.Address, err = ethereumKeyFromExtended(ethKey)
+	if err == nil {
+		var pubKey *btcec.PublicKey
+		if pubKey, err = ethKey.ECPubKey(); err == nil {
+			keys.Ethereum.PublicKey = hex.EncodeToString(pubKey.SerializeUncompressed())
+		}
+	}
+	release()
+	if err != nil {
+		return nil, err
+	}
+
+	// Bitcoin: one compressed key, encoded in every address format
+	btcKey, release, err := derivationCache.Derive(mnemonic, bitcoinPath)
+	if err != nil {
+		return nil, err
+	}
+	err = func() error {
+		defer release()
+		privateKey, err := btcKey.ECPrivKey()
+		if err != nil {
+			return fmt.Errorf("failed to extract private key: %w", err)
+		}
+		keys.Bitcoin.PrivateKey = hex.EncodeToString(privateKey.Serialize())
+		compressed := privateKey.PubKey().SerializeCompressed()
+		keys.Bitcoin.PublicKey = hex.EncodeToString(compressed)
+		for _, witnessType := range bitcoinWitnessTypes {
+			address, err := bitcoinAddress(compressed, witnessType)
+			if err != nil {
+				return err
+			}
+			keys.Bitcoin.Addresses[witnessType] = address
+		}
+		return nil
+	}()
+	if err != nil {
+		return nil, err
+	}
+
+	// Solana: the address is the base58 form of the ed25519 public key
+	solKey, release, err := derivationCache.Derive(mnemonic, solanaPath)
+	if err != nil {
+		return nil, err
+	}
+	privateKey, err := solKey.ECPrivKey()
+	release()
+	if err != nil {
+		return nil, fmt.Errorf("failed to extract private key: %w", err)
+	}
+	privKeyBytes := privateKey.Serialize()
+	publicKey := solanaPublicKey(privKeyBytes)
+	keys.Solana.PrivateKey = hex.EncodeToString(privKeyBytes)
+	keys.Solana.PublicKey = hex.EncodeToString(publicKey)
+	keys.Solana.Address = base58.Encode(publicKey)
+	return keys, nil
+}
@@ -2,18 +2,125 @@ package main
 
 import (
 	"bufio"
+	"context"
 	"encoding/hex"
+	"encoding/json"
 	"fmt"
+	"io"
 	"os"
+	"os/signal"
+	"strconv"
 	"strings"
 )
 
+// runDeriveRange streams one JSON row per derived address to stdout
+func runDeriveRange(args []string) {
+	chainType, err := ParseChainType(args[0])
+	if err != nil {
+		fmt.Fprintf(os.Stderr, "Error: %v\n", err)
+		os.Exit(1)
+	}
+	var numbers [3]uint32
+	for i, arg := range args[2:5] {
+		n, err := strconv.ParseUint(arg, 10, 32)
+		if err != nil {
+			fmt.Fprintf(os.Stderr, "Error: invalid number %q\n", arg)
+			os.Exit(1)
+		}
+		numbers[i] = uint32(n)
+	}
+	witnessType := "legacy"
+	if len(args) > 5 {
+		witnessType = args[5]
+	}
+
+	out := bufio.NewWriter(os.Stdout)
+	defer out.Flush()
+	encoder := json.NewEncoder(out)
+	err = DeriveRange(args[1], chainType, numbers[0], numbers[1], numbers[2], witnessType, func(row DerivedAddress) error {
+		return encoder.Encode(row)
+	})
+	if err != nil {
+		out.Flush()
+		fmt.Fprintf(os.Stderr, "Error: %v\n", err)
+		os.Exit(1)
+	}
+}
+
+// runCryptBatch streams bulk encrypt/decrypt/rekey records from stdin to stdout
+func runCryptBatch(mode string) {
+	records := make(chan CryptoRecord)
+	readErr := make(chan error, 1)
+	go func() {
+		defer close(records)
+		decoder := json.NewDecoder(bufio.NewReader(os.Stdin))
+		for {
+			var record CryptoRecord
+			if err := decoder.Decode(&record); err != nil {
+				if err != io.EOF {
+					readErr <- fmt.Errorf("invalid record: %w", err)
+				}
+				return
+			}
+			records <- record
+		}
+	}()
+
+	out := bufio.NewWriter(os.Stdout)
+	encoder := json.NewEncoder(out)
+	err := CryptBatch(context.Background(), mode, records, func(result CryptoResult) error {
+		if err := encoder.Encode(result); err != nil {
+			return err
+		}
+		// Flush per record so consumers see progress on long jobs
+		return out.Flush()
+	})
+	out.Flush()
+	if err == nil {
+		select {
+		case err = <-readErr:
+		default:
+		}
+	}
+	if err != nil {
+		fmt.Fprintf(os.Stderr, "Error: %v\n", err)
+		os.Exit(1)
+	}
+}
+
+// runVanity searches fresh mnemonics for a vanity address, printing progress to
+// stderr and the match as JSON to stdout. Ctrl+C cancels the search.
+func runVanity(args []string) {
+	req := VanityRequest{Chain: args[0], Prefix: args[1]}
+	if len(args) > 2 {
+		req.Suffix = args[2]
+	}
+	if len(args) > 3 {
+		req.WitnessType = args[3]
+	}
+
+	ctx, stop := signal.NotifyContext(context.Background(), os.Interrupt)
+	defer stop()
+	match, err := SearchVanity(ctx, req, func(progress VanityProgress) {
+		fmt.Fprintf(os.Stderr, "\r%d keys tried, %.0f keys/sec", progress.Attempts, progress.KeysPerSec)
+	})
+	fmt.Fprintln(os.Stderr)
+	if err != nil {
+		fmt.Fprintf(os.Stderr, "Error: %v\n", err)
+		os.Exit(1)
+	}
+	json.NewEncoder(os.Stdout).Encode(match)
+}
+
 func main() {
 	// First, check for command-line arguments
 	if len(os.Args) > 1 {
 		command := os.Args[1]
-		
-		if command == "generate-mnemonic" {
+
+		if command == "serve" {
+			// Long-lived worker speaking JSON lines on stdin/stdout (see server.go)
+			runServe()
+		} else if command == "generate-mnemonic" {
 			mnemonic, err := GenerateMnemonic()
 			if err != nil {
 				fmt.Fprintf(os.Stderr, "Error: %v\n", err)
@@ -66,6 +173,36 @@ func main() {
 			}
 			fmt.Printf("Solana Address: %s\nPrivate Key: %s\n", address, privKey)
 			os.Exit(0)
+		} else if command == "derive-all" {
+			if len(os.Args) < 3 {
+				fmt.Println("Usage: derive-all <mnemonic>")
+				os.Exit(1)
+			}
+			keys, err := DeriveAll(os.Args[2])
+			if err != nil {
+				fmt.Println("Error deriving keys:", err)
+				os.Exit(1)
+			}
+			json.NewEncoder(os.Stdout).Encode(keys)
+			os.Exit(0)
+		} else if command == "derive-range" {
+			if len(os.Args) < 7 {
+				fmt.Println("Usage: derive-range <chain> <mnemonic> <account> <start> <count> [witness_type]")
+				os.Exit(1)
+			}
+			runDeriveRange(os.Args[2:])
+			os.Exit(0)
+		} else if command == "encrypt-batch" || command == "decrypt-batch" || command == "rekey-batch" {
+			// Records are read as JSON lines from stdin, results streamed in the same order
+			runCryptBatch(strings.TrimSuffix(command, "-batch"))
+			os.Exit(0)
+		} else if command == "vanity" {
+			if len(os.Args) < 4 {
+				fmt.Println("Usage: vanity <chain> <prefix> [suffix] [witness_type]")
+				os.Exit(1)
+			}
+			runVanity(os.Args[2:])
+			os.Exit(0)
 		} else if command == "encrypt" {
 			if len(os.Args) < 4 {
 				fmt.Println("Usage: encrypt <privateKeyHex> <password>")
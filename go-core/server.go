@@ -0,0 +1,375 @@
+package main
+
+import (
+	"bufio"
+	"context"
+	"encoding/hex"
+	"encoding/json"
+	"fmt"
+	"io"
+	"os"
+	"sync"
+)
+
+// request is a single framed call read from stdin in worker mode.
+// Every frame is one JSON object terminated by a newline.
+type request struct {
+	ID     uint64          `json:"id"`
+	Method string          `json:"method"`
+	Params json.RawMessage `json:"params"`
+}
+
+// response is written back to stdout carrying the ID of the request it answers.
+// Long-running methods may send any number of progress frames for a request
+// before its final result or error frame.
+type response struct {
+	ID       uint64      `json:"id"`
+	Result   interface{} `json:"result,omitempty"`
+	Error    string      `json:"error,omitempty"`
+	Progress interface{} `json:"progress,omitempty"`
+}
+
+// progressKey is the context key under which dispatch stores the request's progress reporter
+type progressKey struct{}
+
+// reportProgress sends a progress frame for the request handled under ctx
+func reportProgress(ctx context.Context, progress interface{}) {
+	if report, ok := ctx.Value(progressKey{}).(func(interface{})); ok {
+		report(progress)
+	}
+}
+
+// maxRangeCount bounds the rows returned by a single derive-range request;
+// callers page through larger ranges.
+const maxRangeCount = 10000
+
+// handlerFunc executes one worker method with its raw JSON params
+type handlerFunc func(ctx context.Context, params json.RawMessage) (interface{}, error)
+
+// keyResult is the structured form of a derived key returned by the worker
+type keyResult struct {
+	Address    string `json:"address"`
+	PrivateKey string `json:"private_key"`
+}
+
+type mnemonicParams struct {
+	Mnemonic    string `json:"mnemonic"`
+	WitnessType string `json:"witness_type"`
+}
+
+type rangeParams struct {
+	Chain       string `json:"chain"`
+	Mnemonic    string `json:"mnemonic"`
+	Account     uint32 `json:"account"`
+	Start       uint32 `json:"start"`
+	Count       uint32 `json:"count"`
+	WitnessType string `json:"witness_type"`
+}
+
+type batchParams struct {
+	Records []CryptoRecord `json:"records"`
+}
+
+type cancelParams struct {
+	ID uint64 `json:"id"`
+}
+
+type encryptParams struct {
+	PrivateKey string `json:"private_key"`
+	Password   string `json:"password"`
+}
+
+type decryptParams struct {
+	EncryptedKey string `json:"encrypted_key"`
+	Password     string `json:"password"`
+}
+
+// handlers maps worker method names to their implementation
+var handlers = map[string]handlerFunc{
+	"ping":              handlePing,
+	"generate-mnemonic": handleGenerateMnemonic,
+	"derive-key":        handleDeriveKey,
+	"derive-btc":        handleDeriveBtc,
+	"derive-sol":        handleDeriveSol,
+	"derive-all":        handleDeriveAll,
+	"derive-range":      handleDeriveRange,
+	"cache-clear":       handleCacheClear,
+	"encrypt":           handleEncrypt,
+	"decrypt":           handleDecrypt,
+	"encrypt-batch":     batchHandler("encrypt"),
+	"decrypt-batch":     batchHandler("decrypt"),
+	"rekey-batch":       batchHandler("rekey"),
+	"vanity":            handleVanity,
+}
+
+func handlePing(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	return "pong", nil
+}
+
+func handleGenerateMnemonic(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	return GenerateMnemonic()
+}
+
+func handleDeriveKey(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p mnemonicParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	privKey, address, err := DeriveKey(p.Mnemonic, "m/44'/60'/0'/0/0", Ethereum)
+	if err != nil {
+		return nil, err
+	}
+	return keyResult{Address: address, PrivateKey: privKey}, nil
+}
+
+func handleDeriveBtc(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p mnemonicParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	if p.WitnessType == "" {
+		p.WitnessType = "legacy"
+	}
+	privKey, address, err := DeriveKey(p.Mnemonic, "m/44'/0'/0'/0/0", Bitcoin, p.WitnessType)
+	if err != nil {
+		return nil, err
+	}
+	return keyResult{Address: address, PrivateKey: privKey}, nil
+}
+
+func handleDeriveSol(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p mnemonicParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	privKey, address, err := DeriveKey(p.Mnemonic, "m/44'/501'/0'/0", Solana)
+	if err != nil {
+		return nil, err
+	}
+	return keyResult{Address: address, PrivateKey: privKey}, nil
+}
+
+func handleDeriveAll(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p mnemonicParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	return DeriveAll(p.Mnemonic)
+}
+
+func handleDeriveRange(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p rangeParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	chainType, err := ParseChainType(p.Chain)
+	if err != nil {
+		return nil, err
+	}
+	if p.Count > maxRangeCount {
+		return nil, fmt.Errorf("count exceeds %d rows per request", maxRangeCount)
+	}
+	rows := make([]DerivedAddress, 0, p.Count)
+	err = DeriveRange(p.Mnemonic, chainType, p.Account, p.Start, p.Count, p.WitnessType, func(row DerivedAddress) error {
+		rows = append(rows, row)
+		return ctx.Err()
+	})
+	if err != nil {
+		return nil, err
+	}
+	return rows, nil
+}
+
+func handleCacheClear(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	derivationCache.Clear()
+	return true, nil
+}
+
+func handleVanity(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var req VanityRequest
+	if err := json.Unmarshal(params, &req); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	return SearchVanity(ctx, req, func(progress VanityProgress) {
+		reportProgress(ctx, progress)
+	})
+}
+
+func handleEncrypt(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p encryptParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	privKey, err := hex.DecodeString(p.PrivateKey)
+	if err != nil {
+		return nil, fmt.Errorf("invalid private key hex: %w", err)
+	}
+	encrypted, err := EncryptPrivateKey(privKey, p.Password)
+	if err != nil {
+		return nil, err
+	}
+	return hex.EncodeToString(encrypted), nil
+}
+
+func handleDecrypt(ctx context.Context, params json.RawMessage) (interface{}, error) {
+	var p decryptParams
+	if err := json.Unmarshal(params, &p); err != nil {
+		return nil, fmt.Errorf("invalid params: %w", err)
+	}
+	encrypted, err := hex.DecodeString(p.EncryptedKey)
+	if err != nil {
+		return nil, fmt.Errorf("invalid encrypted key hex: %w", err)
+	}
+	decrypted, err := DecryptPrivateKey(encrypted, p.Password)
+	if err != nil {
+		return nil, err
+	}
+	return hex.EncodeToString(decrypted), nil
+}
+
+// batchHandler returns a handler running CryptBatch in the given mode over the
+// request's records. Results are returned in input order.
+func batchHandler(mode string) handlerFunc {
+	return func(ctx context.Context, params json.RawMessage) (interface{}, error) {
+		var p batchParams
+		if err := json.Unmarshal(params, &p); err != nil {
+			return nil, fmt.Errorf("invalid params: %w", err)
+		}
+		records := make(chan CryptoRecord, len(p.Records))
+		for _, record := range p.Records {
+			records <- record
+		}
+		close(records)
+
+		results := make([]CryptoResult, 0, len(p.Records))
+		err := CryptBatch(ctx, mode, records, func(result CryptoResult) error {
+			results = append(results, result)
+			return nil
+		})
+		if err != nil {
+			return nil, err
+		}
+		return results, nil
+	}
+}
+
+// frameWriter serializes response frames from concurrent handlers onto one stream
+type frameWriter struct {
+	mu sync.Mutex
+	w  *bufio.Writer
+}
+
+func (fw *frameWriter) write(v interface{}) {
+	line, err := json.Marshal(v)
+	if err != nil {
+		// Should never happen for our own response types
+		line, _ = json.Marshal(response{Error: fmt.Sprintf("failed to encode response: %v", err)})
+	}
+	fw.mu.Lock()
+	defer fw.mu.Unlock()
+	fw.w.Write(line)
+	fw.w.WriteByte('\n')
+	fw.w.Flush()
+}
+
+// Serve runs the worker loop: it reads newline-delimited JSON requests from in,
+// dispatches each one on its own goroutine and writes responses to out tagged
+// with the request ID. Responses may therefore arrive out of order. The special
+// method "cancel" with params {"id": N} cancels the context of request N. The
+// loop returns when in reaches EOF and all in-flight requests have been answered.
+func Serve(in io.Reader, out io.Writer) error {
+	reader := bufio.NewReaderSize(in, 64*1024)
+	writer := &frameWriter{w: bufio.NewWriter(out)}
+	ctx, cancel := context.WithCancel(context.Background())
+	defer cancel()
+
+	var mu sync.Mutex
+	inflight := make(map[uint64]context.CancelFunc)
+
+	var wg sync.WaitGroup
+	for {
+		line, err := reader.ReadBytes('\n')
+		if len(line) > 0 {
+			var req request
+			if jsonErr := json.Unmarshal(line, &req); jsonErr != nil {
+				writer.write(response{Error: fmt.Sprintf("malformed request: %v", jsonErr)})
+			} else if req.Method == "cancel" {
+				var p cancelParams
+				json.Unmarshal(req.Params, &p)
+				mu.Lock()
+				cancelRequest, ok := inflight[p.ID]
+				mu.Unlock()
+				if ok {
+					cancelRequest()
+				}
+				writer.write(response{ID: req.ID, Result: ok})
+			} else {
+				reqCtx, cancelRequest := context.WithCancel(ctx)
+				reqCtx = context.WithValue(reqCtx, progressKey{}, func(progress interface{}) {
+					writer.write(response{ID: req.ID, Progress: progress})
+				})
+				mu.Lock()
+				inflight[req.ID] = cancelRequest
+				mu.Unlock()
+
+				wg.Add(1)
+				go func(req request) {
+					defer wg.Done()
+					resp := dispatch(reqCtx, req)
+					mu.Lock()
+					delete(inflight, req.ID)
+					mu.Unlock()
+					cancelRequest()
+					writer.write(resp)
+				}(req)
+			}
+		}
+		if err == io.EOF {
+			break
+		}
+		if err != nil {
+			cancel()
+			wg.Wait()
+			return err
+		}
+	}
+	wg.Wait()
+	return nil
+}
+
+// dispatch looks up and runs the handler for req, converting panics and
+// errors into error responses so a bad request never takes down the worker.
+func dispatch(ctx context.Context, req request) (resp response) {
+	resp.ID = req.ID
+	defer func() {
+		if r := recover(); r != nil {
+			resp.Result = nil
+			resp.Error = fmt.Sprintf("internal error: %v", r)
+		}
+	}()
+
+	handler, ok := handlers[req.Method]
+	if !ok {
+		resp.Error = fmt.Sprintf("unknown method: %s", req.Method)
+		return resp
+	}
+	if len(req.Params) == 0 {
+		req.Params = json.RawMessage("{}")
+	}
+	result, err := handler(ctx, req.Params)
+	if err != nil {
+		resp.Error = err.Error()
+		return resp
+	}
+	resp.Result = result
+	return resp
+}
+
+// runServe is the entry point for the "serve" command
+func runServe() {
+	if err := Serve(os.Stdin, os.Stdout); err != nil {
+		fmt.Fprintf(os.Stderr, "Error: %v\n", err)
+		os.Exit(1)
+	}
+	os.Exit(0)
+}
@@ -0,0 +1,309 @@
+package main
+
+import (
+	"bytes"
+	"context"
+	"encoding/hex"
+	"fmt"
+	"hash"
+	"runtime"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+	"unicode"
+
+	"github.com/btcsuite/btcutil/base58"
+	"github.com/btcsuite/btcutil/hdkeychain"
+	"github.com/tyler-smith/go-bip39"
+	"golang.org/x/crypto/sha3"
+)
+
+// base58Alphabet lists the characters that can appear in base58 addresses
+const base58Alphabet = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+// VanityRequest describes a vanity address search
+type VanityRequest struct {
+	Chain         string `json:"chain"`
+	WitnessType   string `json:"witness_type"`
+	Prefix        string `json:"prefix"`
+	Suffix        string `json:"suffix"`
+	CaseSensitive bool   `json:"case_sensitive"`
+	// Mnemonic, when set, searches address indices of Account starting at
+	// StartIndex. Otherwise every candidate is a freshly generated mnemonic
+	// and the match is its index 0 address.
+	Mnemonic   string `json:"mnemonic"`
+	Account    uint32 `json:"account"`
+	StartIndex uint32 `json:"start_index"`
+	Workers    int    `json:"workers"`
+}
+
+// VanityMatch is the key found by a vanity search
+type VanityMatch struct {
+	Mnemonic   string `json:"mnemonic,omitempty"`
+	Index      uint32 `json:"index"`
+	Path       string `json:"path"`
+	Address    string `json:"address"`
+	PrivateKey string `json:"private_key"`
+	Attempts   uint64 `json:"attempts"`
+}
+
+// VanityProgress is reported periodically while a search runs
+type VanityProgress struct {
+	Attempts   uint64  `json:"attempts"`
+	KeysPerSec float64 `json:"keys_per_sec"`
+	Elapsed    float64 `json:"elapsed"`
+}
+
+// addressMatcher tests candidate keys against a vanity pattern. Each search
+// worker owns one, so its hashing state and buffers are reused across candidates.
+type addressMatcher struct {
+	chainType     ChainType
+	witnessType   string
+	prefix        []byte
+	suffix        []byte
+	caseSensitive bool
+	keccak        hash.Hash
+	ethAddress    [20]byte
+	ethHex        [40]byte
+}
+
+func newAddressMatcher(req VanityRequest, chainType ChainType) *addressMatcher {
+	m := &addressMatcher{
+		chainType:     chainType,
+		witnessType:   req.WitnessType,
+		prefix:        []byte(req.Prefix),
+		suffix:        []byte(req.Suffix),
+		caseSensitive: req.CaseSensitive,
+	}
+	if chainType == Ethereum {
+		// Hex digits are matched against the lowercase, non-checksummed address
+		m.keccak = sha3.NewLegacyKeccak256()
+		m.prefix = bytes.ToLower(bytes.TrimPrefix(m.prefix, []byte("0x")))
+		m.suffix = bytes.ToLower(m.suffix)
+		m.caseSensitive = true
+	}
+	if !m.caseSensitive {
+		m.prefix = bytes.ToLower(m.prefix)
+		m.suffix = bytes.ToLower(m.suffix)
+	}
+	return m
+}
+
+// matches reports whether key's address fits the pattern. Ethereum candidates
+// are hashed and hex encoded into the matcher's own buffers; base58 chains
+// have to build the encoded string.
+func (m *addressMatcher) matches(key *hdkeychain.ExtendedKey) (bool, error) {
+	privateKey, err := key.ECPrivKey()
+	if err != nil {
+		return false, err
+	}
+
+	var candidate []byte
+	switch m.chainType {
+	case Ethereum:
+		ethereumAddress(m.keccak, privateKey.PubKey(), m.ethAddress[:])
+		hex.Encode(m.ethHex[:], m.ethAddress[:])
+		candidate = m.ethHex[:]
+	case Bitcoin:
+		address, err := bitcoinAddress(privateKey.PubKey().SerializeCompressed(), m.witnessType)
+		if err != nil {
+			return false, err
+		}
+		candidate = []byte(address)
+	case Solana:
+		candidate = []byte(base58.Encode(solanaPublicKey(privateKey.Serialize())))
+	}
+
+	if !m.caseSensitive {
+		candidate = bytes.ToLower(candidate)
+	}
+	return bytes.HasPrefix(candidate, m.prefix) && bytes.HasSuffix(candidate, m.suffix), nil
+}
+
+// validateVanityPattern rejects patterns that no address of the chain can match,
+// which would otherwise make the search run forever
+func validateVanityPattern(req VanityRequest, chainType ChainType) error {
+	if req.Prefix == "" && req.Suffix == "" {
+		return fmt.Errorf("a prefix or suffix is required")
+	}
+
+	prefix, alphabet := req.Prefix, base58Alphabet
+	switch chainType {
+	case Ethereum:
+		prefix, alphabet = strings.TrimPrefix(strings.ToLower(prefix), "0x"), "0123456789abcdef"
+	case Bitcoin:
+		witnessType := strings.ToLower(req.WitnessType)
+		lead := map[string]string{"segwit": "3", "bech32": "bc1q"}[witnessType]
+		if lead == "" {
+			lead = "1"
+		}
+		if prefix != "" && !strings.HasPrefix(strings.ToLower(prefix), strings.ToLower(lead)) {
+			return fmt.Errorf("%s addresses start with %s", witnessType, lead)
+		}
+		if witnessType == "bech32" {
+			// bech32 addresses are all lowercase, so a case-sensitive uppercase pattern never matches
+			if req.CaseSensitive && strings.ToLower(req.Prefix+req.Suffix) != req.Prefix+req.Suffix {
+				return fmt.Errorf("bech32 addresses are lowercase: use a lowercase pattern or a case-insensitive search")
+			}
+			prefix, alphabet = strings.ToLower(prefix[min(len(prefix), len(lead)):]), "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+		}
+	}
+
+	caseSensitive := req.CaseSensitive && alphabet == base58Alphabet
+	for _, c := range prefix + req.Suffix {
+		ok := strings.ContainsRune(alphabet, c)
+		if !caseSensitive {
+			ok = ok || strings.ContainsRune(alphabet, unicode.ToUpper(c)) || strings.ContainsRune(alphabet, unicode.ToLower(c))
+		}
+		if !ok {
+			return fmt.Errorf("invalid character %q: no %s address can contain it", c, req.Chain)
+		}
+	}
+	return nil
+}
+
+// SearchVanity looks for an address matching req using one goroutine per
+// worker (all CPUs by default). It reports progress roughly every second and
+// stops when a match is found or ctx is cancelled.
+func SearchVanity(ctx context.Context, req VanityRequest, progress func(VanityProgress)) (*VanityMatch, error) {
+	chainType, err := ParseChainType(req.Chain)
+	if err != nil {
+		return nil, err
+	}
+	if err := validateVanityPattern(req, chainType); err != nil {
+		return nil, err
+	}
+	if req.WitnessType == "" {
+		req.WitnessType = "legacy"
+	}
+	workers := req.Workers
+	if workers <= 0 {
+		workers = runtime.NumCPU()
+	}
+
+	var branchKey *hdkeychain.ExtendedKey
+	var branchPath string
+	if req.Mnemonic != "" {
+		if !bip39.IsMnemonicValid(req.Mnemonic) {
+			return nil, fmt.Errorf("invalid mnemonic phrase")
+		}
+		if branchPath, err = accountBranchPath(chainType, req.Account); err != nil {
+			return nil, err
+		}
+		var release func()
+		if branchKey, release, err = derivationCache.Derive(req.Mnemonic, branchPath); err != nil {
+			return nil, err
+		}
+		defer release()
+	} else if branchPath, err = accountBranchPath(chainType, 0); err != nil {
+		return nil, err
+	}
+
+	ctx, cancel := context.WithCancel(ctx)
+	defer cancel()
+
+	var attempts uint64
+	var once sync.Once
+	var found *VanityMatch
+	var searchErr error
+	finish := func(match *VanityMatch, err error) {
+		once.Do(func() {
+			found, searchErr = match, err
+			cancel()
+		})
+	}
+
+	var wg sync.WaitGroup
+	for w := 0; w < workers; w++ {
+		wg.Add(1)
+		go func(w int) {
+			defer wg.Done()
+			matcher := newAddressMatcher(req, chainType)
+			var count uint64
+			for i := uint64(w); ctx.Err() == nil; i += uint64(workers) {
+				var key *hdkeychain.ExtendedKey
+				var mnemonic string
+				var index uint32
+				var err error
+				if branchKey != nil {
+					// Indexed search: one child derivation per candidate. branchKey is
+					// shared by all workers; the cache fills in its public key before
+					// handing it out, so Child only reads it
+					if uint64(req.StartIndex)+i >= uint64(hdkeychain.HardenedKeyStart) {
+						break
+					}
+					index = req.StartIndex + uint32(i)
+					key, err = branchKey.Child(index)
+				} else {
+					// Fresh mnemonic per candidate: pays for entropy and the seed stretch
+					if mnemonic, err = GenerateMnemonic(); err == nil {
+						key, err = deriveFromSeed(bip39.NewSeed(mnemonic, ""), branchPath+"/0")
+					}
+				}
+				if err != nil {
+					finish(nil, err)
+					return
+				}
+
+				ok, err := matcher.matches(key)
+				if err != nil {
+					finish(nil, err)
+					return
+				}
+				// Publish attempts in batches to keep the shared counter off the hot path
+				if count++; count%256 == 0 {
+					atomic.AddUint64(&attempts, 256)
+				}
+				if ok {
+					atomic.AddUint64(&attempts, count%256)
+					privKey, address, err := keyFromExtended(key, chainType, req.WitnessType)
+					if err != nil {
+						finish(nil, err)
+						return
+					}
+					finish(&VanityMatch{
+						Mnemonic:   mnemonic,
+						Index:      index,
+						Path:       fmt.Sprintf("%s/%d", branchPath, index),
+						Address:    address,
+						PrivateKey: privKey,
+					}, nil)
+					return
+				}
+			}
+			atomic.AddUint64(&attempts, count%256)
+		}(w)
+	}
+
+	start := time.Now()
+	done := make(chan struct{})
+	go func() {
+		wg.Wait()
+		close(done)
+	}()
+	ticker := time.NewTicker(time.Second)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-done:
+			if found != nil {
+				found.Attempts = atomic.LoadUint64(&attempts)
+				return found, nil
+			}
+			if searchErr != nil {
+				return nil, searchErr
+			}
+			if ctx.Err() != nil {
+				return nil, fmt.Errorf("vanity search cancelled after %d attempts", atomic.LoadUint64(&attempts))
+			}
+			return nil, fmt.Errorf("vanity search exhausted the index range")
+		case <-ticker.C:
+			if progress != nil {
+				n := atomic.LoadUint64(&attempts)
+				elapsed := time.Since(start).Seconds()
+				progress(VanityProgress{Attempts: n, KeysPerSec: float64(n) / elapsed, Elapsed: elapsed})
+			}
+		}
+	}
+}
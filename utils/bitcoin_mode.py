@@ -1,7 +1,10 @@
 import getpass
+import os
 from chains.Bitcoin import BitcoinClient
+from chains.btc_fees import FEE_TARGETS, tx_fee, tx_vsize
 from chains.util import derive_key, generate_mnemonic
-from bitcoinlib.wallets import wallet_create_or_open
+from chains.session import DEFAULT_IDLE_TIMEOUT
+from chains.discovery import discover, btc_probe
 
 class BitcoinMode:
     def __init__(self):
@@ -23,16 +26,67 @@ class BitcoinMode:
         print("\nBitcoin commands:")
         print("  wallet        - Show current wallet info")
         print("  balance <addr> - Check BTC balance (uses current wallet if no address provided)")
+        print("  balance <addr> <addr> ... | <file> - Check many balances (file: one address per line)")
         print("  create <mnemonic> - Create a new wallet (generates mnemonic if none provided)")
         print("  encrypt       - Encrypt the current wallet")
         print("  decrypt       - Decrypt an encrypted wallet")
-        print("  send <to> <amount> <fee> - Send BTC to an address (fee in satoshis is optional)")
+        print("  unlock [minutes] - Keep the encrypted wallet unlocked for sending")
+        print("  lock          - Wipe the unlocked key from memory")
+        print("  send <to> <amount> [slow|normal|fast | <sat>/vb | fee] [strategy] - Send BTC priced from fee estimates (default normal), a rate or a flat fee in satoshis; strategy: auto, bnb, knapsack, largest_first")
+        print("  select <amount> [slow|normal|fast | <sat>/vb] [to] - Compare the inputs, size and fee of each coin selection strategy")
+        print("  fees          - Show slow/normal/fast fee rate estimates")
         print("  network <name> - Switch to a different network (bitcoin, testnet)")
         print("  format <type> - Switch address format (legacy, segwit, bech32)")
         print("  tx <hash>     - Check transaction status")
+        print("  cache         - Show RPC cache hit/miss statistics")
+        print("  discover <mnemonic> - Find all funded addresses of a mnemonic")
         print("  back          - Return to main menu")
         print("  help          - Show this help message\n")
 
+    def _parse_fee(self, value: str) -> tuple:
+        """
+        Read a send fee argument: a priority, a rate like 12/vb, or flat satoshis.
+        
+        Returns:
+            tuple: (flat fee in satoshis or None, sat/vB or None)
+        """
+        value = value.lower()
+        if value in FEE_TARGETS:
+            return None, self.btc_client.estimate_fees([value])[value]
+        if value.endswith("/vb"):
+            return None, float(value[:-3])
+        if value.isdigit():
+            return int(value), None
+        raise ValueError(f"Invalid fee '{value}', use slow, normal, fast, <sat>/vb or satoshis")
+
+    def print_balances(self, targets):
+        """Look up and print balances for addresses and/or files of addresses"""
+        addresses = []
+        for target in targets:
+            if os.path.isfile(target):
+                with open(target) as f:
+                    addresses.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+            else:
+                addresses.append(target)
+        
+        try:
+            balances = self.btc_client.get_balances(addresses)
+        except Exception as e:
+            print(f"\n⚠️ Error checking balances: {str(e)}")
+            return
+        
+        total = 0
+        failed = 0
+        print(f"\n💰 BTC Balances ({len(balances)} addresses):")
+        for address, (balance, error) in balances.items():
+            if error:
+                failed += 1
+                print(f"{address}: ⚠️ {error}")
+            else:
+                total += balance
+                print(f"{address}: {balance} BTC")
+        print(f"\nTotal: {round(total, 8)} BTC" + (f" ({failed} failed)" if failed else "") + "\n")
+
     def get_mnemonic_from_user(self, args, last_mnemonic):
         """Helper to extract mnemonic from args or prompt user"""
         if args and isinstance(args, list) and args[0].strip():
@@ -60,7 +114,8 @@ class BitcoinMode:
         
         while True:
             try:
-                command = input("btc> ").strip().lower()
+                line = input("btc> ").strip()
+                command = line.lower()
                 
                 if not command:
                     continue
@@ -148,22 +203,18 @@ class BitcoinMode:
                     self.wallet_format = format_type
                     print(f"\n✅ Changed address format from {old_format} to {format_type}")
                     
-                    # If we have a wallet loaded with private key, update the address
-                    if self.current_wallet and "private_key" in self.current_wallet:
+                    # Every format of the wallet is derived up front, switching is a lookup
+                    if self.current_wallet and ("addresses" in self.current_wallet or "private_key" in self.current_wallet):
                         try:
-                            # Regenerate address with new format
-                            private_key = self.current_wallet["private_key"]
-                            witness_type = self._get_witness_type()
-                            
-                            wallet_name = f"temp_wallet_{self.wallet_format}"
-                            temp_wallet = wallet_create_or_open(
-                                wallet_name,
-                                keys=private_key,
-                                witness_type=witness_type
-                            )
-                            new_address = temp_wallet.get_key().address
+                            if "addresses" not in self.current_wallet:
+                                # Key loaded without its mnemonic, encode it once in every format
+                                self.current_wallet["addresses"] = BitcoinClient.address_formats(
+                                    self.current_wallet["private_key"]
+                                )
+                            new_address = self.current_wallet["addresses"][format_type]
                             
                             self.current_wallet["address"] = new_address
+                            self.current_wallet["format"] = format_type
                             print(f"Updated wallet address to: {new_address}")
                             print(f"Note: This is the same wallet, just in a different format\n")
                         except Exception as e:
@@ -193,7 +244,13 @@ class BitcoinMode:
                         print(f"\n⚠️ Error creating wallet: {str(e)}")
                 
                 elif command == "balance":
-                    address = args[0] if args else (self.current_wallet.get('address') if self.current_wallet else None)
+                    # Base58 addresses and file names are case-sensitive, take the arguments as typed
+                    targets = line.split()[1:]
+                    if len(targets) > 1 or (targets and os.path.isfile(targets[0])):
+                        self.print_balances(targets)
+                        continue
+                    
+                    address = targets[0] if targets else (self.current_wallet.get('address') if self.current_wallet else None)
                     
                     if not address:
                         print("\n⚠️ No address provided or wallet loaded\n")
@@ -224,6 +281,7 @@ class BitcoinMode:
                     try:
                         private_key = self.current_wallet["private_key"]
                         encrypted_data = self.btc_client.encrypt_wallet(private_key, password)
+                        previous = self.current_wallet
                         
                         # Update current wallet - keep address and format, only encrypt private key
                         self.current_wallet = {
@@ -231,6 +289,8 @@ class BitcoinMode:
                             "encrypted_key": encrypted_data["encrypted_key"],
                             "format": self.wallet_format
                         }
+                        if "addresses" in previous:
+                            self.current_wallet["addresses"] = previous["addresses"]
                         
                         print(f"\n🔒 Private key encrypted successfully!")
                         print(f"Password: {encrypted_data['password_reference']}")
@@ -256,6 +316,7 @@ class BitcoinMode:
                     
                     try:
                         private_key = self.btc_client.decrypt_wallet(encrypted_key, password)
+                        previous = self.current_wallet
                         
                         # Update current wallet - keep address and format, only decrypt private key
                         self.current_wallet = {
@@ -263,6 +324,9 @@ class BitcoinMode:
                             "private_key": private_key,
                             "format": self.wallet_format
                         }
+                        if previous.get("encrypted_key") == encrypted_key and "addresses" in previous:
+                            # Same key, its other formats stay valid
+                            self.current_wallet["addresses"] = previous["addresses"]
                         
                         print(f"\n🔓 Private key decrypted successfully!")
                         print(f"Address: {self.current_wallet['address']}")
@@ -271,9 +335,33 @@ class BitcoinMode:
                     except Exception as e:
                         print(f"\n⚠️ Error decrypting private key: {str(e)}")
                 
+                elif command == "unlock":
+                    if not self.current_wallet or "encrypted_key" not in self.current_wallet:
+                        print("\n⚠️ No encrypted wallet loaded. Use 'encrypt' first\n")
+                        continue
+                    
+                    idle_timeout = float(args[0]) * 60 if args else DEFAULT_IDLE_TIMEOUT
+                    password = getpass.getpass("\nEnter wallet password: ")
+                    
+                    try:
+                        self.btc_client.unlock_wallet(
+                            self.current_wallet["encrypted_key"],
+                            password,
+                            idle_timeout=idle_timeout
+                        )
+                        print(f"\n🔓 Wallet unlocked for sending (auto-locks after {idle_timeout / 60:g} idle minutes)\n")
+                    except Exception as e:
+                        print(f"\n⚠️ Error unlocking wallet: {str(e)}")
+                
+                elif command == "lock":
+                    self.btc_client.lock_wallet()
+                    print("\n🔒 Wallet locked\n")
+                
                 elif command == "send":
+                    # Base58 addresses are case-sensitive, take the arguments as typed
+                    args = line.split()[1:]
                     if len(args) < 2:
-                        print("\n⚠️ Usage: send <to_address> <amount> [fee]\n")
+                        print("\n⚠️ Usage: send <to_address> <amount> [slow|normal|fast | <sat>/vb | fee] [strategy]\n")
                         continue
                     
                     if not self.current_wallet:
@@ -282,7 +370,12 @@ class BitcoinMode:
                     
                     to_address = args[0]
                     amount = float(args[1])
-                    fee = int(args[2]) if len(args) > 2 else 500  # Default fee in satoshis
+                    try:
+                        fee, fee_rate = self._parse_fee(args[2] if len(args) > 2 else "normal")
+                    except ValueError as e:
+                        print(f"\n⚠️ {str(e)}\n")
+                        continue
+                    strategy = args[3].lower() if len(args) > 3 else "auto"
                     
                     if "private_key" in self.current_wallet:
                         # Need to encrypt first
@@ -312,7 +405,10 @@ class BitcoinMode:
                             print("\n⚠️ Wallet has no encrypted key\n")
                             continue
                         
-                        password = getpass.getpass("\nEnter wallet password: ")
+                        if self.btc_client.session.signer(encrypted_key):
+                            password = None  # Wallet is unlocked, no decryption needed
+                        else:
+                            password = getpass.getpass("\nEnter wallet password: ")
                     
                     try:
                         tx_hash = self.btc_client.send_transaction(
@@ -320,12 +416,16 @@ class BitcoinMode:
                             password, 
                             to_address, 
                             amount,
-                            fee=fee
+                            fee=fee,
+                            from_address=self.current_wallet.get("address"),
+                            fee_rate=fee_rate,
+                            strategy=strategy
                         )
                         
                         print(f"\n✅ Transaction sent successfully!")
                         print(f"Transaction Hash: {tx_hash}")
-                        print(f"Sending {amount} BTC to {to_address}\n")
+                        print(f"Sending {amount} BTC to {to_address}")
+                        print(f"Fee: {fee} sat (flat)\n" if fee is not None else f"Fee rate: {fee_rate:g} sat/vB\n")
                     except Exception as e:
                         print(f"\n⚠️ Error sending transaction: {str(e)}")
                 
@@ -348,6 +448,62 @@ class BitcoinMode:
                     except Exception as e:
                         print(f"\n⚠️ Error connecting to network: {str(e)}")
 
+                elif command == "select":
+                    args = line.split()[1:]
+                    if not args or not self.current_wallet:
+                        print("\n⚠️ Usage: select <amount> [slow|normal|fast | <sat>/vb] [to_address] (needs a loaded wallet)\n")
+                        continue
+                    address = self.current_wallet["address"]
+                    amount = float(args[0])
+                    try:
+                        fee, fee_rate = self._parse_fee(args[1] if len(args) > 1 else "normal")
+                    except ValueError as e:
+                        print(f"\n⚠️ {str(e)}\n")
+                        continue
+                    if fee is not None:
+                        print("\n⚠️ select compares strategies at a fee rate, use <sat>/vb or a priority\n")
+                        continue
+                    to_address = args[2] if len(args) > 2 else None
+                    
+                    print(f"\n🧮 Inputs for {amount} BTC at {fee_rate} sat/vB from {address}:")
+                    best = None
+                    for strategy in ("bnb", "knapsack", "largest_first"):
+                        try:
+                            selection = self.btc_client.select_inputs(address, amount, fee_rate, to_address, strategy)
+                        except ValueError as e:
+                            print(f"  {strategy:<14} no selection ({str(e)})")
+                            continue
+                        print(
+                            f"  {strategy:<14} {len(selection.inputs):>4} inputs  {selection.vsize:>7} vB  "
+                            f"fee {selection.fee:>8} sat  change {selection.change:>10} sat  waste {selection.waste}"
+                        )
+                        if best is None or (selection.waste, len(selection.inputs)) < (best.waste, len(best.inputs)):
+                            best = selection
+                    if best:
+                        print(f"\n✅ Sends use {best.strategy} (least waste)\n")
+                    else:
+                        print()
+                
+                elif command == "fees":
+                    try:
+                        rates = self.btc_client.estimate_fees()
+                    except Exception as e:
+                        print(f"\n⚠️ Error estimating fees: {str(e)}")
+                        continue
+                    address_format = self.wallet_format
+                    # One input of the wallet's format paying one output of the same format, plus change
+                    vsize = tx_vsize(address_format, 1, [address_format, address_format])
+                    print(f"\n⛽ Fee estimates ({address_format} 1-in 2-out transaction, {vsize} vB):")
+                    for priority, rate in rates.items():
+                        print(f"  {priority:<7} ~{FEE_TARGETS[priority]:>2} blocks  {rate:>8g} sat/vB  {tx_fee(rate, address_format, 1, [address_format, address_format]):>8} sat")
+                    print()
+                
+                elif command == "cache":
+                    stats = self.btc_client.cache_stats()
+                    print(f"\n🗄️ RPC cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+                    print(f"Entries: {stats['immutable_entries']} immutable, {stats['latest_entries']} until next block, {stats['evictions']} evicted")
+                    print(f"Head block: {stats['head']}\n")
+
                 elif command == "tx":
                     if not args:
                         print("\n⚠️ Usage: tx <hash>\n")
@@ -363,6 +519,26 @@ class BitcoinMode:
                     except Exception as e:
                        print(f"\n⚠️ Error checking transaction: {str(e)}")
 
+                elif command == "discover":
+                    mnemonic = self.get_mnemonic_from_user(" ".join(args), last_mnemonic)
+                    
+                    try:
+                        print("\n🔍 Scanning accounts and addresses...")
+                        funded = discover(
+                            mnemonic,
+                            {"btc": btc_probe(self.btc_client)},
+                            witness_type=self.wallet_format
+                        )
+                        if not funded:
+                            print("\nNo funded addresses found\n")
+                            continue
+                        print(f"\n💰 Found {len(funded)} funded address(es):")
+                        for entry in funded:
+                            print(f"Account {entry['account']} / Index {entry['index']}: {entry['address']} - {entry['balance']} BTC")
+                        print()
+                    except Exception as e:
+                        print(f"\n⚠️ Error discovering addresses: {str(e)}")
+                
                 else:
                     print(f"\n❌ Unknown Bitcoin command: {command}")
                     self.print_btc_help()
@@ -376,13 +552,10 @@ class BitcoinMode:
         return self.current_wallet
         
     def _get_witness_type(self):
-        """Helper method to convert wallet format to witness type"""
-        if self.wallet_format == "legacy":
-            return "legacy"
-        elif self.wallet_format == "segwit":
-            return "segwit"
-        elif self.wallet_format == "bech32":
-            return "segwit"  # bech32 is also SegWit, but with a different encoding
+        """Helper method to convert wallet format to the Go core witness type"""
+        # The Go core names formats like the CLI: segwit is P2SH-wrapped, bech32 is native
+        if self.wallet_format in ("legacy", "segwit", "bech32"):
+            return self.wallet_format
         return "legacy"  # Default
 
 
@@ -1,11 +1,20 @@
 import getpass
+import os
+import time
 from chains.Ethereum import Ethereumchain
 from chains.util import derive_key, generate_mnemonic
+from chains.session import DEFAULT_IDLE_TIMEOUT
+from chains.discovery import discover, eth_probe
+from chains.tokens import load_tokens, token_key
+from chains.payout import read_recipients, run_payout
+from chains.watcher import TxWatcher
+from chains.indexer import TransferIndexer
 
 class EthereumMode:
     def __init__(self):
         self.eth_client = None
         self.current_wallet = None
+        self.indexer = None
 
     def initialize_ethereum(self, rpc_url=None):
         """Initialize Ethereum client with default or specified RPC URL"""
@@ -25,12 +34,27 @@ class EthereumMode:
         print("\nEthereum commands:")
         print("  wallet        - Show current wallet info")
         print("  balance <addr> - Check ETH balance (uses current wallet if no address provided)")
+        print("  balance <addr> <addr> ... | <file> - Check many balances (file: one address per line)")
+        print("  tokens <token_file> [addr ...] - Check ERC-20 balances (token_file: JSON token list)")
         print("  create <mnemonic> - Create a new wallet (generates mnemonic if none provided)")
         print("  encrypt       - Encrypt the current wallet")
         print("  decrypt       - Decrypt an encrypted wallet")
-        print("  send <to> <amount> - Send ETH to an address")
+        print("  unlock [minutes] - Keep the encrypted wallet unlocked for sending")
+        print("  lock          - Wipe the unlocked key from memory")
+        print("  send <to> <amount> [slow|normal|fast|gwei] - Send ETH to an address")
+        print("  fees          - Show EIP-1559 fee estimates")
+        print("  payout <file> - Pay every recipient in a CSV/JSONL file (address,amount)")
         print("  tx <hash>     - Check transaction status")
+        print("  cache         - Show RPC cache hit/miss statistics")
+        print("  watch <hash> ... - Follow transactions until they have 12 confirmations")
+        print("  follow [addr ...] - Print balance changes every block and incoming pending transactions")
+        print("  history [addr] [start_block] - Index and list ERC-20 transfers (stored in transfers.db)")
+        print("  discover <mnemonic> - Find all funded addresses of a mnemonic")
         print("  connect <url> - Connect to a different Ethereum node")
+        print("  connect add <url> - Add a failover endpoint")
+        print("  connect ws <url|off> - Receive new blocks over WebSocket instead of polling")
+        print("  connect remove <url|number> - Remove an endpoint")
+        print("  connect list  - Show endpoints and their health")
         print("  back          - Return to main menu")
         print("  help          - Show this help message\n")
 
@@ -60,6 +84,235 @@ class EthereumMode:
         except Exception as e:
             print(f"\n⚠️ Error deriving Ethereum keys: {str(e)}")
 
+    def handle_connect_command(self, args):
+        """Replace, extend or inspect the node endpoint list"""
+        if not args:
+            print("\n⚠️ Usage: connect <rpc_url> | connect add <url> | connect remove <url|number> | connect list | connect ws <ws_url|off>\n")
+            return
+        
+        provider = self.eth_client.provider
+        action = args[0].lower()
+        try:
+            if action == "add" and len(args) > 1:
+                provider.add_endpoint(args[1])
+                print(f"\n✅ Added failover endpoint {args[1]}\n")
+            
+            elif action == "remove" and len(args) > 1:
+                target = args[1]
+                if target.isdigit():
+                    target = provider.endpoints[int(target) - 1].url
+                provider.remove_endpoint(target)
+                print(f"\n✅ Removed endpoint {target}\n")
+            
+            elif action == "ws" and len(args) > 1:
+                if args[1].lower() == "off":
+                    self.eth_client.unsubscribe_heads()
+                    print("\n✅ Head feed stopped, polling for new blocks\n")
+                else:
+                    heads = self.eth_client.subscribe_heads(args[1], pending=True)
+                    print(f"\n✅ Subscribed to new heads at {args[1]}")
+                    if heads.last_error:
+                        print(f"⚠️ {heads.last_error}")
+                    print()
+            
+            elif action == "list":
+                print("\n🔍 Checking endpoints...")
+                statuses = provider.check_health()
+                if not statuses:
+                    print("\nNo endpoints configured\n")
+                    return
+                print()
+                for number, status in enumerate(statuses, 1):
+                    marker = "✅" if status["healthy"] else "❌"
+                    detail = (
+                        f"block {status['block_number']}, {status['latency_ms']} ms" if status["healthy"]
+                        else status["last_error"]
+                    )
+                    print(f"{number}. {marker} {status['url']} ({detail})")
+                print()
+            
+            else:
+                rpc_url = args[0]
+                self.eth_client.unsubscribe_heads()
+                self.eth_client = Ethereumchain(rpc_url)
+                print(f"\n✅ Connected to Ethereum node at {rpc_url}\n")
+        except IndexError:
+            print(f"\n⚠️ No endpoint number {args[1]}\n")
+        except Exception as e:
+            print(f"\n⚠️ Error connecting to node: {str(e)}")
+
+    def handle_payout_command(self, args):
+        """Validate a payout file, then sign and broadcast every row"""
+        if not args:
+            print("\n⚠️ Usage: payout <file>\n")
+            return
+        if not self.current_wallet or "encrypted_key" not in self.current_wallet:
+            print("\n⚠️ No encrypted wallet loaded. Use 'encrypt' first\n")
+            return
+        
+        path = args[0].strip()
+        try:
+            recipients = read_recipients(path)
+        except Exception as e:
+            print(f"\n⚠️ Error reading payout file: {str(e)}\n")
+            return
+        
+        total = sum(recipient["amount"] for recipient in recipients)
+        journal_path = path + ".journal.jsonl"
+        print(f"\n📋 {len(recipients)} recipients, {total} ETH in total")
+        print(f"Journal: {journal_path}")
+        print("Proceed? (y/n)")
+        if input("> ").strip().lower() != "y":
+            print("\n❌ Payout cancelled\n")
+            return
+        
+        encrypted_key = self.current_wallet["encrypted_key"]
+        try:
+            account = self.eth_client.session.signer(encrypted_key)
+            if account is None:
+                password = getpass.getpass("\nEnter wallet password: ")
+                self.eth_client.unlock_wallet(encrypted_key, password)
+                account = self.eth_client.session.signer(encrypted_key)
+            
+            def report(result):
+                if result["status"] == "sent":
+                    print(f"✅ Row {result['row']}: {result['amount']} ETH to {result['to']} - {result['hash']}")
+                else:
+                    print(f"⚠️ Row {result['row']}: {result['error']}")
+            
+            summary = run_payout(self.eth_client, account, recipients, journal_path, on_result=report)
+            print(f"\n📦 Payout done: {summary['sent']} sent, {summary['failed']} failed, {summary['skipped']} already sent")
+            if summary["failed"]:
+                print("Run the same payout again to retry failed rows")
+            print()
+        except Exception as e:
+            print(f"\n⚠️ Error running payout: {str(e)}")
+
+    def watch_transactions(self, hashes):
+        """Print status changes of hashes until all are final or Ctrl+C"""
+        watcher = TxWatcher(self.eth_client)
+        for tx_hash in hashes:
+            watcher.add(tx_hash)
+        
+        def report(event):
+            if event["final"]:
+                print(f"🏁 {event['hash']}: {event['status']} with {event['confirmations']} confirmations")
+            elif event["block_number"] is None:
+                print(f"⚠️ {event['hash']}: {event['previous_status']} -> {event['status']}, its block was reorged out")
+            else:
+                print(f"🔔 {event['hash']}: {event['previous_status']} -> {event['status']} in block {event['block_number']}")
+        watcher.on_change(report)
+        
+        print(f"\n👀 Watching {len(hashes)} transaction(s), Ctrl+C to stop\n")
+        try:
+            while watcher.tracked:
+                watcher.poll()
+                watcher.wait()
+            print()
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopped watching\n")
+        except Exception as e:
+            print(f"\n⚠️ Error watching transactions: {str(e)}")
+
+    def follow_addresses(self, addresses):
+        """Print balance changes of addresses every block, and their pending transactions, until Ctrl+C"""
+        heads = self.eth_client.heads
+        
+        def report_pending(tx):
+            value = self.eth_client.w3.from_wei(int(tx.get("value", "0x0"), 16), "ether")
+            print(f"⏳ Pending {tx['hash']}: {value} ETH {tx.get('from')} -> {tx.get('to')}")
+        
+        if heads:
+            for address in addresses:
+                heads.track(address)
+            heads.on_pending(report_pending)
+        mode = "pushed by WebSocket" if heads else "polled every 12 s, use 'connect ws <url>' for push updates"
+        print(f"\n👀 Following {len(addresses)} address(es), new blocks {mode}. Ctrl+C to stop\n")
+        
+        balances = {}
+        head = None
+        try:
+            while True:
+                if heads and heads.connected:
+                    head = heads.wait_for_head(head, timeout=60)
+                else:
+                    new_head = self.eth_client.w3.eth.block_number
+                    if new_head == head:
+                        time.sleep(12)
+                        continue
+                    head = new_head
+                for address, (balance, error) in self.eth_client.get_balances(addresses).items():
+                    if error:
+                        print(f"⚠️ {address}: {error}")
+                    elif balances.get(address) != balance:
+                        change = "" if address not in balances else f" ({balance - balances[address]:+} ETH)"
+                        print(f"💰 Block {head}: {address} {balance} ETH{change}")
+                        balances[address] = balance
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopped following\n")
+        except Exception as e:
+            print(f"\n⚠️ Error following addresses: {str(e)}")
+        finally:
+            if heads:
+                heads.remove_callback(report_pending)
+                for address in addresses:
+                    heads.untrack(address)
+
+    def show_history(self, args):
+        """Index ERC-20 transfers of an address and print its history from the local store"""
+        address = args[0] if args and args[0].lower().startswith("0x") else None
+        if address is None and self.current_wallet:
+            address = self.current_wallet["address"]
+        if not address:
+            print("\n⚠️ Usage: history [address] [start_block]\n")
+            return
+        start_block = int(args[-1]) if args and args[-1].isdigit() else 0
+        
+        try:
+            if self.indexer is None:
+                self.indexer = TransferIndexer(self.eth_client)
+            print("\n🔍 Indexing token transfers...")
+            stored = self.indexer.index([address], start_block=start_block)
+            transfers = self.indexer.history(address)
+        except Exception as e:
+            print(f"\n⚠️ Error indexing transfers: {str(e)}")
+            return
+        
+        print(f"\n📜 Token transfers of {address} ({len(transfers)} total, {stored} new):")
+        for tx in transfers:
+            direction = "OUT" if tx.from_address == address.lower() else "IN "
+            counterparty = tx.to_address if direction == "OUT" else tx.from_address
+            print(f"{tx.block_number:>10} {direction} {tx.amount:>30f} {tx.raw_data['token']} {counterparty} {tx.tx_hash}")
+        print()
+
+    def print_balances(self, targets):
+        """Look up and print balances for addresses and/or files of addresses"""
+        addresses = []
+        for target in targets:
+            if os.path.isfile(target):
+                with open(target) as f:
+                    addresses.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+            else:
+                addresses.append(target)
+        
+        try:
+            balances = self.eth_client.get_balances(addresses)
+        except Exception as e:
+            print(f"\n⚠️ Error checking balances: {str(e)}")
+            return
+        
+        total = 0
+        failed = 0
+        print(f"\n💰 ETH Balances ({len(balances)} addresses):")
+        for address, (balance, error) in balances.items():
+            if error:
+                failed += 1
+                print(f"{address}: ⚠️ {error}")
+            else:
+                total += balance
+                print(f"{address}: {balance} ETH")
+        print(f"\nTotal: {total} ETH" + (f" ({failed} failed)" if failed else "") + "\n")
+
     def start(self, last_mnemonic=None):
         """Handle Ethereum-specific commands"""
         # Initialize Ethereum client if not already done
@@ -72,7 +325,8 @@ class EthereumMode:
         
         while True:
             try:
-                command = input("eth> ").strip().lower()
+                line = input("eth> ").strip()
+                command = line.lower()
                 
                 if not command:
                     continue
@@ -143,7 +397,13 @@ class EthereumMode:
                         print(f"\n⚠️ Error creating wallet: {str(e)}")
                 
                 elif command == "balance":
-                    address = args[0] if args else (self.current_wallet.get('address') if self.current_wallet else None)
+                    # File paths and checksum addresses are case-sensitive, use the raw input
+                    targets = line.split()[1:]
+                    if len(targets) > 1 or (targets and os.path.isfile(targets[0])):
+                        self.print_balances(targets)
+                        continue
+                    
+                    address = targets[0] if targets else (self.current_wallet.get('address') if self.current_wallet else None)
                     
                     if not address:
                         print("\n⚠️ No address provided or wallet loaded\n")
@@ -155,6 +415,36 @@ class EthereumMode:
                     except Exception as e:
                         print(f"\n⚠️ Error checking balance: {str(e)}")
                 
+                elif command == "tokens":
+                    targets = line.split()[1:]
+                    if not targets:
+                        print("\n⚠️ Usage: tokens <token_file> [addr ...]\n")
+                        continue
+                    
+                    holders = targets[1:] or ([self.current_wallet["address"]] if self.current_wallet else [])
+                    if not holders:
+                        print("\n⚠️ No address provided or wallet loaded\n")
+                        continue
+                    
+                    try:
+                        tokens = load_tokens(targets[0])
+                        balances = self.eth_client.get_token_balances(holders, tokens)
+                        # Symbols can repeat (bridged and native USDC), so show the contract too
+                        labels = {
+                            token_key(token): token.symbol if token.is_native else f"{token.symbol} ({token.contract_address})"
+                            for token in tokens
+                        }
+                        for holder, holdings in balances.items():
+                            print(f"\n💰 Token balances for {holder}:")
+                            for key, balance in holdings.items():
+                                if balance is None:
+                                    print(f"  {labels[key]}: ⚠️ call failed")
+                                elif balance > 0:
+                                    print(f"  {labels[key]}: {balance}")
+                        print()
+                    except Exception as e:
+                        print(f"\n⚠️ Error checking token balances: {str(e)}")
+                
                 elif command == "encrypt":
                     if not self.current_wallet or "private_key" not in self.current_wallet:
                         print("\n⚠️ No wallet with private key loaded\n")
@@ -218,9 +508,32 @@ class EthereumMode:
                     except Exception as e:
                         print(f"\n⚠️ Error decrypting private key: {str(e)}")
                 
+                elif command == "unlock":
+                    if not self.current_wallet or "encrypted_key" not in self.current_wallet:
+                        print("\n⚠️ No encrypted wallet loaded. Use 'encrypt' first\n")
+                        continue
+                    
+                    idle_timeout = float(args[0]) * 60 if args else DEFAULT_IDLE_TIMEOUT
+                    password = getpass.getpass("\nEnter wallet password: ")
+                    
+                    try:
+                        self.eth_client.unlock_wallet(
+                            self.current_wallet["encrypted_key"],
+                            password,
+                            idle_timeout=idle_timeout
+                        )
+                        print(f"\n🔓 Wallet unlocked for sending (auto-locks after {idle_timeout / 60:g} idle minutes)\n")
+                    except Exception as e:
+                        print(f"\n⚠️ Error unlocking wallet: {str(e)}")
+                
+                elif command == "lock":
+                    self.eth_client.lock_wallet()
+                    print("\n🔒 Wallet locked\n")
+                
                 elif command == "send":
+                    args = line.split()[1:]
                     if len(args) < 2:
-                        print("\n⚠️ Usage: send <to_address> <amount>\n")
+                        print("\n⚠️ Usage: send <to_address> <amount> [slow|normal|fast|gas_price_gwei]\n")
                         continue
                     
                     if not self.current_wallet:
@@ -258,19 +571,27 @@ class EthereumMode:
                             print("\n⚠️ Wallet has no encrypted key\n")
                             continue
                         
-                        password = getpass.getpass("\nEnter wallet password: ")
+                        if self.eth_client.session.signer(encrypted_key):
+                            password = None  # Wallet is unlocked, no decryption needed
+                        else:
+                            password = getpass.getpass("\nEnter wallet password: ")
                     
                     try:
                         gas_price = None
+                        fee_tier = "normal"
                         if len(args) > 2:
-                            gas_price = float(args[2])
+                            if args[2].lower() in ("slow", "normal", "fast"):
+                                fee_tier = args[2].lower()
+                            else:
+                                gas_price = float(args[2])
                         
                         tx_hash = self.eth_client.send_transaction(
                             encrypted_key, 
                             password, 
                             to_address, 
                             amount,
-                            gas_price_gwei=gas_price
+                            gas_price_gwei=gas_price,
+                            fee_tier=fee_tier
                         )
                         
                         print(f"\n✅ Transaction sent successfully!")
@@ -279,6 +600,26 @@ class EthereumMode:
                     except Exception as e:
                         print(f"\n⚠️ Error sending transaction: {str(e)}")
                 
+                elif command == "payout":
+                    # File paths are case-sensitive, use the raw input
+                    self.handle_payout_command(line.split(maxsplit=1)[1:])
+                
+                elif command == "fees":
+                    try:
+                        estimates = self.eth_client.get_fee_estimates()
+                        print(f"\n⛽ Base fee: {estimates['normal']['baseFeePerGas']:.3f} Gwei")
+                        for tier, fees in estimates.items():
+                            print(f"{tier:<7} max fee {fees['maxFeePerGas']:.3f} Gwei, priority {fees['maxPriorityFeePerGas']:.3f} Gwei")
+                        print()
+                    except Exception as e:
+                        print(f"\n⚠️ Error getting fee estimates: {str(e)}")
+                
+                elif command == "cache":
+                    stats = self.eth_client.cache_stats()
+                    print(f"\n🗄️ RPC cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+                    print(f"Entries: {stats['immutable_entries']} immutable, {stats['latest_entries']} until next block, {stats['evictions']} evicted")
+                    print(f"Head block: {stats['head']}\n")
+                
                 elif command == "tx":
                     if not args:
                         print("\n⚠️ Usage: tx <hash>\n")
@@ -295,18 +636,47 @@ class EthereumMode:
                     except Exception as e:
                         print(f"\n⚠️ Error checking transaction: {str(e)}")
                 
-                elif command == "connect":
-                    if not args:
-                        print("\n⚠️ Usage: connect <rpc_url>\n")
+                elif command == "watch":
+                    hashes = line.split()[1:]
+                    if not hashes:
+                        print("\n⚠️ Usage: watch <hash> [hash ...]\n")
                         continue
-                    
-                    rpc_url = args[0]
+                    self.watch_transactions(hashes)
+                
+                elif command == "follow":
+                    addresses = line.split()[1:]
+                    if not addresses and self.current_wallet:
+                        addresses = [self.current_wallet["address"]]
+                    if not addresses:
+                        print("\n⚠️ Usage: follow [addr ...]\n")
+                        continue
+                    self.follow_addresses(addresses)
+                
+                elif command == "history":
+                    self.show_history(line.split()[1:])
+                
+                elif command == "connect":
+                    # URLs often carry case-sensitive API keys, use the raw input
+                    self.handle_connect_command(line.split()[1:])
+                
+                elif command == "discover":
+                    mnemonic = self.get_mnemonic_from_user(" ".join(args), last_mnemonic)
                     
                     try:
-                        self.eth_client = Ethereumchain(rpc_url)
-                        print(f"\n✅ Connected to Ethereum node at {rpc_url}\n")
+                        print("\n🔍 Scanning accounts and addresses...")
+                        funded = discover(
+                            mnemonic,
+                            {"eth": eth_probe(self.eth_client)}
+                        )
+                        if not funded:
+                            print("\nNo funded addresses found\n")
+                            continue
+                        print(f"\n💰 Found {len(funded)} funded address(es):")
+                        for entry in funded:
+                            print(f"Account {entry['account']} / Index {entry['index']}: {entry['address']} - {entry['balance']} ETH")
+                        print()
                     except Exception as e:
-                        print(f"\n⚠️ Error connecting to node: {str(e)}")
+                        print(f"\n⚠️ Error discovering addresses: {str(e)}")
                 
                 else:
                     print(f"\n❌ Unknown Ethereum command: {command}")